@@ -1,24 +1,223 @@
 """Functions to convert ATT&CK STIX data to Excel, as well as entrypoint for attackToExcel_cli."""
 
 import argparse
+import hashlib
+import io
+import json
 import os
 import re
-from typing import Dict, List, Optional
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter, Retry
 from stix2 import MemoryStore
 
 # import mitreattack.attackToExcel.stixToDf as stixToDf
 from mitreattack.attackToExcel import stixToDf
+from mitreattack.attackToExcel.profiling import ExportProfile, count_rows, measure_call, profile_stage
 
 INVALID_CHARACTERS = ["\\", "/", "*", "[", "]", ":", "?"]
 SUB_CHARACTERS = ["\\", "/"]
+# object types whose workbooks also get the Detection strategy - Analytics - Log sources sheet
+ADD_DS_AN_LS_TO = {"detectionstrategies", "analytics", "datacomponents"}
+
+# STIX types read by the stixToDf builder of each ATT&CK type. Relationships to or from these objects, and the objects
+# on the other end of them, are also inputs of the builder.
+BUILDER_STIX_TYPES = {
+    "techniques": ["attack-pattern", "x-mitre-tactic"],
+    "tactics": ["x-mitre-tactic"],
+    "software": ["malware", "tool"],
+    "groups": ["intrusion-set"],
+    "campaigns": ["campaign"],
+    "assets": ["x-mitre-asset"],
+    "mitigations": ["course-of-action"],
+    "matrices": ["x-mitre-matrix", "x-mitre-tactic", "attack-pattern"],
+    "relationships": ["relationship"],
+    "datasources": ["x-mitre-data-source", "x-mitre-data-component"],
+    "datacomponents": ["x-mitre-data-component", "x-mitre-data-source"],
+    "analytics": ["x-mitre-analytic", "x-mitre-detection-strategy", "x-mitre-data-component"],
+    "detectionstrategies": ["x-mitre-detection-strategy", "x-mitre-analytic"],
+}
+# ATT&CK types built by build_dataframes_pre_v18 and build_dataframes, in the order they are built
+OBJECT_TYPES_PRE_V18 = list(build_type for build_type in BUILDER_STIX_TYPES if build_type != "datacomponents")
+OBJECT_TYPES = list(build_type for build_type in BUILDER_STIX_TYPES if build_type != "datasources")
+MANIFEST_FILE = "manifest.json"
+# bump when the output of the builders or writers, or the saved dataframes, change so that incremental exports
+# rebuild everything
+MANIFEST_VERSION = 2
+# directory of an export holding the dataframes reused by incremental exports, saved as JSON tables
+DATAFRAMES_DIR = ".dataframes"
+
+OUTPUT_FORMATS = ["xlsx", "parquet", "feather", "csv", "sqlite"]
+COLUMNAR_FORMATS = ["parquet", "feather", "csv"]
+# columns holding dates formatted by stixToDf.format_date
+DATE_COLUMNS = ["created", "last modified", "first seen", "last seen"]
+BOOLEAN_COLUMNS = ["is sub-technique", "supports remote"]
+# low-cardinality columns stored as categoricals in compact dataframes
+CATEGORICAL_COLUMNS = [
+    "domain",
+    "mapping type",
+    "platforms",
+    "source ID",
+    "source name",
+    "source ref",
+    "source type",
+    "tactics",
+    "target ID",
+    "target name",
+    "target ref",
+    "target type",
+    "type",
+    "version",
+]
+# bundles downloaded from a tagged ATT&CK release of MITRE/CTI never change, so they are not revalidated
+PINNED_RELEASE_URL = re.compile(r"^https://raw\.githubusercontent\.com/mitre/cti/ATT%26CK-v[\d.]+/")
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 60
+# columns indexed in the SQLite export
+SQLITE_INDEX_COLUMNS = ["ID", "STIX ID", "source ID", "source ref", "target ID", "target ref"]
+# columns holding lists that stixToDf joins into a single string, and the separator used to join them
+LIST_COLUMNS = {
+    "aliases": ", ",
+    "associated campaigns": ", ",
+    "associated groups": ", ",
+    "CAPEC ID": ", ",
+    "collection layers": ", ",
+    "contributors": "; ",
+    "data sources": ", ",
+    "defenses bypassed": ", ",
+    "domain": ",",
+    "effective permissions": ", ",
+    "impact type": ", ",
+    "permissions required": ", ",
+    "platforms": ", ",
+    "sectors": ", ",
+    "system requirements": ", ",
+    "tactic type": ", ",
+    "tactics": ", ",
+}
+
+
+@lru_cache(maxsize=None)
+def _get_session() -> requests.Session:
+    """Return the pooled HTTP session of this process, retrying transient server errors."""
+    session = requests.Session()
+    retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    session.mount("http", HTTPAdapter(max_retries=retries))
+    return session
+
+
+def _read_download_metadata(bundle_fp: str, metadata_fp: str) -> Dict:
+    """Return the metadata of a cached bundle, or an empty dictionary if it is missing or belongs to another download.
+
+    The bundle and its metadata are replaced one after the other, so the SHA-256 of the bundle recorded in the
+    metadata is checked to never pair a bundle with the ETag of another version.
+    """
+    if not os.path.exists(bundle_fp) or not os.path.exists(metadata_fp):
+        return {}
+    with open(metadata_fp, "r") as f:
+        metadata = json.load(f)
+    with open(bundle_fp, "rb") as f:
+        sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+    if metadata.get("sha256") != sha256:
+        logger.info(f"{bundle_fp} does not match its download metadata, ignoring the cached copy")
+        return {}
+    return metadata
+
+
+def _download_stix_json(url: str, cache_dir: Optional[str] = None) -> Dict:
+    """Download a STIX bundle, keeping a copy in `cache_dir` that is revalidated on the next download.
+
+    Bundles of a tagged ATT&CK release are served from the cache without contacting the server. Anything else is
+    revalidated with the ETag and Last-Modified headers of the cached copy, and only downloaded again if it changed.
+    Downloads are streamed to the cache before being parsed.
+
+    Parameters
+    ----------
+    url : str
+        URL of the STIX bundle
+    cache_dir : str, optional
+        Directory of the download cache. If omitted, the bundle is downloaded without caching, by default None
+
+    Returns
+    -------
+    dict
+        The parsed STIX bundle
+    """
+    session = _get_session()
+    if not cache_dir:
+        response = session.get(url, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    cache_key = hashlib.sha256(url.encode()).hexdigest()
+    bundle_fp = os.path.join(cache_dir, f"{cache_key}.json")
+    metadata_fp = os.path.join(cache_dir, f"{cache_key}.meta.json")
+
+    metadata = _read_download_metadata(bundle_fp=bundle_fp, metadata_fp=metadata_fp)
+
+    if metadata and PINNED_RELEASE_URL.match(url):
+        logger.info(f"Loading {url} from the download cache")
+    else:
+        headers = {}
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 304:
+                    logger.info(f"{url} has not changed, loading it from the download cache")
+                else:
+                    response.raise_for_status()
+                    # stream to temporary files so that concurrent exports never read a partial download
+                    temp_fp = f"{bundle_fp}.{os.getpid()}.part"
+                    temp_metadata_fp = f"{metadata_fp}.{os.getpid()}.part"
+                    try:
+                        sha256 = hashlib.sha256()
+                        with open(temp_fp, "wb") as f:
+                            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                                sha256.update(chunk)
+                        new_metadata = {
+                            "url": url,
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                            "sha256": sha256.hexdigest(),
+                        }
+                        with open(temp_metadata_fp, "w") as f:
+                            json.dump(new_metadata, f, indent=4)
+                        os.replace(temp_fp, bundle_fp)
+                        os.replace(temp_metadata_fp, metadata_fp)
+                        metadata = new_metadata
+                    finally:
+                        for fp in [temp_fp, temp_metadata_fp]:
+                            if os.path.exists(fp):
+                                os.remove(fp)
+        except requests.exceptions.RequestException as err:
+            if not metadata:
+                raise
+            logger.warning(f"Unable to revalidate {url} ({err}), loading it from the download cache")
+
+    with open(bundle_fp, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def get_stix_data(
-    domain: str, version: Optional[str] = None, remote: Optional[str] = None, stix_file: Optional[str] = None
+    domain: str,
+    version: Optional[str] = None,
+    remote: Optional[str] = None,
+    stix_file: Optional[str] = None,
+    cache_dir: Optional[str] = None,
 ) -> MemoryStore:
     """Download the ATT&CK STIX data for the given domain and version from MITRE/CTI (or just domain if a remote workbench is specified).
 
@@ -34,6 +233,9 @@ def get_stix_data(
         If specified, data will be retrieved from the target Workbench instead of MITRE/CTI, by default None
     stix_file : str, optional
         Path to a local STIX file containing ATT&CK data for a domain, by default None
+    cache_dir : str, optional
+        Directory in which to cache downloaded bundles. Cached bundles of tagged ATT&CK releases are reused without
+        a request, other cached bundles are revalidated with ETag/If-Modified-Since, by default None
 
     Returns
     -------
@@ -66,7 +268,7 @@ def get_stix_data(
             if not remote.startswith("http"):
                 remote = "http://" + remote
             url = f"{remote}/api/stix-bundles?domain={domain}&includeRevoked=true&includeDeprecated=true"
-            stix_json = requests.get(url).json()
+            stix_json = _download_stix_json(url, cache_dir=cache_dir)
             mem_store = MemoryStore(stix_json)
         else:
             logger.info("Downloading ATT&CK data from github.com/mitre/cti")
@@ -75,13 +277,45 @@ def get_stix_data(
             else:
                 url = f"https://raw.githubusercontent.com/mitre/cti/master/{domain}/{domain}.json"
 
-            stix_json = requests.get(url).json()
+            stix_json = _download_stix_json(url, cache_dir=cache_dir)
             mem_store = MemoryStore(stix_data=stix_json["objects"])
 
     return mem_store
 
 
-def build_dataframes_pre_v18(src: MemoryStore, domain: str) -> Dict:
+def _index_stix_data(src: MemoryStore, profile: Optional[ExportProfile]) -> stixToDf.StixDataIndex:
+    """Index the data once for every builder, parsing the relationships up front when profiling."""
+    with profile_stage(profile, "index"):
+        src = stixToDf.StixDataIndex(src)
+    if profile:
+        with profile_stage(profile, "parse relationships") as stage:
+            stage["rows"] = len(src.get_relationships()[0])
+    return src
+
+
+def _run_builders(
+    builders: Dict, object_types: Optional[List[str]], compact: bool, profile: Optional[ExportProfile]
+) -> Dict:
+    """Run the builders of the requested ATT&CK types for build_dataframes() and build_dataframes_pre_v18()."""
+    df = {}
+    for object_type, build in builders.items():
+        if object_types is None or object_type in object_types:
+            with profile_stage(profile, f"build {object_type}") as stage:
+                df[object_type] = build()
+                stage["rows"] = count_rows(df[object_type])
+    if compact:
+        with profile_stage(profile, "compact dataframes"):
+            df = compact_dataframes(df)
+    return df
+
+
+def build_dataframes_pre_v18(
+    src: MemoryStore,
+    domain: str,
+    object_types: Optional[List[str]] = None,
+    compact: bool = False,
+    profile: Optional[ExportProfile] = None,
+) -> Dict:
     """Build pandas dataframes for each attack type, and return a dictionary lookup for each type to the relevant dataframe.
 
     This version of the function is used for ATT&CK versions prior to v18, to account for changes to data components/data sources.
@@ -89,62 +323,147 @@ def build_dataframes_pre_v18(src: MemoryStore, domain: str) -> Dict:
     Parameters
     ----------
     src : MemoryStore
-        MemoryStore or other stix2 DataSource object
+        MemoryStore or other stix2 DataSource object, or a MitreAttackData instance
     domain : str
         domain of ATT&CK src corresponds to, e.g "enterprise-attack"
+    object_types : list, optional
+        Only build the dataframes for these ATT&CK types, e.g ["techniques", "tactics"].
+        If omitted, builds every type, by default None
+    compact : bool, optional
+        Convert the dataframes to compact dtypes with compact_dataframe(), by default False
+    profile : ExportProfile, optional
+        Record the indexing, relationship parsing and every builder as stages of this profile, by default None
 
     Returns
     -------
     dict
         A dict lookup of each ATT&CK type to dataframes for the given type to be ingested by write_excel
     """
-    df = {
-        "techniques": stixToDf.techniquesToDf(src, domain),
-        "tactics": stixToDf.tacticsToDf(src),
-        "software": stixToDf.softwareToDf(src),
-        "groups": stixToDf.groupsToDf(src),
-        "campaigns": stixToDf.campaignsToDf(src),
-        "assets": stixToDf.assetsToDf(src),
-        "mitigations": stixToDf.mitigationsToDf(src),
-        "matrices": stixToDf.matricesToDf(src, domain),
-        "relationships": stixToDf.relationshipsToDf(src),
-        "datasources": stixToDf.datasourcesToDf(src),
-        "analytics": stixToDf.analyticsToDf(src),
-        "detectionstrategies": stixToDf.detectionstrategiesToDf(src),
+    src = _index_stix_data(src, profile)
+    builders = {
+        "techniques": lambda: stixToDf.techniquesToDf(src, domain),
+        "tactics": lambda: stixToDf.tacticsToDf(src),
+        "software": lambda: stixToDf.softwareToDf(src),
+        "groups": lambda: stixToDf.groupsToDf(src),
+        "campaigns": lambda: stixToDf.campaignsToDf(src),
+        "assets": lambda: stixToDf.assetsToDf(src),
+        "mitigations": lambda: stixToDf.mitigationsToDf(src),
+        "matrices": lambda: stixToDf.matricesToDf(src, domain),
+        "relationships": lambda: stixToDf.relationshipsToDf(src),
+        "datasources": lambda: stixToDf.datasourcesToDf(src),
+        "analytics": lambda: stixToDf.analyticsToDf(src),
+        "detectionstrategies": lambda: stixToDf.detectionstrategiesToDf(src),
     }
-    return df
+    return _run_builders(builders, object_types=object_types, compact=compact, profile=profile)
 
 
-def build_dataframes(src: MemoryStore, domain: str) -> Dict:
+def build_dataframes(
+    src: MemoryStore,
+    domain: str,
+    object_types: Optional[List[str]] = None,
+    compact: bool = False,
+    profile: Optional[ExportProfile] = None,
+) -> Dict:
     """Build pandas dataframes for each attack type, and return a dictionary lookup for each type to the relevant dataframe.
 
     Parameters
     ----------
     src : MemoryStore
-        MemoryStore or other stix2 DataSource object
+        MemoryStore or other stix2 DataSource object, or a MitreAttackData instance
     domain : str
         domain of ATT&CK src corresponds to, e.g "enterprise-attack"
+    object_types : list, optional
+        Only build the dataframes for these ATT&CK types, e.g ["techniques", "tactics"].
+        If omitted, builds every type, by default None
+    compact : bool, optional
+        Convert the dataframes to compact dtypes with compact_dataframe(), by default False
+    profile : ExportProfile, optional
+        Record the indexing, relationship parsing and every builder as stages of this profile, by default None
 
     Returns
     -------
     dict
         A dict lookup of each ATT&CK type to dataframes for the given type to be ingested by write_excel
     """
-    df = {
-        "techniques": stixToDf.techniquesToDf(src, domain),
-        "tactics": stixToDf.tacticsToDf(src),
-        "software": stixToDf.softwareToDf(src),
-        "groups": stixToDf.groupsToDf(src),
-        "campaigns": stixToDf.campaignsToDf(src),
-        "assets": stixToDf.assetsToDf(src),
-        "mitigations": stixToDf.mitigationsToDf(src),
-        "matrices": stixToDf.matricesToDf(src, domain),
-        "relationships": stixToDf.relationshipsToDf(src),
-        "datacomponents": stixToDf.datacomponentsToDf(src),
-        "analytics": stixToDf.analyticsToDf(src),
-        "detectionstrategies": stixToDf.detectionstrategiesToDf(src),
+    src = _index_stix_data(src, profile)
+    builders = {
+        "techniques": lambda: stixToDf.techniquesToDf(src, domain),
+        "tactics": lambda: stixToDf.tacticsToDf(src),
+        "software": lambda: stixToDf.softwareToDf(src),
+        "groups": lambda: stixToDf.groupsToDf(src),
+        "campaigns": lambda: stixToDf.campaignsToDf(src),
+        "assets": lambda: stixToDf.assetsToDf(src),
+        "mitigations": lambda: stixToDf.mitigationsToDf(src),
+        "matrices": lambda: stixToDf.matricesToDf(src, domain),
+        "relationships": lambda: stixToDf.relationshipsToDf(src),
+        "datacomponents": lambda: stixToDf.datacomponentsToDf(src),
+        "analytics": lambda: stixToDf.analyticsToDf(src),
+        "detectionstrategies": lambda: stixToDf.detectionstrategiesToDf(src),
     }
-    return df
+    return _run_builders(builders, object_types=object_types, compact=compact, profile=profile)
+
+
+def compact_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Convert a dataframe built by stixToDf to compact dtypes.
+
+    Low-cardinality columns (CATEGORICAL_COLUMNS) become categoricals, formatted dates (DATE_COLUMNS) become
+    datetime columns and every other text column becomes a pandas string column. The writers in this module format
+    datetime columns back to "%d %B %Y" when writing, so compact dataframes produce the same files.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        A dataframe as built by stixToDf
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of the dataframe using compact dtypes
+    """
+    compact = dataframe.copy()
+    for column in compact.columns:
+        if column in DATE_COLUMNS:
+            compact[column] = pd.to_datetime(compact[column], format="%d %B %Y")
+        elif column in CATEGORICAL_COLUMNS:
+            compact[column] = compact[column].astype("category")
+        elif pd.api.types.infer_dtype(compact[column], skipna=True) == "string":
+            compact[column] = compact[column].astype("string")
+    return compact
+
+
+def compact_dataframes(dataframes: Dict) -> Dict:
+    """Convert every dataframe built by build_dataframes to compact dtypes with compact_dataframe().
+
+    Parameters
+    ----------
+    dataframes : dict
+        A dictionary of pandas dataframes as built by build_dataframes()
+
+    Returns
+    -------
+    dict
+        The same lookup, with the sheets of every ATT&CK type converted. Matrices are left as is.
+    """
+    compact = {}
+    for object_type, object_data in dataframes.items():
+        if object_type == "matrices":
+            compact[object_type] = object_data
+        else:
+            compact[object_type] = {
+                sheet_name: compact_dataframe(dataframe) for sheet_name, dataframe in object_data.items()
+            }
+    return compact
+
+
+def _format_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Format the datetime columns of a compact dataframe like stixToDf.format_date() for writing to Excel."""
+    date_columns = [column for column in dataframe.columns if pd.api.types.is_datetime64_any_dtype(dataframe[column])]
+    if not date_columns:
+        return dataframe
+    formatted = dataframe.copy()
+    for column in date_columns:
+        formatted[column] = formatted[column].dt.strftime("%d %B %Y")
+    return formatted
 
 
 def build_ds_an_lg_relationships(dataframes: Dict) -> Dict[str, pd.DataFrame]:
@@ -165,8 +484,224 @@ def build_ds_an_lg_relationships(dataframes: Dict) -> Dict[str, pd.DataFrame]:
     return {"ds_an_ls": combined}
 
 
+def _get_matrix_sheet_name(matrix: Dict, matrix_count: int) -> str:
+    """Return a valid Excel sheet name for a parsed matrix."""
+    # name them accordingly if there are multiple
+    sheetname = "matrix" if matrix_count == 1 else matrix["name"] + " matrix"
+    for character in INVALID_CHARACTERS:
+        sheetname = sheetname.replace(character, " or " if character in SUB_CHARACTERS else " ")
+
+    if len(sheetname) > 31:
+        sheetname = sheetname[0:28] + "..."
+    return sheetname
+
+
+def _format_matrix_sheet(writer: pd.ExcelWriter, sheetname: str, matrix: Dict):
+    """Format a matrix sheet that has already been written for readability."""
+    # define column border styles
+    borderleft = writer.book.add_format({"left": 1, "shrink": 1})
+    borderright = writer.book.add_format({"right": 1, "shrink": 1})
+
+    # formats only need to be defined once: pointers stored here for subsequent uses
+    formats = {}
+    sheet = writer.sheets[sheetname]
+
+    # set all columns to 20 width, and add text shrinking to fit
+    sheet.set_column(0, matrix["columns"], width=20)
+
+    # merge supertechniques and tactic headers if sub-techniques are present on a tactic
+    for merge_range in matrix["merge"]:
+        # sometimes merge ranges have formats to add to the merged range
+        if merge_range.format:
+            # add format to book if not defined
+            if merge_range.format["name"] not in formats:
+                formats[merge_range.format["name"]] = writer.book.add_format(merge_range.format["format"])
+            # get saved format if already added
+            theformat = formats[merge_range.format["name"]]
+
+            # tactic header merge has additional behavior
+            if merge_range.format["name"] == "tacticHeader":
+                # also set border for entire column for grouping
+                sheet.set_column(
+                    merge_range.leftCol - 1,
+                    merge_range.leftCol - 1,
+                    width=20,  # set column widths to make matrix more readable
+                    cell_format=borderleft,  # left border around tactic
+                )
+                sheet.set_column(
+                    merge_range.rightCol - 1,
+                    merge_range.rightCol - 1,
+                    width=20,  # set column widths to make matrix more readable
+                    cell_format=borderright,  # right border around tactic
+                )
+        else:
+            theformat = None  # no format
+
+        # apply the merge
+        sheet.merge_range(merge_range.to_excel_format(), merge_range.data, theformat)
+
+
+def _write_object_workbook(
+    fp: str, object_type: str, object_data: Dict, ds_an_ls_df: Optional[pd.DataFrame] = None
+) -> float:
+    """Write the `<domain>-<type>.xlsx` workbook for a single object type.
+
+    Parameters
+    ----------
+    fp : str
+        Path of the workbook to write
+    object_type : str
+        The ATT&CK object type the dataframes belong to, e.g "techniques"
+    object_data : dict
+        A lookup of sheet names to dataframes for the object type, as built by build_dataframes()
+    ds_an_ls_df : pd.DataFrame, optional
+        The Detection strategy - Analytics - Log sources dataframe, by default None
+
+    Returns
+    -------
+    float
+        Wall-clock seconds taken to write the workbook
+    """
+    start = time.perf_counter()
+    # write the dataframes for the object type into named sheets
+    with pd.ExcelWriter(fp) as object_writer:
+        for sheet_name in object_data:
+            logger.debug(f"Writing sheet to {fp}: {sheet_name}")
+            _format_dates(object_data[sheet_name]).to_excel(object_writer, sheet_name=sheet_name, index=False)
+
+        # Write Detection strategy - Analytics - Log sources file
+        if object_type in ADD_DS_AN_LS_TO and isinstance(ds_an_ls_df, pd.DataFrame) and not ds_an_ls_df.empty:
+            ds_an_ls_df.to_excel(object_writer, sheet_name="defensive mappings", index=False)
+    return time.perf_counter() - start
+
+
+def _write_matrices_workbook(fp: str, matrices: tuple) -> float:
+    """Write the `<domain>-matrices.xlsx` workbook with every main and platform matrix.
+
+    Parameters
+    ----------
+    fp : str
+        Path of the workbook to write
+    matrices : tuple
+        The (main matrices, platform sub-matrices) tuple built by matricesToDf()
+
+    Returns
+    -------
+    float
+        Wall-clock seconds taken to write the workbook
+    """
+    start = time.perf_counter()
+    with pd.ExcelWriter(fp, engine="xlsxwriter") as matrix_writer:
+        # Combine both matrix types
+        combined = matrices[0] + matrices[1]
+
+        # some domains have multiple matrices
+        for matrix in combined:
+            sheetname = _get_matrix_sheet_name(matrix=matrix, matrix_count=len(combined))
+
+            # write unformatted matrix to matrix file
+            logger.debug(f"Writing sheet to {fp}: {sheetname}")
+            matrix["matrix"].to_excel(matrix_writer, sheet_name=sheetname, index=False)
+            _format_matrix_sheet(writer=matrix_writer, sheetname=sheetname, matrix=matrix)
+    return time.perf_counter() - start
+
+
+def _write_master_workbook(master_fp: str, dataframes: Dict, ds_an_ls_df: Optional[pd.DataFrame] = None) -> float:
+    """Write the master workbook containing the main sheet of every object type, the matrices, and citations.
+
+    Parameters
+    ----------
+    master_fp : str
+        Path of the master workbook to write
+    dataframes : dict
+        A dictionary of pandas dataframes as built by build_dataframes()
+    ds_an_ls_df : pd.DataFrame, optional
+        The Detection strategy - Analytics - Log sources dataframe, by default None
+
+    Returns
+    -------
+    float
+        Wall-clock seconds taken to write the workbook
+    """
+    start = time.perf_counter()
+    with pd.ExcelWriter(path=master_fp, engine="xlsxwriter") as master_writer:
+        # master list of citations
+        citations = pd.DataFrame()
+
+        for object_type, object_data in dataframes.items():
+            if object_type != "matrices":
+                if not object_data:
+                    continue
+
+                # add citations to master citations list
+                if "citations" in object_data:
+                    citations = pd.concat([citations, object_data["citations"]])
+
+                # add main df to master dataset
+                logger.debug(f"Writing sheet to {master_fp}: {object_type}")
+                _format_dates(object_data[object_type]).to_excel(master_writer, sheet_name=object_type, index=False)
+
+            else:  # handle matrix special formatting
+                matrix_count = len(object_data[0]) + len(object_data[1])
+                # avoid printing subtype matrices to the master file
+                for matrix in object_data[0]:
+                    sheetname = _get_matrix_sheet_name(matrix=matrix, matrix_count=matrix_count)
+                    # write unformatted matrix data to master file
+                    logger.debug(f"Writing sheet to {master_fp}: {sheetname}")
+                    matrix["matrix"].to_excel(master_writer, sheet_name=sheetname, index=False)
+                    _format_matrix_sheet(writer=master_writer, sheetname=sheetname, matrix=matrix)
+
+        if isinstance(ds_an_ls_df, pd.DataFrame) and not ds_an_ls_df.empty:
+            ds_an_ls_df.to_excel(master_writer, sheet_name="defensive mappings", index=False)
+        # remove duplicate citations and add sheet to master file
+        logger.debug(f"Writing sheet to {master_fp}: citations")
+        citations.drop_duplicates(subset="reference", ignore_index=True).sort_values("reference").to_excel(
+            master_writer, sheet_name="citations", index=False
+        )
+    return time.perf_counter() - start
+
+
+def _unlink_shared_file(fp: str):
+    """Remove a file that is hard-linked elsewhere so that writing to its path creates a new file."""
+    if os.path.exists(fp) and os.stat(fp).st_nlink > 1:
+        os.remove(fp)
+
+
+def _link_workbook(source: str, fp: str) -> float:
+    """Hard-link an unchanged file of a previous export to `fp`, falling back to a copy.
+
+    Parameters
+    ----------
+    source : str
+        Path of the unchanged file in the previous export
+    fp : str
+        Path of the file to create
+
+    Returns
+    -------
+    float
+        Wall-clock seconds taken to link or copy the file
+    """
+    start = time.perf_counter()
+    if os.path.abspath(source) != os.path.abspath(fp):
+        if os.path.exists(fp):
+            os.remove(fp)
+        try:
+            os.link(source, fp)
+        except OSError:
+            shutil.copy2(source, fp)
+    return time.perf_counter() - start
+
+
 def write_excel(
-    dataframes: Dict, domain: str, src: MemoryStore, version: Optional[str] = None, output_dir: str = "."
+    dataframes: Dict,
+    domain: str,
+    src: MemoryStore,
+    version: Optional[str] = None,
+    output_dir: str = ".",
+    jobs: int = 1,
+    reuse: Optional[Dict[str, str]] = None,
+    profile: Optional[ExportProfile] = None,
 ) -> List:
     """Given a set of dataframes from build_dataframes, write the ATT&CK dataset to output directory.
 
@@ -185,15 +720,22 @@ def write_excel(
     output_dir : str, optional
         The directory to write the excel files to.
         If omitted writes to a subfolder of the current directory depending on specified domain and version, by default "."
+    jobs : int, optional
+        Number of worker processes used to write the per-type workbooks while the master workbook is assembled.
+        A value of 1 writes every workbook sequentially in the current process, by default 1
+    reuse : dict, optional
+        A lookup of ATT&CK types to unchanged workbooks of a previous export, which are hard-linked (or copied)
+        instead of being written again. The "master" key reuses the master workbook, by default None
+    profile : ExportProfile, optional
+        Record the writing of every workbook, in the process that writes it, in this profile, by default None
 
     Returns
     -------
     list
         A list of filepaths corresponding to the files written by the function
     """
+    reuse = reuse or {}
     logger.info("writing formatted files... ")
-    # master list of files that have been written
-    written_files = []
     # set up output directory
     if version:
         domain_version_string = f"{domain}-{version}"
@@ -205,133 +747,637 @@ def write_excel(
     # master dataset file
     master_fp = os.path.join(output_directory, f"{domain_version_string}.xlsx")
 
+    with profile_stage(profile, "build defensive mappings") as stage:
+        ds_an_ls_df = stixToDf.detectionStrategiesAnalyticsLogSourcesDf(src)
+        stage["rows"] = count_rows(ds_an_ls_df)
+
+    # per-type workbooks to write, in the order they are reported: (filepath, writer function, writer arguments)
+    workbooks = []
+    # rows written to each workbook, None for linked workbooks
+    rows = {}
+    for object_type, object_data in dataframes.items():
+        fp = os.path.join(output_directory, f"{domain_version_string}-{object_type}.xlsx")
+        if object_type in reuse:
+            workbooks.append((fp, _link_workbook, (reuse[object_type], fp)))
+            rows[fp] = None
+            continue
+        # never write through a hard link left by an incremental export, it would modify the previous export
+        _unlink_shared_file(fp)
+        if object_type == "matrices":
+            workbooks.append((fp, _write_matrices_workbook, (fp, object_data)))
+            rows[fp] = count_rows(object_data)
+        elif not object_data:
+            logger.warning(f"No data for {object_type}. Skipping building an Excel file.")
+        else:
+            workbooks.append((fp, _write_object_workbook, (fp, object_type, object_data, ds_an_ls_df)))
+            rows[fp] = count_rows(object_data)
+            if object_type in ADD_DS_AN_LS_TO:
+                rows[fp] += count_rows(ds_an_ls_df)
+
+    if "master" in reuse:
+        master_workbook = (_link_workbook, (reuse["master"], master_fp))
+        rows[master_fp] = None
+    else:
+        _unlink_shared_file(master_fp)
+        master_workbook = (_write_master_workbook, (master_fp, dataframes, ds_an_ls_df))
+        rows[master_fp] = count_rows(ds_an_ls_df) + sum(
+            count_rows(object_data[object_type]) if object_type != "matrices" else count_rows((object_data[0], []))
+            for object_type, object_data in dataframes.items()
+            if object_data
+        )
+
+    if profile:
+        # measure each write in the process that does it, the writers then return (seconds, measurement)
+        workbooks = [
+            (fp, partial(measure_call, write_function, trace_memory=profile.trace_memory), args)
+            for fp, write_function, args in workbooks
+        ]
+        master_workbook = (
+            partial(measure_call, master_workbook[0], trace_memory=profile.trace_memory),
+            master_workbook[1],
+        )
+
+    # seconds taken to write each file
+    timings = {}
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {fp: executor.submit(write_function, *args) for fp, write_function, args in workbooks}
+            # the master workbook is assembled in this process while the workers write the per-type workbooks
+            timings[master_fp] = master_workbook[0](*master_workbook[1])
+            for fp, future in futures.items():
+                timings[fp] = future.result()
+    else:
+        for fp, write_function, args in workbooks:
+            timings[fp] = write_function(*args)
+        timings[master_fp] = master_workbook[0](*master_workbook[1])
+
+    # master list of files that have been written
+    written_files = [fp for fp, _, _ in workbooks] + [master_fp]
+
+    if profile:
+        for thefile in written_files:
+            timings[thefile], measurement = timings[thefile]
+            profile.add_file(thefile, measurement, rows=rows[thefile])
+
+    for thefile in written_files:
+        logger.info(f"Excel file created: {thefile} ({timings[thefile]:.2f}s)")
+    return written_files
+
+
+def _get_file_name(name: str) -> str:
+    """Return a sheet or matrix name as a file name, e.g "procedure examples" -> "procedure-examples"."""
+    file_name = name.strip().lower()
+    for character in INVALID_CHARACTERS + [" ", "&"]:
+        file_name = file_name.replace(character, "-")
+    return re.sub(r"-+", "-", file_name).strip("-")
+
+
+def _get_matrix_dataframe(matrix: Dict) -> pd.DataFrame:
+    """Return a parsed matrix dataframe with a unique name for each sub-technique column."""
+    columns = []
+    for column in matrix["matrix"].columns:
+        # sub-technique columns have an empty header that is merged with the tactic header in Excel
+        columns.append(column if column else f"{columns[-1]} sub-techniques")
+    return matrix["matrix"].set_axis(columns, axis="columns")
+
+
+def to_typed_dataframe(dataframe: pd.DataFrame, file_format: str) -> pd.DataFrame:
+    """Convert a dataframe built by stixToDf to typed columns suitable for a columnar file format.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        A dataframe as built by build_dataframes()
+    file_format : str
+        The file format the dataframe will be written to, one of COLUMNAR_FORMATS or "sqlite"
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of the dataframe where dates are timestamps, booleans are booleans, joined lists are list columns
+        (parquet and feather only), integers are left as is, and every other column is a string column.
+    """
+    typed = dataframe.copy()
+    for column in typed.columns:
+        if column in DATE_COLUMNS:
+            typed[column] = pd.to_datetime(typed[column], format="%d %B %Y")
+        elif column in BOOLEAN_COLUMNS:
+            typed[column] = typed[column].astype("boolean")
+        elif column in LIST_COLUMNS and file_format in ["parquet", "feather"]:
+            typed[column] = typed[column].str.split(LIST_COLUMNS[column])
+        elif not pd.api.types.is_integer_dtype(typed[column]):
+            typed[column] = typed[column].astype("string")
+    return typed
+
+
+def _check_format_dependencies(file_format: str):
+    """Raise an ImportError naming the extra to install when the optional packages of `file_format` are missing."""
+    if file_format in ["parquet", "feather"]:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                f"{file_format} output requires the pyarrow package, "
+                "install it with `pip install mitreattack-python[arrow]`"
+            ) from e
+
+
+def _write_columnar_file(dataframe: pd.DataFrame, fp: str, file_format: str):
+    """Write a single typed dataframe to the given file format."""
+    typed = to_typed_dataframe(dataframe=dataframe, file_format=file_format)
+    if file_format == "csv":
+        typed.to_csv(fp, index=False, date_format="%Y-%m-%d")
+        return
+
+    # pyarrow is only needed for parquet and feather output
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    # spell out the schema so that columns which happen to be empty keep their type
+    fields = []
+    for column in typed.columns:
+        if column in DATE_COLUMNS:
+            fields.append(pa.field(column, pa.timestamp("ms")))
+        elif column in BOOLEAN_COLUMNS:
+            fields.append(pa.field(column, pa.bool_()))
+        elif column in LIST_COLUMNS:
+            fields.append(pa.field(column, pa.list_(pa.string())))
+        elif pd.api.types.is_integer_dtype(typed[column]):
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    table = pa.Table.from_pandas(typed, schema=pa.schema(fields), preserve_index=False)
+    if file_format == "parquet":
+        pyarrow.parquet.write_table(table, fp)
+    else:
+        pyarrow.feather.write_feather(table, fp)
+
+
+def _get_export_sheets(dataframes: Dict, src: MemoryStore, file_format: str) -> Dict:
+    """Return the sheets write_excel would produce as {object_type: {sheet_name: dataframe}}.
+
+    The sheets that only appear in the master workbook (citations, defensive mappings) are keyed by "".
+    """
+    sheets = {}
+    citations = pd.DataFrame()
+    for object_type, object_data in dataframes.items():
+        if object_type == "matrices":
+            combined = object_data[0] + object_data[1]
+            sheets[object_type] = {
+                _get_matrix_sheet_name(matrix=matrix, matrix_count=len(combined)): _get_matrix_dataframe(matrix)
+                for matrix in combined
+            }
+        elif not object_data:
+            logger.warning(f"No data for {object_type}. Skipping building {file_format} files.")
+        else:
+            sheets[object_type] = object_data
+            if "citations" in object_data:
+                citations = pd.concat([citations, object_data["citations"]])
+
     ds_an_ls_df = stixToDf.detectionStrategiesAnalyticsLogSourcesDf(src)
-    add_ds_an_ls_to = {"detectionstrategies", "analytics", "datacomponents"}
+    sheets[""] = {
+        "citations": citations.drop_duplicates(subset="reference", ignore_index=True).sort_values("reference")
+    }
+    if isinstance(ds_an_ls_df, pd.DataFrame) and not ds_an_ls_df.empty:
+        sheets[""]["defensive mappings"] = ds_an_ls_df
+    return sheets
 
-    with pd.ExcelWriter(path=master_fp, engine="xlsxwriter") as master_writer:
-        # master list of citations
-        citations = pd.DataFrame()
 
-        # write individual dataframes and add to master writer
-        for object_type, object_data in dataframes.items():
-            fp = os.path.join(output_directory, f"{domain_version_string}-{object_type}.xlsx")
+def write_columnar(
+    dataframes: Dict,
+    domain: str,
+    src: MemoryStore,
+    file_format: str,
+    version: Optional[str] = None,
+    output_dir: str = ".",
+    profile: Optional[ExportProfile] = None,
+) -> List:
+    """Given a set of dataframes from build_dataframes, write the ATT&CK dataset to a columnar file format.
 
-            if object_type != "matrices":
-                if not object_data:
-                    logger.warning(f"No data for {object_type}. Skipping building an Excel file.")
+    Each sheet that write_excel would produce for an object type is written to `<object_type>/<sheet>.<format>`,
+    and the sheets that only appear in the master workbook (citations, defensive mappings) are written to the
+    top of the output directory. Parquet and feather output requires the optional `pyarrow` package.
+
+    Parameters
+    ----------
+    dataframes : dict
+        A dictionary of pandas dataframes as built by build_dataframes()
+    domain : str
+        Domain of ATT&CK the dataframes correspond to, e.g "enterprise-attack"
+    src : stix2.MemoryStore
+        A STIX bundle containing ATT&CK data for a domain already loaded into memory.
+    file_format : str
+        The file format to write, one of COLUMNAR_FORMATS
+    version : str, optional
+        The version of ATT&CK the dataframes correspond to, e.g "v8.1".
+        If omitted, the output files will not be labelled with the version number, by default None
+    output_dir : str, optional
+        The directory to write the files to.
+        If omitted writes to a subfolder of the current directory depending on specified domain and version, by default "."
+    profile : ExportProfile, optional
+        Record the writing of every file in this profile, by default None
+
+    Returns
+    -------
+    list
+        A list of filepaths corresponding to the files written by the function
+
+    Raises
+    ------
+    ValueError
+        Raised if `file_format` is not one of COLUMNAR_FORMATS
+    """
+    if file_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"file_format must be one of {COLUMNAR_FORMATS}, not {file_format}")
+
+    logger.info(f"writing {file_format} files... ")
+    written_files = []
+    if version:
+        domain_version_string = f"{domain}-{version}"
+    else:
+        domain_version_string = domain
+    output_directory = os.path.join(output_dir, domain_version_string)
+
+    with profile_stage(profile, "collect sheets"):
+        sheets = _get_export_sheets(dataframes=dataframes, src=src, file_format=file_format)
+    for directory, object_sheets in sheets.items():
+        sheet_directory = os.path.join(output_directory, directory)
+        if not os.path.exists(sheet_directory):
+            os.makedirs(sheet_directory)
+
+        for sheet_name, dataframe in object_sheets.items():
+            fp = os.path.join(sheet_directory, f"{_get_file_name(sheet_name)}.{file_format}")
+            logger.debug(f"Writing {fp}")
+            if profile:
+                _, measurement = measure_call(
+                    _write_columnar_file, dataframe, fp, file_format, trace_memory=profile.trace_memory
+                )
+                profile.add_file(fp, measurement, rows=len(dataframe))
+            else:
+                _write_columnar_file(dataframe=dataframe, fp=fp, file_format=file_format)
+            written_files.append(fp)
+
+    for thefile in written_files:
+        logger.info(f"{file_format} file created: {thefile}")
+    return written_files
+
+
+def _get_table_name(object_type: str, sheet_name: str) -> str:
+    """Return the SQLite table name for a sheet, e.g ("techniques", "procedure examples") -> "techniques_procedure_examples"."""
+    if not object_type or object_type == sheet_name:
+        return _get_file_name(sheet_name).replace("-", "_")
+    return _get_file_name(f"{object_type} {sheet_name}").replace("-", "_")
+
+
+def _get_matrix_layout(sheets: Dict) -> pd.DataFrame:
+    """Flatten the parsed matrix dataframes into one row per non-empty matrix cell."""
+    cells = []
+    for matrix_name, matrix in sheets.items():
+        for column_index, column in enumerate(matrix.columns):
+            for row_index, value in enumerate(matrix[column]):
+                if isinstance(value, str) and value:
+                    cells.append(
+                        {
+                            "matrix": matrix_name,
+                            "column": column_index,
+                            "row": row_index,
+                            "header": column,
+                            "name": value,
+                        }
+                    )
+    return pd.DataFrame(cells, columns=["matrix", "column", "row", "header", "name"])
+
+
+def _insert_sqlite_table(connection: sqlite3.Connection, table_name: str, dataframe: pd.DataFrame):
+    """Create a table for a dataframe, bulk insert its rows and index its lookup columns."""
+    typed = to_typed_dataframe(dataframe=dataframe, file_format="sqlite")
+    column_definitions = []
+    for column in typed.columns:
+        if column in BOOLEAN_COLUMNS or pd.api.types.is_integer_dtype(typed[column]):
+            column_type = "INTEGER"
+        else:
+            column_type = "TEXT"
+        if column in DATE_COLUMNS:
+            typed[column] = typed[column].dt.strftime("%Y-%m-%d")
+        column_definitions.append(f'"{column}" {column_type}')
+
+    connection.execute(f'CREATE TABLE "{table_name}" ({", ".join(column_definitions)})')
+    rows = typed.astype(object).where(typed.notna(), None).itertuples(index=False, name=None)
+    connection.executemany(f'INSERT INTO "{table_name}" VALUES ({", ".join("?" * len(typed.columns))})', rows)
+
+    for column in SQLITE_INDEX_COLUMNS:
+        if column in typed.columns:
+            index_name = f"idx_{table_name}_{column.lower().replace(' ', '_')}"
+            connection.execute(f'CREATE INDEX "{index_name}" ON "{table_name}" ("{column}")')
+
+
+def _write_sqlite_tables(fp: str, sheets: Dict) -> int:
+    """Write the sheets collected by _get_export_sheets() to a new SQLite database, returning the number of rows."""
+    row_count = 0
+    connection = sqlite3.connect(fp)
+    try:
+        with connection:
+            for object_type, object_sheets in sheets.items():
+                if object_type == "matrices":
+                    matrix_layout = _get_matrix_layout(object_sheets)
+                    _insert_sqlite_table(connection=connection, table_name="matrices", dataframe=matrix_layout)
+                    row_count += len(matrix_layout)
                     continue
+                for sheet_name, dataframe in object_sheets.items():
+                    table_name = _get_table_name(object_type=object_type, sheet_name=sheet_name)
+                    logger.debug(f"Writing table {table_name}")
+                    _insert_sqlite_table(connection=connection, table_name=table_name, dataframe=dataframe)
+                    row_count += len(dataframe)
+    finally:
+        connection.close()
+    return row_count
+
+
+def write_sqlite(
+    dataframes: Dict,
+    domain: str,
+    src: MemoryStore,
+    version: Optional[str] = None,
+    output_dir: str = ".",
+    profile: Optional[ExportProfile] = None,
+) -> str:
+    """Given a set of dataframes from build_dataframes, write the ATT&CK dataset to a single SQLite database.
 
-                # write the dataframes for the object type into named sheets
-                with pd.ExcelWriter(fp) as object_writer:
-                    for sheet_name in object_data:
-                        logger.debug(f"Writing sheet to {fp}: {sheet_name}")
-                        object_data[sheet_name].to_excel(object_writer, sheet_name=sheet_name, index=False)
-
-                    # Write Detection strategy - Analytics - Log sources file
-                    if (
-                        object_type in add_ds_an_ls_to
-                        and isinstance(ds_an_ls_df, pd.DataFrame)
-                        and not ds_an_ls_df.empty
-                    ):
-                        ds_an_ls_df.to_excel(object_writer, sheet_name="defensive mappings", index=False)
-                written_files.append(fp)
+    Every sheet that write_excel would produce becomes a table named `<object_type>_<sheet>`, with the main sheet
+    of each object type named after the type itself (e.g "techniques", "techniques_procedure_examples"). The
+    deduplicated citations and the defensive mappings are written to the "citations" and "defensive_mappings"
+    tables, and the matrices are flattened into a "matrices" table with one row per cell. ATT&CK IDs, STIX IDs and
+    relationship source/target columns are indexed. All rows are inserted in a single transaction.
 
-                # add citations to master citations list
-                if "citations" in object_data:
-                    citations = pd.concat([citations, object_data["citations"]])
+    Parameters
+    ----------
+    dataframes : dict
+        A dictionary of pandas dataframes as built by build_dataframes()
+    domain : str
+        Domain of ATT&CK the dataframes correspond to, e.g "enterprise-attack"
+    src : stix2.MemoryStore
+        A STIX bundle containing ATT&CK data for a domain already loaded into memory.
+    version : str, optional
+        The version of ATT&CK the dataframes correspond to, e.g "v8.1".
+        If omitted, the output file will not be labelled with the version number, by default None
+    output_dir : str, optional
+        The directory to write the database to.
+        If omitted writes to a subfolder of the current directory depending on specified domain and version, by default "."
+    profile : ExportProfile, optional
+        Record the writing of the database in this profile, by default None
 
-                # add main df to master dataset
-                logger.debug(f"Writing sheet to {master_fp}: {object_type}")
-                object_data[object_type].to_excel(master_writer, sheet_name=object_type, index=False)
+    Returns
+    -------
+    str
+        The filepath of the database written by the function
+    """
+    logger.info("writing SQLite database... ")
+    if version:
+        domain_version_string = f"{domain}-{version}"
+    else:
+        domain_version_string = domain
+    output_directory = os.path.join(output_dir, domain_version_string)
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    fp = os.path.join(output_directory, f"{domain_version_string}.db")
+    # the database is always rebuilt from scratch
+    if os.path.exists(fp):
+        os.remove(fp)
+
+    with profile_stage(profile, "collect sheets"):
+        sheets = _get_export_sheets(dataframes=dataframes, src=src, file_format="sqlite")
+    if profile:
+        row_count, measurement = measure_call(_write_sqlite_tables, fp, sheets, trace_memory=profile.trace_memory)
+        profile.add_file(fp, measurement, rows=row_count)
+    else:
+        _write_sqlite_tables(fp, sheets)
 
-            else:  # handle matrix special formatting
-                with pd.ExcelWriter(fp, engine="xlsxwriter") as matrix_writer:
-                    # Combine both matrix types
-                    combined = object_data[0] + object_data[1]
-
-                    # some domains have multiple matrices
-                    for matrix in combined:
-                        # name them accordingly if there are multiple
-                        sheetname = "matrix" if len(combined) == 1 else matrix["name"] + " matrix"
-                        for character in INVALID_CHARACTERS:
-                            sheetname = sheetname.replace(character, " or " if character in SUB_CHARACTERS else " ")
-
-                        if len(sheetname) > 31:
-                            sheetname = sheetname[0:28] + "..."
-                        listing = []
-
-                        # avoid printing subtype matrices to the master file
-                        if matrix in object_data[0]:
-                            # write unformatted matrix data to master file
-                            logger.debug(f"Writing sheet to {master_fp}: {sheetname}")
-                            matrix["matrix"].to_excel(master_writer, sheet_name=sheetname, index=False)
-                            listing.append(master_writer)
-
-                        # write unformatted matrix to matrix file
-                        logger.debug(f"Writing sheet to {fp}: {sheetname}")
-                        matrix["matrix"].to_excel(matrix_writer, sheet_name=sheetname, index=False)
-                        listing.append(matrix_writer)
-
-                        # for each writer, format the matrix for readability
-                        for writer in listing:
-                            # define column border styles
-                            borderleft = writer.book.add_format({"left": 1, "shrink": 1})
-                            borderright = writer.book.add_format({"right": 1, "shrink": 1})
-
-                            # formats only need to be defined once: pointers stored here for subsequent uses
-                            formats = {}
-                            sheet = writer.sheets[sheetname]
-
-                            # set all columns to 20 width, and add text shrinking to fit
-                            sheet.set_column(0, matrix["columns"], width=20)
-
-                            # merge supertechniques and tactic headers if sub-techniques are present on a tactic
-                            for merge_range in matrix["merge"]:
-                                # sometimes merge ranges have formats to add to the merged range
-                                if merge_range.format:
-                                    # add format to book if not defined
-                                    if merge_range.format["name"] not in formats:
-                                        formats[merge_range.format["name"]] = writer.book.add_format(
-                                            merge_range.format["format"]
-                                        )
-                                    # get saved format if already added
-                                    theformat = formats[merge_range.format["name"]]
-
-                                    # tactic header merge has additional behavior
-                                    if merge_range.format["name"] == "tacticHeader":
-                                        # also set border for entire column for grouping
-                                        sheet.set_column(
-                                            merge_range.leftCol - 1,
-                                            merge_range.leftCol - 1,
-                                            width=20,  # set column widths to make matrix more readable
-                                            cell_format=borderleft,  # left border around tactic
-                                        )
-                                        sheet.set_column(
-                                            merge_range.rightCol - 1,
-                                            merge_range.rightCol - 1,
-                                            width=20,  # set column widths to make matrix more readable
-                                            cell_format=borderright,  # right border around tactic
-                                        )
-                                else:
-                                    theformat = None  # no format
-
-                                # apply the merge
-                                sheet.merge_range(merge_range.to_excel_format(), merge_range.data, theformat)
-
-                written_files.append(fp)
+    logger.info(f"SQLite database created: {fp}")
+    return fp
 
-        if isinstance(ds_an_ls_df, pd.DataFrame) and not ds_an_ls_df.empty:
-            ds_an_ls_df.to_excel(master_writer, sheet_name="defensive mappings", index=False)
-        # remove duplicate citations and add sheet to master file
-        logger.debug(f"Writing sheet to {master_fp}: citations")
-        citations.drop_duplicates(subset="reference", ignore_index=True).sort_values("reference").to_excel(
-            master_writer, sheet_name="citations", index=False
+
+def _get_content_hashes(src: MemoryStore, object_types: List[str]) -> Dict[str, str]:
+    """Return a digest of the ID and modified timestamp of every STIX object each ATT&CK type is built from.
+
+    Parameters
+    ----------
+    src : stix2.MemoryStore
+        A STIX bundle containing ATT&CK data for a domain already loaded into memory.
+    object_types : list
+        The ATT&CK types to hash, keys of BUILDER_STIX_TYPES
+
+    Returns
+    -------
+    dict
+        A lookup of each ATT&CK type to the hex digest of its inputs
+    """
+    stix_objects = src.query()
+    modified_by_id = {stix_object["id"]: str(stix_object.get("modified", "")) for stix_object in stix_objects}
+    relationships = [stix_object for stix_object in stix_objects if stix_object["type"] == "relationship"]
+
+    hashes = {}
+    for object_type in object_types:
+        stix_types = set(BUILDER_STIX_TYPES[object_type])
+        if object_type in ADD_DS_AN_LS_TO:
+            # the defensive mappings sheet is added to these workbooks
+            stix_types.update(["x-mitre-detection-strategy", "x-mitre-analytic", "x-mitre-data-component"])
+        object_ids = {stix_object["id"] for stix_object in stix_objects if stix_object["type"] in stix_types}
+
+        input_ids = set(object_ids)
+        for relationship in relationships:
+            if relationship["source_ref"] in object_ids or relationship["target_ref"] in object_ids:
+                input_ids.update([relationship["id"], relationship["source_ref"], relationship["target_ref"]])
+            elif "relationship" in stix_types:
+                input_ids.update([relationship["source_ref"], relationship["target_ref"]])
+
+        digest = hashlib.sha256()
+        for stix_id in sorted(input_ids):
+            digest.update(f"{stix_id}|{modified_by_id.get(stix_id, '')}\n".encode())
+        hashes[object_type] = digest.hexdigest()
+    return hashes
+
+
+def _get_dataframes_file(directory: str, object_type: str) -> str:
+    """Return the path of the saved dataframes of an ATT&CK type in the export folder `directory`."""
+    return os.path.join(directory, DATAFRAMES_DIR, f"{object_type}.json")
+
+
+def _save_dataframes(object_data: Optional[Dict], fp: str):
+    """Save the dataframes built for an ATT&CK type as JSON tables.
+
+    Unlike pickles, JSON tables can't run code when they are loaded, so the dataframes of any previous export are
+    safe to load with _load_dataframes().
+    """
+    tables = None
+    if object_data is not None:
+        tables = {
+            sheet_name: json.loads(dataframe.to_json(orient="table", index=False))
+            for sheet_name, dataframe in object_data.items()
+        }
+    with open(fp, "w") as f:
+        json.dump(tables, f)
+
+
+def _load_dataframes(fp: str) -> Optional[Dict]:
+    """Load the dataframes of an ATT&CK type saved by _save_dataframes()."""
+    with open(fp, "r") as f:
+        tables = json.load(f)
+    if tables is None:
+        return None
+    return {
+        sheet_name: pd.read_json(io.StringIO(json.dumps(table)), orient="table") for sheet_name, table in tables.items()
+    }
+
+
+def _export_incremental(
+    mem_store: MemoryStore,
+    domain: str,
+    version: Optional[str],
+    output_dir: str,
+    previous_output: Optional[str],
+    jobs: int,
+    pre_v18: bool,
+    profile: Optional[ExportProfile] = None,
+    compact: bool = False,
+) -> List:
+    """Export ATT&CK data to Excel, only rebuilding the ATT&CK types whose STIX inputs changed since a previous export.
+
+    The content hash of every ATT&CK type is compared with the manifest of the previous export. Changed types are
+    rebuilt and written, while the workbooks and dataframes of unchanged types are hard-linked (or copied) forward.
+    A new manifest and the dataframes are written to the output directory for the next incremental export.
+
+    Parameters
+    ----------
+    mem_store : stix2.MemoryStore
+        A STIX bundle containing ATT&CK data for a domain already loaded into memory.
+    domain : str
+        The domain of ATT&CK being exported, e.g "enterprise-attack"
+    version : str, optional
+        The version of ATT&CK being exported, e.g "v8.1"
+    output_dir : str
+        The directory to write the excel files to
+    previous_output : str, optional
+        The folder of a previous export, e.g "output/enterprise-attack-v8.0".
+        If omitted, the previous export is read from the output folder itself
+    jobs : int
+        Number of worker processes used to write the Excel workbooks
+    pre_v18 : bool
+        Whether the dataframes are built by build_dataframes_pre_v18()
+    profile : ExportProfile, optional
+        Record the stages of the export and the files it writes in this profile, by default None
+    compact : bool, optional
+        Build the changed dataframes with compact dtypes, see compact_dataframe(), by default False
+
+    Returns
+    -------
+    list
+        A list of filepaths corresponding to the files written by the function
+    """
+    if version:
+        domain_version_string = f"{domain}-{version}"
+    else:
+        domain_version_string = domain
+    output_directory = os.path.join(output_dir, domain_version_string)
+    previous_directory = previous_output or output_directory
+    object_types = OBJECT_TYPES_PRE_V18 if pre_v18 else OBJECT_TYPES
+    with profile_stage(profile, "hash inputs"):
+        hashes = _get_content_hashes(src=mem_store, object_types=object_types)
+
+    previous_manifest = {}
+    previous_manifest_fp = os.path.join(previous_directory, MANIFEST_FILE)
+    if os.path.exists(previous_manifest_fp):
+        with open(previous_manifest_fp, "r") as f:
+            previous_manifest = json.load(f)
+    if (
+        previous_manifest.get("manifest_version") != MANIFEST_VERSION
+        or previous_manifest.get("domain") != domain
+        or previous_manifest.get("compact") != compact
+    ):
+        previous_manifest = {}
+    previous_types = previous_manifest.get("object_types", {})
+
+    unchanged = []
+    for object_type in object_types:
+        previous = previous_types.get(object_type)
+        if not previous or previous["hash"] != hashes[object_type]:
+            continue
+        if object_type != "matrices" and not os.path.exists(_get_dataframes_file(previous_directory, object_type)):
+            continue
+        if previous["workbook"] and not os.path.exists(os.path.join(previous_directory, previous["workbook"])):
+            continue
+        unchanged.append(object_type)
+    changed = [object_type for object_type in object_types if object_type not in unchanged]
+    logger.info(f"Incremental export: rebuilding {changed}, reusing {unchanged}")
+
+    # the cell merges of the matrices can't be saved as JSON, so unchanged matrices are rebuilt for the master
+    # workbook when it is written again, while their own workbook is still reused
+    rebuilt = [
+        object_type for object_type in object_types if object_type in changed or (object_type == "matrices" and changed)
+    ]
+    build = build_dataframes_pre_v18 if pre_v18 else build_dataframes
+    built = build(src=mem_store, domain=domain, object_types=rebuilt, compact=compact, profile=profile)
+    dataframes = {}
+    reuse = {}
+    with profile_stage(profile, "load previous dataframes") as stage:
+        for object_type in object_types:
+            if object_type in built:
+                dataframes[object_type] = built[object_type]
+            elif object_type == "matrices":
+                # only the reused workbook is needed, since the master workbook is reused as well
+                dataframes[object_type] = None
+            else:
+                dataframes[object_type] = _load_dataframes(_get_dataframes_file(previous_directory, object_type))
+            if object_type in unchanged and previous_types[object_type]["workbook"]:
+                reuse[object_type] = os.path.join(previous_directory, previous_types[object_type]["workbook"])
+        stage["rows"] = sum(
+            count_rows(dataframes[object_type]) for object_type in unchanged if object_type not in rebuilt
         )
+    if not changed and previous_manifest.get("master"):
+        reuse["master"] = os.path.join(previous_directory, previous_manifest["master"])
+
+    written_files = write_excel(
+        dataframes=dataframes,
+        domain=domain,
+        src=mem_store,
+        version=version,
+        output_dir=output_dir,
+        jobs=jobs,
+        reuse=reuse,
+        profile=profile,
+    )
 
-    written_files.append(master_fp)
+    # save the dataframes and the manifest for the next incremental export
+    dataframes_directory = os.path.join(output_directory, DATAFRAMES_DIR)
+    if not os.path.exists(dataframes_directory):
+        os.makedirs(dataframes_directory)
+    written_names = [os.path.basename(fp) for fp in written_files]
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "domain": domain,
+        "version": version,
+        "master": f"{domain_version_string}.xlsx",
+        "compact": compact,
+        "object_types": {},
+    }
+    with profile_stage(profile, "save dataframes and manifest"):
+        for object_type in object_types:
+            # the matrices are rebuilt instead, see above
+            if object_type != "matrices":
+                fp = _get_dataframes_file(output_directory, object_type)
+                if object_type in unchanged:
+                    _link_workbook(_get_dataframes_file(previous_directory, object_type), fp)
+                else:
+                    _unlink_shared_file(fp)
+                    _save_dataframes(dataframes[object_type], fp)
+            workbook = f"{domain_version_string}-{object_type}.xlsx"
+            manifest["object_types"][object_type] = {
+                "hash": hashes[object_type],
+                "workbook": workbook if workbook in written_names else None,
+            }
+        with open(os.path.join(output_directory, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=4)
 
-    for thefile in written_files:
-        logger.info(f"Excel file created: {thefile}")
     return written_files
 
 
@@ -342,8 +1388,15 @@ def export(
     remote: Optional[str] = None,
     stix_file: Optional[str] = None,
     mem_store: Optional[MemoryStore] = None,
-):
-    """Download ATT&CK data from MITRE/CTI and convert it to Excel spreadsheets.
+    jobs: int = 1,
+    file_format: str = "xlsx",
+    incremental: bool = False,
+    previous_output: Optional[str] = None,
+    profile: Optional[ExportProfile] = None,
+    cache_dir: Optional[str] = None,
+    compact: bool = False,
+) -> List:
+    """Download ATT&CK data from MITRE/CTI and convert it to Excel spreadsheets, columnar files or a SQLite database.
 
     Parameters
     ----------
@@ -368,14 +1421,42 @@ def export(
         A STIX bundle containing ATT&CK data for a domain already loaded into memory.
         Mutually exclusive with `remote` and `stix_file`.
         By default None
+    jobs : int, optional
+        Number of worker processes used to write the Excel workbooks, by default 1
+    file_format : str, optional
+        The output format, one of OUTPUT_FORMATS. Parquet and feather output requires the optional `pyarrow` package.
+        By default "xlsx"
+    incremental : bool, optional
+        Only rebuild the Excel workbooks whose STIX inputs changed since a previous export, hard-linking (or copying)
+        the unchanged workbooks forward. A manifest of content hashes is written next to the output for the next
+        incremental export. Only supported for the "xlsx" format, by default False
+    previous_output : str, optional
+        The folder of the previous export used by an incremental export, e.g "output/enterprise-attack-v8.0".
+        If omitted, the previous export is read from the output folder itself, by default None
+    profile : ExportProfile, optional
+        Record the wall time, CPU time, peak memory and row counts of every stage of the export (loading the data,
+        indexing it, each builder) and of every file written in this profile, by default None
+    cache_dir : str, optional
+        Directory in which get_stix_data() caches downloaded bundles, by default None
+    compact : bool, optional
+        Build the dataframes with compact dtypes to use less memory, see compact_dataframe().
+        The files written are the same, by default False
+
+    Returns
+    -------
+    list
+        A list of filepaths corresponding to the files written by the function
 
     Raises
     ------
     TypeError
         Raised when missing exactly one of `remote`, `stix_file`, or `mem_store`.
     ValueError
-        Raised when `mem_store` fails to load.
+        Raised when `mem_store` fails to load, or when `incremental` is used with a format other than "xlsx".
+    ImportError
+        Raised when `file_format` is "parquet" or "feather" and pyarrow is not installed.
     """
+    _check_format_dependencies(file_format)
     if (
         (remote and stix_file and mem_store)
         or (remote and stix_file)
@@ -387,26 +1468,208 @@ def export(
     get_stix_from_github = remote is None and stix_file is None and mem_store is None
 
     if get_stix_from_github or remote or stix_file:
-        mem_store = get_stix_data(domain=domain, version=version, remote=remote, stix_file=stix_file)
+        with profile_stage(profile, "load"):
+            mem_store = get_stix_data(
+                domain=domain, version=version, remote=remote, stix_file=stix_file, cache_dir=cache_dir
+            )
 
     if mem_store is None:
         raise ValueError("`mem_store` is empty - this should not be possible!")
 
-    logger.info(f"************ Exporting {domain} to Excel ************")
+    logger.info(f"************ Exporting {domain} to {file_format} ************")
+    if profile:
+        profile.details.update({"domain": domain, "version": version, "format": file_format})
 
-    # build dataframes
+    pre_v18 = False
     if version:
         version_pattern = r"v(\d+)\.(\d+)$"
         match = re.search(version_pattern, version)
         if match:
             major_version = int(match.group(1))
-            if major_version < 18:
-                dataframes = build_dataframes_pre_v18(src=mem_store, domain=domain)
-                write_excel(dataframes=dataframes, domain=domain, src=mem_store, version=version, output_dir=output_dir)
-                return
+            pre_v18 = major_version < 18
+
+    if incremental:
+        if file_format != "xlsx":
+            raise ValueError("Incremental exports are only supported for the xlsx format")
+        return _export_incremental(
+            mem_store=mem_store,
+            domain=domain,
+            version=version,
+            output_dir=output_dir,
+            previous_output=previous_output,
+            jobs=jobs,
+            pre_v18=pre_v18,
+            profile=profile,
+            compact=compact,
+        )
+
+    # build dataframes
+    if pre_v18:
+        dataframes = build_dataframes_pre_v18(src=mem_store, domain=domain, compact=compact, profile=profile)
+    else:
+        dataframes = build_dataframes(src=mem_store, domain=domain, compact=compact, profile=profile)
+
+    if file_format == "sqlite":
+        return [
+            write_sqlite(
+                dataframes=dataframes,
+                domain=domain,
+                src=mem_store,
+                version=version,
+                output_dir=output_dir,
+                profile=profile,
+            )
+        ]
+    elif file_format in COLUMNAR_FORMATS:
+        return write_columnar(
+            dataframes=dataframes,
+            domain=domain,
+            src=mem_store,
+            file_format=file_format,
+            version=version,
+            output_dir=output_dir,
+            profile=profile,
+        )
+    else:
+        return write_excel(
+            dataframes=dataframes,
+            domain=domain,
+            src=mem_store,
+            version=version,
+            output_dir=output_dir,
+            jobs=jobs,
+            profile=profile,
+        )
+
+
+def _export_bundle(
+    domain: str,
+    version: Optional[str],
+    output_dir: str,
+    remote: Optional[str],
+    stix_file: Optional[str],
+    file_format: str,
+    cache_dir: Optional[str] = None,
+    compact: bool = False,
+) -> Dict:
+    """Load a single bundle and export it, returning a summary of the export for export_batch()."""
+    start = time.perf_counter()
+    mem_store = get_stix_data(domain=domain, version=version, remote=remote, stix_file=stix_file, cache_dir=cache_dir)
+    written_files = export(
+        domain=domain,
+        version=version,
+        output_dir=output_dir,
+        mem_store=mem_store,
+        file_format=file_format,
+        compact=compact,
+    )
+    return {
+        "domain": domain,
+        "version": version,
+        "objects": len(mem_store.query()),
+        "files": written_files,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def export_batch(
+    exports: List[Tuple[str, Optional[str]]],
+    output_dir: str = ".",
+    remote: Optional[str] = None,
+    release_dir: Optional[str] = None,
+    jobs: int = 1,
+    file_format: str = "xlsx",
+    cache_dir: Optional[str] = None,
+    compact: bool = False,
+) -> List[Dict]:
+    """Export several domains and versions of ATT&CK, loading each STIX bundle exactly once.
+
+    Each (domain, version) pair is loaded and exported in its own worker process when `jobs` is greater than 1.
+    Aggregate throughput is logged once every export has finished.
+
+    Parameters
+    ----------
+    exports : list
+        The (domain, version) pairs to export, e.g [("enterprise-attack", "v17.1"), ("ics-attack", None)].
+        A version of None builds the current version of ATT&CK. Duplicate pairs are only exported once.
+    output_dir : str, optional
+        The directory to write the files to. Each export is written to a subfolder depending on its domain and
+        version, by default "."
+    remote : str, optional
+        The URL of a remote ATT&CK Workbench instance to connect to for stix data.
+        Mutually exclusive with `release_dir`, by default None
+    release_dir : str, optional
+        A local release cache laid out like the output of download_attack_stix,
+        e.g `<release_dir>/v17.1/enterprise-attack.json`. Bundles found in the cache are loaded from disk,
+        anything else is downloaded from MITRE/CTI, by default None
+    jobs : int, optional
+        Number of worker processes used to export bundles concurrently, by default 1
+    file_format : str, optional
+        The output format, one of OUTPUT_FORMATS, by default "xlsx"
+    cache_dir : str, optional
+        Directory in which get_stix_data() caches downloaded bundles, by default None
+    compact : bool, optional
+        Build the dataframes of each export with compact dtypes, see export(), by default False
+
+    Returns
+    -------
+    list
+        A summary of each export, in the order given, as {domain, version, objects, files, seconds}
+
+    Raises
+    ------
+    ValueError
+        Raised if both `remote` and `release_dir` are passed
+    ImportError
+        Raised when `file_format` is "parquet" or "feather" and pyarrow is not installed.
+    """
+    if remote and release_dir:
+        raise ValueError("remote and release_dir are mutually exclusive. Please only use one or the other")
+    _check_format_dependencies(file_format)
+
+    bundles = []
+    for domain, version in dict.fromkeys(exports):
+        stix_file = None
+        if release_dir and version:
+            cached_file = os.path.join(release_dir, version, f"{domain}.json")
+            if os.path.exists(cached_file):
+                stix_file = cached_file
+            else:
+                logger.info(f"{cached_file} not found in the release cache, downloading {domain} {version}")
+        bundles.append(
+            {
+                "domain": domain,
+                "version": version,
+                "output_dir": output_dir,
+                "remote": remote,
+                "stix_file": stix_file,
+                "file_format": file_format,
+                "cache_dir": cache_dir,
+                "compact": compact,
+            }
+        )
 
-    dataframes = build_dataframes(src=mem_store, domain=domain)
-    write_excel(dataframes=dataframes, domain=domain, src=mem_store, version=version, output_dir=output_dir)
+    start = time.perf_counter()
+    if jobs > 1 and len(bundles) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(bundles))) as executor:
+            futures = [executor.submit(_export_bundle, **bundle) for bundle in bundles]
+            results = [future.result() for future in futures]
+    else:
+        results = [_export_bundle(**bundle) for bundle in bundles]
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        logger.info(
+            f"Exported {result['domain']} {result['version'] or 'latest'}: {result['objects']} objects, "
+            f"{len(result['files'])} files ({result['seconds']:.2f}s)"
+        )
+    object_count = sum(result["objects"] for result in results)
+    file_count = sum(len(result["files"]) for result in results)
+    logger.info(
+        f"Exported {len(results)} bundles ({object_count} objects, {file_count} files) in {elapsed:.2f}s: "
+        f"{len(results) / elapsed:.2f} bundles/s, {object_count / elapsed:.0f} objects/s"
+    )
+    return results
 
 
 def main():
@@ -445,11 +1708,125 @@ def main():
         default=None,
         help="Path to a local STIX file containing ATT&CK data for a domain, by default None",
     )
+    parser.add_argument(
+        "-jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to write the Excel workbooks concurrently, or to export bundles "
+        "concurrently when -domains or -versions is given, by default 1",
+    )
+    parser.add_argument(
+        "-format",
+        "--format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        default="xlsx",
+        help="output file format. parquet and feather require the pyarrow package of the arrow extra, by default xlsx",
+    )
+    parser.add_argument(
+        "-domains",
+        type=str,
+        nargs="+",
+        choices=["enterprise-attack", "mobile-attack", "ics-attack"],
+        help="batch export every combination of these domains and -versions, loading each bundle once",
+    )
+    parser.add_argument(
+        "-versions",
+        type=str,
+        nargs="+",
+        help="batch export every combination of these versions and -domains, loading each bundle once",
+    )
+    parser.add_argument(
+        "-release-dir",
+        type=str,
+        default=None,
+        help="local release cache used by batch exports, laid out like the output of download_attack_stix",
+    )
+    parser.add_argument(
+        "-incremental",
+        action="store_true",
+        help="only rebuild the Excel workbooks whose STIX inputs changed since the previous export",
+    )
+    parser.add_argument(
+        "-previous-output",
+        type=str,
+        default=None,
+        help="folder of the previous export used by -incremental. If omitted, uses the output folder itself",
+    )
+    parser.add_argument(
+        "-profile-report",
+        "--profile-report",
+        type=str,
+        default=None,
+        help="write a JSON report of the wall time, CPU time, peak memory and row counts of every stage of the "
+        "export and of every file written to this path",
+    )
+    parser.add_argument(
+        "-cache-dir",
+        type=str,
+        default=None,
+        help="directory in which to cache downloaded STIX bundles. Tagged releases are reused without a request, "
+        "other bundles are only downloaded again if they changed",
+    )
+    parser.add_argument(
+        "-compact",
+        action="store_true",
+        help="build the dataframes with categorical, datetime and string dtypes to use less memory. "
+        "The files written are the same",
+    )
     args = parser.parse_args()
 
+    try:
+        _check_format_dependencies(args.format)
+    except ImportError as e:
+        parser.error(str(e))
+
+    if args.domains or args.versions:
+        single_export_options = {
+            "-stix-file": args.stix_file,
+            "-incremental": args.incremental,
+            "-previous-output": args.previous_output,
+            "-profile-report": args.profile_report,
+        }
+        for option, value in single_export_options.items():
+            if value:
+                parser.error(f"{option} is not supported with -domains or -versions")
+
+        domains = args.domains or [args.domain]
+        versions = args.versions or [args.version]
+        export_batch(
+            exports=[(domain, version) for domain in domains for version in versions],
+            output_dir=args.output,
+            remote=args.remote,
+            release_dir=args.release_dir,
+            jobs=args.jobs,
+            file_format=args.format,
+            cache_dir=args.cache_dir,
+            compact=args.compact,
+        )
+        return
+
+    if args.release_dir:
+        parser.error("-release-dir is only supported with -domains or -versions")
+
+    profile = ExportProfile() if args.profile_report else None
     export(
-        domain=args.domain, version=args.version, output_dir=args.output, remote=args.remote, stix_file=args.stix_file
+        domain=args.domain,
+        version=args.version,
+        output_dir=args.output,
+        remote=args.remote,
+        stix_file=args.stix_file,
+        jobs=args.jobs,
+        file_format=args.format,
+        incremental=args.incremental,
+        previous_output=args.previous_output,
+        profile=profile,
+        cache_dir=args.cache_dir,
+        compact=args.compact,
     )
+    if profile:
+        profile.write(args.profile_report)
+        logger.info(f"Profile report written to {args.profile_report}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+"""Stage timing and memory profiling of attackToExcel exports."""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+MEGABYTE = 1024 * 1024
+
+
+def _get_max_rss() -> Optional[float]:
+    """Return the peak resident set size of the current process in megabytes, or None where it is not available."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / MEGABYTE
+    return max_rss / 1024
+
+
+@contextmanager
+def _measure(trace_memory: bool) -> Iterator[Dict]:
+    """Measure the wall time, CPU time and peak memory of the body of the context into the yielded dictionary.
+
+    The body is measured even if it raises, and tracemalloc is stopped again afterwards if it was started here.
+    """
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    measurement = {}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield measurement
+    finally:
+        measurement["wall seconds"] = round(time.perf_counter() - wall_start, 6)
+        measurement["cpu seconds"] = round(time.process_time() - cpu_start, 6)
+        measurement["peak traced MB"] = (
+            round(tracemalloc.get_traced_memory()[1] / MEGABYTE, 3) if trace_memory else None
+        )
+        if started_tracing:
+            tracemalloc.stop()
+        max_rss = _get_max_rss()
+        measurement["max RSS MB"] = round(max_rss, 3) if max_rss is not None else None
+
+
+def measure_call(function: Callable, *args, trace_memory: bool = True) -> Tuple[Any, Dict]:
+    """Call a function and measure it like ExportProfile.stage(), e.g in a worker process.
+
+    Parameters
+    ----------
+    function : Callable
+        The function to call. Must be picklable when submitted to a process pool.
+    *args
+        Positional arguments of the function
+    trace_memory : bool, optional
+        Record the peak memory allocated by Python during the call with tracemalloc, by default True
+
+    Returns
+    -------
+    tuple
+        The result of the function and the measurement of the call
+    """
+    with _measure(trace_memory) as measurement:
+        result = function(*args)
+    return result, measurement
+
+
+class ExportProfile:
+    """Records the wall time, CPU time, peak memory and row counts of the stages and output files of an export.
+
+    Stages are measured one after the other and must not be nested, since tracemalloc only tracks a single peak.
+    The peak resident set size is the high-water mark of the process at the end of each stage.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Record the peak memory allocated by Python during each stage with tracemalloc. Tracing slows down the
+        export noticeably, by default True
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.details = {}
+        self.stages: List[Dict] = []
+        self.files: List[Dict] = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """Measure a stage of the export.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage, e.g "build techniques"
+
+        Yields
+        ------
+        dict
+            The record of the stage, to which the caller can add details such as a "rows" count
+        """
+        record = {"stage": name}
+        # a stage that raises is still recorded
+        try:
+            with _measure(self.trace_memory) as measurement:
+                yield record
+        finally:
+            record.update(measurement)
+            self.stages.append(record)
+
+    def add_file(self, fp: str, measurement: Dict, rows: Optional[int] = None):
+        """Record an output file written by the export.
+
+        Parameters
+        ----------
+        fp : str
+            Path of the file
+        measurement : dict
+            The measurement of writing the file, as returned by measure_call()
+        rows : int, optional
+            Number of data rows written to the file, by default None
+        """
+        record = {"file": fp, "bytes": os.path.getsize(fp) if os.path.exists(fp) else None, "rows": rows}
+        record.update(measurement)
+        self.files.append(record)
+
+    def to_dict(self) -> Dict:
+        """Return the report as a JSON serializable dictionary."""
+        traced_peaks = [record["peak traced MB"] for record in self.stages + self.files if record["peak traced MB"]]
+        max_rss = _get_max_rss()
+        return {
+            **self.details,
+            "total": {
+                "wall seconds": round(time.perf_counter() - self._wall_start, 6),
+                "cpu seconds": round(time.process_time() - self._cpu_start, 6),
+                "peak traced MB": max(traced_peaks) if traced_peaks else None,
+                "max RSS MB": round(max_rss, 3) if max_rss is not None else None,
+            },
+            "stages": self.stages,
+            "files": self.files,
+        }
+
+    def write(self, fp: str):
+        """Write the report to a JSON file.
+
+        Parameters
+        ----------
+        fp : str
+            Path of the JSON file to write
+        """
+        directory = os.path.dirname(fp)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(fp, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+
+def profile_stage(profile: Optional[ExportProfile], name: str):
+    """Return ExportProfile.stage() for the profile, or a context that records nothing when there is no profile."""
+    if profile is None:
+        return nullcontext({})
+    return profile.stage(name)
+
+
+def count_rows(object_data: Any) -> int:
+    """Return the number of rows of the dataframes built for an ATT&CK type, or written to a single file.
+
+    Parameters
+    ----------
+    object_data : Any
+        A dataframe (or None), a lookup of sheet names to dataframes, or the (main matrices, sub-matrices) tuple
+        built by matricesToDf()
+
+    Returns
+    -------
+    int
+        The total number of rows
+    """
+    if object_data is None:
+        return 0
+    if isinstance(object_data, dict):
+        return sum(count_rows(dataframe) for dataframe in object_data.values())
+    if isinstance(object_data, tuple):
+        return sum(len(matrix["matrix"]) for matrices in object_data for matrix in matrices)
+    return len(object_data)
@@ -8,7 +8,6 @@ from itertools import chain
 import numpy as np
 import pandas as pd
 from loguru import logger
-from stix2 import Filter, MemoryStore
 from tqdm import tqdm
 
 from mitreattack.constants import MITRE_ATTACK_ID_SOURCE_NAMES, PLATFORMS_LOOKUP
@@ -108,18 +107,159 @@ def parseBaseStix(sdo):
     return row
 
 
+# ATT&CK type of each STIX type, as used in relationship sheets
+STIX_TO_ATTACK_TERM = {
+    "attack-pattern": "technique",
+    "x-mitre-tactic": "tactic",
+    "tool": "software",
+    "malware": "software",
+    "intrusion-set": "group",
+    "course-of-action": "mitigation",
+    "x-mitre-matrix": "matrix",
+    "x-mitre-data-component": "datacomponent",
+    "x-mitre-data-source": "datasource",
+    "campaign": "campaign",
+    "x-mitre-asset": "asset",
+    "x-mitre-detection-strategy": "detectionstrategy",
+}
+
+
+class StixDataIndex:
+    """Index of the STIX data of a domain, built in one pass and shared by the builders in this module.
+
+    Every builder accepts a StixDataIndex in place of a stix2 DataSource, so that object lists, lookups by STIX ID,
+    ATT&CK IDs, sub-technique parents and parsed relationships are computed once instead of once per builder.
+    """
+
+    def __init__(self, src):
+        """Index the given data.
+
+        :param src: MemoryStore or other stix2 DataSource object, or MitreAttackData instance holding the domain data
+        """
+        if isinstance(src, MitreAttackData):
+            src = src.src
+        self.src = src
+        self._objects_by_type = {}
+        self._objects_by_id = {}
+        for stix_object in src.query():
+            self._objects_by_type.setdefault(stix_object["type"], []).append(stix_object)
+            # like stix2 DataSource.get(), keep the latest version of versioned objects
+            latest = self._objects_by_id.get(stix_object["id"])
+            if latest is None or "modified" not in stix_object or stix_object["modified"] > latest["modified"]:
+                self._objects_by_id[stix_object["id"]] = stix_object
+
+        self._parent_refs = {}
+        for relationship in self.get_objects_by_type("relationship"):
+            if relationship["relationship_type"] == "subtechnique-of":
+                self._parent_refs.setdefault(relationship["source_ref"], relationship["target_ref"])
+
+        # parsed relationships, built the first time relationshipsToDf needs them
+        self._relationships = None
+
+    def get(self, stix_id):
+        """Return the latest version of the object with the given STIX ID, or None if there is no such object."""
+        return self._objects_by_id.get(stix_id)
+
+    def get_objects_by_type(self, *stix_types):
+        """Return every object of the given STIX types, in the order of the underlying data source."""
+        return list(chain.from_iterable(self._objects_by_type.get(stix_type, []) for stix_type in stix_types))
+
+    def get_attack_id(self, stix_id):
+        """Return the ATT&CK ID of the object with the given STIX ID, or None if it doesn't have one."""
+        external_references = self.get(stix_id).get("external_references", [])
+        if external_references:
+            attack_source = external_references[0]
+            if attack_source.get("external_id") and attack_source.get("source_name") == "mitre-attack":
+                return attack_source["external_id"]
+        return None
+
+    def get_parent_technique(self, subtechnique_id):
+        """Return the parent technique of the sub-technique with the given STIX ID, or None if it isn't found."""
+        parent_ref = self._parent_refs.get(subtechnique_id)
+        return self.get(parent_ref) if parent_ref else None
+
+    def get_relationships(self):
+        """Return the active relationships and the rows relationshipsToDf builds from them.
+
+        :returns: (relationships, rows) where relationships is the list of active relationship objects and rows is a
+            list of (source type, target type, row) tuples for each relationship between active objects, where the
+            types are STIX types and row is the relationship sheet row
+        """
+        if self._relationships is not None:
+            return self._relationships
+
+        relationships = remove_revoked_deprecated(self.get_objects_by_type("relationship"))
+        relationship_rows = []
+        for relationship in tqdm(relationships, desc="parsing all relationships"):
+            source = self.get(relationship["source_ref"])  # source object of the relationship
+            target = self.get(relationship["target_ref"])  # target object of the relationship
+
+            # filter if related objects don't exist or are revoked or deprecated
+            if not source or source.get("x_mitre_deprecated", False) is True or source.get("revoked", False) is True:
+                continue
+            if not target or target.get("x_mitre_deprecated", False) is True or target.get("revoked", False) is True:
+                continue
+            if relationship["relationship_type"] == "revoked":
+                continue
+
+            # don't track sub-technique relationships, those are tracked in the techniques df
+            if relationship["relationship_type"] == "subtechnique-of":
+                continue
+
+            # add mapping data
+            row = {}
+
+            row["source ID"] = self.get_attack_id(stix_id=source["id"])
+            row["source name"] = source.get("name")
+            row["source ref"] = source.get("id")
+            row["source type"] = STIX_TO_ATTACK_TERM.get(source["type"])
+
+            # mapping type goes between the source/target data
+            row["mapping type"] = relationship["relationship_type"]
+
+            row["target ID"] = self.get_attack_id(stix_id=target["id"])
+            row["target name"] = target.get("name")
+            row["target ref"] = target.get("id")
+            row["target type"] = STIX_TO_ATTACK_TERM.get(target["type"])
+
+            if "description" in relationship:  # add description of relationship to the end of the row
+                row["mapping description"] = relationship["description"]
+            # add required fields for workbench import: relationship stix id, created, and modified
+            row["STIX ID"] = relationship["id"]
+            if "created" in relationship:
+                row["created"] = format_date(relationship["created"])
+            if "modified" in relationship:
+                row["last modified"] = format_date(relationship["modified"])
+            relationship_rows.append((source["type"], target["type"], row))
+
+        self._relationships = (relationships, relationship_rows)
+        return self._relationships
+
+
+def get_stix_data_index(src):
+    """Return the given data as a StixDataIndex, indexing it unless it already is one.
+
+    :param src: MemoryStore or other stix2 DataSource object, MitreAttackData instance, or StixDataIndex
+    :returns: a StixDataIndex of the data
+    """
+    if isinstance(src, StixDataIndex):
+        return src
+    return StixDataIndex(src)
+
+
 def techniquesToDf(src, domain):
     """Parse STIX techniques from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :param domain: domain of ATT&CK src corresponds to, e.g "enterprise-attack"
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    techniques = src.query([Filter("type", "=", "attack-pattern")])
+    src = get_stix_data_index(src)
+    techniques = src.get_objects_by_type("attack-pattern")
     techniques = remove_revoked_deprecated(techniques)
     technique_rows = []
 
-    tactics = src.query([Filter("type", "=", "x-mitre-tactic")])
+    tactics = src.get_objects_by_type("x-mitre-tactic")
     tactics = remove_revoked_deprecated(tactics)
     tactic_names = {}
     for tactic in tactics:
@@ -127,20 +267,11 @@ def techniquesToDf(src, domain):
         tactic_names[x_mitre_shortname] = tactic["name"]
     missing_tactic_shortnames = set()
 
-    all_sub_techniques = src.query(
-        [
-            Filter("type", "=", "relationship"),
-            Filter("relationship_type", "=", "subtechnique-of"),
-        ]
-    )
-    all_sub_techniques = MemoryStore(stix_data=all_sub_techniques)
-
     for technique in tqdm(techniques, desc="parsing techniques"):
         # get parent technique if sub-technique
         subtechnique = "x_mitre_is_subtechnique" in technique and technique["x_mitre_is_subtechnique"]
         if subtechnique:
-            subtechnique_of = all_sub_techniques.query([Filter("source_ref", "=", technique["id"])])[0]
-            parent = src.get(subtechnique_of["target_ref"])
+            parent = src.get_parent_technique(technique["id"])
         else:
             parent = None
 
@@ -251,10 +382,11 @@ def techniquesToDf(src, domain):
 def tacticsToDf(src):
     """Parse STIX tactics from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    tactics = src.query([Filter("type", "=", "x-mitre-tactic")])
+    src = get_stix_data_index(src)
+    tactics = src.get_objects_by_type("x-mitre-tactic")
     tactics = remove_revoked_deprecated(tactics)
 
     tactic_rows = []
@@ -276,18 +408,12 @@ def datasourcesToDf(src):
 
     This is only used in versions of ATT&CK before v18.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    data = list(
-        chain.from_iterable(  # collect all data components and data sources
-            src.query(f)
-            for f in [
-                Filter("type", "=", "x-mitre-data-component"),
-                Filter("type", "=", "x-mitre-data-source"),
-            ]
-        )
-    )
+    src = get_stix_data_index(src)
+    # collect all data components and data sources
+    data = src.get_objects_by_type("x-mitre-data-component", "x-mitre-data-source")
     dataframes = {}
     if data:
         refined = remove_revoked_deprecated(data)
@@ -353,10 +479,11 @@ def datasourcesToDf(src):
 def datacomponentsToDf(src):
     """Parse STIX Data components from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    data_components = src.query([Filter("type", "=", "x-mitre-data-component")])
+    src = get_stix_data_index(src)
+    data_components = src.get_objects_by_type("x-mitre-data-component")
     data_components = remove_revoked_deprecated(data_components)
 
     data_component_rows = []
@@ -376,14 +503,15 @@ def datacomponentsToDf(src):
 def analyticsToDf(src):
     """Parse STIX Analytics from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    analytics = src.query([Filter("type", "=", "x-mitre-analytic")])
+    src = get_stix_data_index(src)
+    analytics = src.get_objects_by_type("x-mitre-analytic")
     analytics = remove_revoked_deprecated(analytics)
 
     # Detection strategies (needed for analytics to detection strategies relationship)
-    detection_strategies = src.query([Filter("type", "=", "x-mitre-detection-strategy")])
+    detection_strategies = src.get_objects_by_type("x-mitre-detection-strategy")
     detection_strategies = remove_revoked_deprecated(detection_strategies)
 
     dataframes = {}
@@ -482,10 +610,11 @@ def analyticsToDf(src):
 def detectionstrategiesToDf(src):
     """Parse STIX Detection Strategies from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    detection_strategies = src.query([Filter("type", "=", "x-mitre-detection-strategy")])
+    src = get_stix_data_index(src)
+    detection_strategies = src.get_objects_by_type("x-mitre-detection-strategy")
     detection_strategies = remove_revoked_deprecated(detection_strategies)
 
     dataframes = {}
@@ -527,14 +656,12 @@ def detectionstrategiesToDf(src):
 def softwareToDf(src):
     """Parse STIX software from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    software = list(
-        chain.from_iterable(  # software are the union of the tool and malware types
-            src.query(f) for f in [Filter("type", "=", "tool"), Filter("type", "=", "malware")]
-        )
-    )
+    src = get_stix_data_index(src)
+    # software are the union of the tool and malware types
+    software = src.get_objects_by_type("tool", "malware")
     software = remove_revoked_deprecated(software)
     software_rows = []
     for soft in tqdm(software, desc="parsing software"):
@@ -572,10 +699,11 @@ def softwareToDf(src):
 
 def detectionStrategiesAnalyticsLogSourcesDf(src):
     """Build a single DS -> LogSource -> Analytic dataframe directly from STIX."""
-    detection_strategies = src.query([Filter("type", "=", "x-mitre-detection-strategy")])
+    src = get_stix_data_index(src)
+    detection_strategies = src.get_objects_by_type("x-mitre-detection-strategy")
     detection_strategies = remove_revoked_deprecated(detection_strategies)
 
-    analytics = src.query([Filter("type", "=", "x-mitre-analytic")])
+    analytics = src.get_objects_by_type("x-mitre-analytic")
     analytics = remove_revoked_deprecated(analytics)
     analytics_by_id = {a["id"]: a for a in analytics}
 
@@ -617,10 +745,11 @@ def detectionStrategiesAnalyticsLogSourcesDf(src):
 def groupsToDf(src):
     """Parse STIX groups from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    groups = src.query([Filter("type", "=", "intrusion-set")])
+    src = get_stix_data_index(src)
+    groups = src.get_objects_by_type("intrusion-set")
     groups = remove_revoked_deprecated(groups)
     group_rows = []
     for group in tqdm(groups, desc="parsing groups"):
@@ -668,10 +797,11 @@ def groupsToDf(src):
 def campaignsToDf(src):
     """Parse STIX campaigns from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    campaigns = src.query([Filter("type", "=", "campaign")])
+    src = get_stix_data_index(src)
+    campaigns = src.get_objects_by_type("campaign")
     campaigns = remove_revoked_deprecated(campaigns)
 
     dataframes = {}
@@ -731,10 +861,11 @@ def campaignsToDf(src):
 def assetsToDf(src):
     """Parse STIX assets from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    assets = src.query([Filter("type", "=", "x-mitre-asset")])
+    src = get_stix_data_index(src)
+    assets = src.get_objects_by_type("x-mitre-asset")
     assets = remove_revoked_deprecated(assets)
 
     dataframes = {}
@@ -821,10 +952,11 @@ def assetsToDf(src):
 def mitigationsToDf(src):
     """Parse STIX mitigations from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
-    mitigations = src.query([Filter("type", "=", "course-of-action")])
+    src = get_stix_data_index(src)
+    mitigations = src.get_objects_by_type("course-of-action")
     mitigations = remove_revoked_deprecated(mitigations)
     mitigation_rows = []
     for mitigation in tqdm(mitigations, desc="parsing mitigations"):
@@ -881,12 +1013,95 @@ class CellRange:
         return "".join(result) + str(row)
 
 
+def _get_platform_filter(platform):
+    """Return the platforms a matrix platform stands for, resolving "groups" of platforms from PLATFORMS_LOOKUP."""
+    return PLATFORMS_LOOKUP[platform] if platform in PLATFORMS_LOOKUP else [platform]
+
+
+def get_subtechniques_by_parent(src):
+    """Map the ID of every technique with sub-technique relationships to its active sub-techniques, sorted by name.
+
+    A technique is present in the mapping as soon as it is the target of a subtechnique-of relationship, even if all
+    of its sub-techniques are revoked or deprecated.
+
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
+    :return: dict of technique ID to a list of sub-technique stix objects
+    """
+    src = get_stix_data_index(src)
+    subtechniques_by_parent = {}
+    relationships = src.get_objects_by_type("relationship")
+    for relationship in filter(lambda x: x["relationship_type"] == "subtechnique-of", relationships):
+        subtechnique = src.get(relationship["source_ref"])
+        subtechniques = subtechniques_by_parent.setdefault(relationship["target_ref"], [])
+        if subtechnique:
+            subtechniques.append(subtechnique)
+
+    for parent_id, subtechniques in subtechniques_by_parent.items():
+        subtechniques_by_parent[parent_id] = sorted(remove_revoked_deprecated(subtechniques), key=lambda x: x["name"])
+    return subtechniques_by_parent
+
+
+def build_matrix_index(src, domain):
+    """Index the techniques of a domain in one pass so that matrices can be laid out without querying the data.
+
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
+    :param domain: domain of ATT&CK src corresponds to, e.g "enterprise-attack"
+    :return: { techniques_by_tactic, subtechniques_by_parent, platform_members } where
+        techniques_by_tactic maps a tactic shortname to its active parent techniques, sorted by name
+        subtechniques_by_parent maps a technique ID to its active sub-techniques, sorted by name
+            (see get_subtechniques_by_parent)
+        platform_members maps each platform of the domain to the IDs of the techniques and sub-techniques on it
+    """
+    src = get_stix_data_index(src)
+    techniques = remove_revoked_deprecated(src.get_objects_by_type("attack-pattern"))
+
+    techniques_by_tactic = {}
+    for technique in techniques:
+        if technique.get("x_mitre_is_subtechnique", False):
+            continue
+        # a technique is only listed once per tactic, even if the phase is repeated
+        phase_names = dict.fromkeys(phase["phase_name"] for phase in technique.get("kill_chain_phases", []))
+        for phase_name in phase_names:
+            techniques_by_tactic.setdefault(phase_name, []).append(technique)
+    for phase_name, tactic_techniques in techniques_by_tactic.items():
+        techniques_by_tactic[phase_name] = sorted(tactic_techniques, key=lambda x: x["name"])
+
+    subtechniques_by_parent = get_subtechniques_by_parent(src)
+    subtechniques = chain.from_iterable(subtechniques_by_parent.values())
+
+    technique_platforms = {}
+    for technique in chain(techniques, subtechniques):
+        technique_platforms[technique["id"]] = {platform.lower() for platform in technique.get("x_mitre_platforms", [])}
+    platform_members = {}
+    for platform in PLATFORMS_LOOKUP[domain]:
+        platform_filter = [entry.lower() for entry in _get_platform_filter(platform)]
+        platform_members[platform] = {
+            technique_id
+            for technique_id, platforms in technique_platforms.items()
+            if any(entry in platforms for entry in platform_filter)
+        }
+
+    return {
+        "techniques_by_tactic": techniques_by_tactic,
+        "subtechniques_by_parent": subtechniques_by_parent,
+        "platform_members": platform_members,
+    }
+
+
 def build_technique_and_sub_columns(
-    src, techniques, columns, merge_data_handle, matrix_grid_handle, tactic_name, platform=None
+    src,
+    techniques,
+    columns,
+    merge_data_handle,
+    matrix_grid_handle,
+    tactic_name,
+    platform=None,
+    subtechniques_by_parent=None,
+    platform_members=None,
 ):
     """Build technique and subtechnique columns for a given matrix and attach them to the appropriate object listings.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :param techniques: List of technique stix objects belong in this tactic column
     :param columns: Existing columns in this matrix (used for placement)
     :param merge_data_handle: Handle to the 'merge' data object for this matrix
@@ -894,40 +1109,35 @@ def build_technique_and_sub_columns(
                                 columns will be appended here)
     :param tactic_name: The name of the corresponding tactic for this column
     :param platform: [Optional] The name of a platform to filter subtechniques by
+    :param subtechniques_by_parent: [Optional] Precomputed sub-techniques of each technique, as built by
+                                    get_subtechniques_by_parent. Built from src if omitted
+    :param platform_members: [Optional] Precomputed IDs of the sub-techniques on `platform`, as built by
+                             build_matrix_index. Sub-techniques are filtered by their platforms if omitted
 
     :return: Nothing (meta - modifies the passed in merge_data_handle and matrix_grid_handle objects)
     """
     techniques_column = []
     subtechniques_column = []
 
-    all_sub_techniques = src.query(
-        [
-            Filter("type", "=", "relationship"),
-            Filter("relationship_type", "=", "subtechnique-of"),
-        ]
-    )
-    all_sub_techniques = MemoryStore(stix_data=all_sub_techniques)
+    if subtechniques_by_parent is None:
+        subtechniques_by_parent = get_subtechniques_by_parent(src)
 
     for technique in techniques:
         techniques_column.append(technique["name"])
 
-        # sub-technique relationships
-        subtechnique_ofs = all_sub_techniques.query([Filter("target_ref", "=", technique["id"])])
-
         # if there are sub-techniques on the tactic
-        if len(subtechnique_ofs) > 0:
+        if technique["id"] in subtechniques_by_parent:
             # top of row range to merge
             technique_top = len(techniques_column) + 1
 
-            subtechniques = [src.get(rel["source_ref"]) for rel in subtechnique_ofs]
-            if platform:
-                subtechniques = filter_platforms(
-                    subtechniques,
-                    PLATFORMS_LOOKUP[platform] if platform in PLATFORMS_LOOKUP else [platform],
-                )
+            subtechniques = subtechniques_by_parent[technique["id"]]
+            if platform and platform_members is not None:
+                subtechniques = [
+                    subtechnique for subtechnique in subtechniques if subtechnique["id"] in platform_members
+                ]
+            elif platform:
+                subtechniques = filter_platforms(subtechniques, _get_platform_filter(platform))
 
-            subtechniques = remove_revoked_deprecated(subtechniques)
-            subtechniques = sorted(subtechniques, key=lambda x: x["name"])
             for i in range(len(subtechniques)):  # for each sub-technique
                 if i != 0:
                     techniques_column.append("")  # first sub-technique is parallel to the technique in the layout
@@ -1020,7 +1230,7 @@ def build_parsed_DF_matrix(matrix_grid, columns, merge, parsed_dict):
 def matricesToDf(src, domain):
     """Parse STIX matrices from the given data and return parsed matrix structures.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :param domain: domain of ATT&CK src corresponds to, e.g "enterprise-attack"
     :returns: [{ matrix, name, description, merge, border }, ... ] where
         matrix is a pandas dataframe of the matrix
@@ -1029,8 +1239,10 @@ def matricesToDf(src, domain):
         merge is a list of CellRange objects that need to be merged for formatting of the sub-techniques in the matrix
         columns is the number of columns in the data
     """
-    matrices = src.query([Filter("type", "=", "x-mitre-matrix")])
+    src = get_stix_data_index(src)
+    matrices = src.get_objects_by_type("x-mitre-matrix")
     matrices = remove_revoked_deprecated(matrices)
+    matrix_index = build_matrix_index(src, domain)
     matrices_parsed = []
     sub_matrices_parsed = []
 
@@ -1056,24 +1268,8 @@ def matricesToDf(src, domain):
             tactic = src.get(tactic_ref)
             columns.append(tactic["name"])  # add tactic header
 
-            # parse techniques in tactic
-            techniques = list(
-                filter(
-                    lambda t: not ("x_mitre_is_subtechnique" in t and t["x_mitre_is_subtechnique"]),
-                    src.query(
-                        [
-                            Filter("type", "=", "attack-pattern"),
-                            Filter(
-                                "kill_chain_phases.phase_name",
-                                "=",
-                                tactic["x_mitre_shortname"],
-                            ),
-                        ]
-                    ),
-                )
-            )
-            techniques = remove_revoked_deprecated(techniques)
-            techniques = sorted(techniques, key=lambda x: x["name"])
+            # techniques in tactic
+            techniques = matrix_index["techniques_by_tactic"].get(tactic["x_mitre_shortname"], [])
             # add techniques
             build_technique_and_sub_columns(
                 src=src,
@@ -1082,16 +1278,15 @@ def matricesToDf(src, domain):
                 merge_data_handle=merge,
                 matrix_grid_handle=matrix_grid,
                 tactic_name=tactic["name"],
+                subtechniques_by_parent=matrix_index["subtechniques_by_parent"],
             )
 
             for platform in PLATFORMS_LOOKUP[domain]:
                 # In order to support "groups" of platforms, each platform is checked against the lookup a second time.
                 # If an second entry can be found, the results from that query will be used, otherwise, the singular
                 # platform will be.
-                a_techs = filter_platforms(
-                    techniques,
-                    PLATFORMS_LOOKUP[platform] if platform in PLATFORMS_LOOKUP else [platform],
-                )
+                platform_members = matrix_index["platform_members"][platform]
+                a_techs = [technique for technique in techniques if technique["id"] in platform_members]
                 if a_techs:
                     sub_matrices_columns[platform].append(tactic["name"])
                     build_technique_and_sub_columns(
@@ -1102,6 +1297,8 @@ def matricesToDf(src, domain):
                         matrix_grid_handle=sub_matrices_grid[platform],
                         tactic_name=tactic["name"],
                         platform=platform,
+                        subtechniques_by_parent=matrix_index["subtechniques_by_parent"],
+                        platform_members=platform_members,
                     )
 
         # square the grid because pandas doesn't like jagged columns
@@ -1144,7 +1341,7 @@ def matricesToDf(src, domain):
 def relationshipsToDf(src, relatedType=None):
     """Parse STIX relationships from the given data and return corresponding pandas dataframes.
 
-    :param src: MemoryStore or other stix2 DataSource object holding the domain data
+    :param src: StixDataIndex, MitreAttackData or stix2 DataSource (e.g MemoryStore) holding the domain data
     :param relatedType: optional, singular attack type to only return relationships with, e.g "mitigation"
     :returns: a lookup of labels (descriptors/names) to dataframes
     """
@@ -1161,45 +1358,11 @@ def relationshipsToDf(src, relatedType=None):
         "datasource": ["x-mitre-data-component"],
         "detectionstrategy": ["x-mitre-detection-strategy"],
     }
-    stixToAttackTerm = {
-        "attack-pattern": "technique",
-        "x-mitre-tactic": "tactic",
-        "tool": "software",
-        "malware": "software",
-        "intrusion-set": "group",
-        "course-of-action": "mitigation",
-        "x-mitre-matrix": "matrix",
-        "x-mitre-data-component": "datacomponent",
-        "x-mitre-data-source": "datasource",
-        "campaign": "campaign",
-        "x-mitre-asset": "asset",
-        "x-mitre-detection-strategy": "detectionstrategy",
-    }
-
-    mitre_attack_data = MitreAttackData(src=src)
 
-    # get master list of relationships
-    relationships = src.query([Filter("type", "=", "relationship")])
-    relationships = remove_revoked_deprecated(relationships)
+    # get master list of relationships, parsed once per index
+    relationships, all_relationship_rows = get_stix_data_index(src).get_relationships()
     relationship_rows = []  # build list of rows for dataframe
-    # tqdm description depends on the related type and parameters
-    iterdesc = "parsing all relationships" if not relatedType else f"parsing relationships for type={relatedType}"
-    for relationship in tqdm(relationships, desc=iterdesc):
-        source = src.get(relationship["source_ref"])  # source object of the relationship
-        target = src.get(relationship["target_ref"])  # target object of the relationship
-
-        # filter if related objects don't exist or are revoked or deprecated
-        if not source or source.get("x_mitre_deprecated", False) is True or source.get("revoked", False) is True:
-            continue
-        if not target or target.get("x_mitre_deprecated", False) is True or target.get("revoked", False) is True:
-            continue
-        if relationship["relationship_type"] == "revoked":
-            continue
-
-        # don't track sub-technique relationships, those are tracked in the techniques df
-        if relationship["relationship_type"] == "subtechnique-of":
-            continue
-
+    for source_type, target_type, row in all_relationship_rows:
         # filter out relationships not with relatedType
         if relatedType:
             related = False
@@ -1207,7 +1370,7 @@ def relationshipsToDf(src, relatedType=None):
             # try all stix types for the ATT&CK type
             for stixTerm in attackToStixTerm[relatedType]:
                 # if any stix type is part of the relationship
-                if source["type"] == stixTerm or target["type"] == stixTerm:
+                if source_type == stixTerm or target_type == stixTerm:
                     related = True
                     break
 
@@ -1215,30 +1378,6 @@ def relationshipsToDf(src, relatedType=None):
                 # skip this relationship if the types don't match
                 continue
 
-        # add mapping data
-        row = {}
-
-        row["source ID"] = mitre_attack_data.get_attack_id(stix_id=source["id"])
-        row["source name"] = source.get("name")
-        row["source ref"] = source.get("id")
-        row["source type"] = stixToAttackTerm.get(source["type"])
-
-        # mapping type goes between the source/target data
-        row["mapping type"] = relationship["relationship_type"]
-
-        row["target ID"] = mitre_attack_data.get_attack_id(stix_id=target["id"])
-        row["target name"] = target.get("name")
-        row["target ref"] = target.get("id")
-        row["target type"] = stixToAttackTerm.get(target["type"])
-
-        if "description" in relationship:  # add description of relationship to the end of the row
-            row["mapping description"] = relationship["description"]
-        # add required fields for workbench import: relationship stix id, created, and modified
-        row["STIX ID"] = relationship["id"]
-        if "created" in relationship:
-            row["created"] = format_date(relationship["created"])
-        if "modified" in relationship:
-            row["last modified"] = format_date(relationship["modified"])
         relationship_rows.append(row)
 
     citations = get_citations(relationships)
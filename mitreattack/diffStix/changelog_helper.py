@@ -1,16 +1,21 @@
 """A helper script to generate changelogs between different versions of ATT&CK."""
 
 import argparse
+import dataclasses
 import datetime
 import difflib
+import hashlib
+import itertools
 import json
 import os
+import pickle
 import re
 import sys
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
 import markdown
 import requests
@@ -24,7 +29,6 @@ from stix2 import Filter, MemoryStore
 from tqdm import tqdm
 
 from mitreattack import release_info
-from mitreattack.stix20 import MitreAttackData
 
 # explanation of modification types to data objects for legend in layer files
 date = datetime.datetime.today()
@@ -36,6 +40,31 @@ layer_defaults = [
     os.path.join("output", f"{this_month}_Updates_Pre.json"),
 ]
 
+# number of object pairs sent to a worker process at a time when diffing with jobs > 1
+DIFF_CHUNK_SIZE = 100
+
+# location of the latest ATT&CK STIX bundles, loaded with use_mitre_cti
+MITRE_CTI_URL = "https://raw.githubusercontent.com/mitre/cti/master"
+
+# fields of the relationships kept by compact_stix_data()
+RELATIONSHIP_FIELDS = ["id", "type", "relationship_type", "source_ref", "target_ref", "revoked", "x_mitre_deprecated"]
+
+# version of the layout of the cached diff results, see DiffStix.save_cache()
+DIFF_CACHE_FORMAT = 4
+
+# fields DiffStix adds to the new ATT&CK objects, which are not part of their STIX content
+CHANGELOG_FIELDS = [
+    "detailed_diff",
+    "revoked_by",
+    "previous_version",
+    "version_change",
+    "description_change_table",
+    "changelog_mitigations",
+    "changelog_datacomponent_detections",
+    "changelog_detectionstrategy_detections",
+    "changelog_relationships",
+]
+
 
 @dataclass
 class AttackObjectVersion:
@@ -104,6 +133,17 @@ class DomainStatistics:
             return f"* {self.name}: {', '.join(parts[:-1])}, and {parts[-1]}"
 
 
+@dataclass
+class ReleaseStatistics:
+    """Statistics for the domains of an ATT&CK release."""
+
+    domains: List[DomainStatistics]
+    # software, groups and campaigns of all domains, counting objects found in several domains once
+    software: int
+    groups: int
+    campaigns: int
+
+
 # TODO: Implement a custom decoder as well. Possible solution at this link
 # https://alexisgomes19.medium.com/custom-json-encoder-with-python-f52c91b48cd2
 class AttackChangesEncoder(json.JSONEncoder):
@@ -132,6 +172,14 @@ class DiffStix(object):
         use_mitre_cti: bool = False,
         verbose: bool = False,
         include_contributors: bool = False,
+        jobs: int = 1,
+        detailed_changes: bool = False,
+        releases: Optional[Dict[str, Dict[str, dict]]] = None,
+        cache_dir: Optional[str] = None,
+        mitre_cti_cache_dir: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        attack_ids: Optional[List[str]] = None,
+        compact: bool = False,
     ):
         """Construct a new DiffStix object.
 
@@ -157,6 +205,32 @@ class DiffStix(object):
             Print progress bar and status messages to stdout, by default False
         include_contributors : bool, optional
             Include contributor information for new contributors, by default False
+        jobs : int, optional
+            Number of worker processes used to load the STIX bundles and to compute the detailed diffs of objects
+            found in both releases. A value of 1 does everything sequentially in the current process, by default 1
+        detailed_changes : bool, optional
+            Add the detailed diff and description change table to changed objects while loading the data.
+            Otherwise they are added by load_detailed_changes() when first needed, by default False
+        releases : Dict[str, Dict[str, dict]], optional
+            Releases already loaded by load_release(), by "old" and/or "new". They are used instead of loading the old
+            or new directory, and their objects are annotated with the changes found, by default None
+        cache_dir : str, optional
+            Directory to cache the diff results in. They are keyed by the SHA-256 hashes of the compared bundles and
+            by the options they depend on, so a later DiffStix object comparing the same bundles loads them from the
+            cache instead of diffing the releases again. Not used with `use_mitre_cti` or `releases`, by default None
+        mitre_cti_cache_dir : str, optional
+            Directory to cache the bundles downloaded from the MITRE CTI repo with `use_mitre_cti` in, along with their
+            parsed data. Cached bundles are revalidated with a conditional request and only downloaded again if they
+            changed, by default None
+        types : List[str], optional
+            Object types to compare, e.g. ["techniques"]. Other types are only parsed as far as the objects in scope
+            need them, e.g. the mitigations of techniques, by default all types
+        attack_ids : List[str], optional
+            ATT&CK IDs of the objects to compare, e.g. ["T1234", "T1234.001"]. Other objects are only parsed as far
+            as the objects in scope need them, e.g. the parent technique of a subtechnique, by default all objects
+        compact : bool, optional
+            Keep less data in memory: the STIX datastores are released once they are parsed, and the parsed data is
+            compacted by compact_stix_data(), by default False
         """
         if domains is None:
             domains = ["enterprise-attack", "mobile-attack", "ics-attack"]
@@ -179,9 +253,25 @@ class DiffStix(object):
             "detectionstrategies",
             "analytics",
         ]
+        if types is not None:
+            unknown_types = set(types) - set(self.types)
+            if unknown_types:
+                raise ValueError(f"Unknown ATT&CK object types: {', '.join(sorted(unknown_types))}")
+            self.types = [object_type for object_type in self.types if object_type in types]
+        self.attack_ids = set(attack_ids) if attack_ids is not None else None
+        self.compact = compact
+        # strings shared by the data of all domains in compact mode, see compact_stix_data()
+        self.compact_strings = {}
         self.use_mitre_cti = use_mitre_cti
         self.verbose = verbose
         self.include_contributors = include_contributors
+        self.jobs = jobs
+        self.detailed_changes = detailed_changes
+        self.detailed_changes_loaded = False
+        self.releases = releases if releases else {}
+        self.cache_dir = cache_dir
+        self.mitre_cti_cache_dir = mitre_cti_cache_dir
+        self.cache_file = None
 
         self.domain_to_domain_label = {
             "enterprise-attack": "Enterprise",
@@ -252,6 +342,14 @@ class DiffStix(object):
                 # },
                 # "software": {...},
             },
+            # relationships added, removed or modified between the releases, by domain
+            "relationship_changes": {
+                # "enterprise-attack": {
+                #     "additions": [{"source_ref": ..., "relationship_type": ..., "target_ref": ...}],
+                #     "deletions": [],
+                #     "modifications": [],
+                # },
+            },
         }
 
         for domain in self.domains:
@@ -264,6 +362,7 @@ class DiffStix(object):
                     },
                     "attack_release_version": None,  # "X.Y"
                     "stix_datastore": None,  # <stix.MemoryStore>
+                    "content_hashes": {},  # {stix_id: canonical SHA-256 of the ATT&CK object}
                     "relationships": {
                         "subtechniques": {},
                         "revoked-by": {},
@@ -273,12 +372,24 @@ class DiffStix(object):
                 for _type in self.types:
                     self.data[datastore_version][domain]["attack_objects"][_type] = {}
 
-        self.load_data()
+        for datastore_version, release in self.releases.items():
+            for domain in self.domains:
+                self.data[datastore_version][domain] = release[domain]
+
+        if self.cache_dir:
+            self.cache_file = self.get_cache_file()
+        if not self.load_cache():
+            self.load_data()
 
     def load_data(self):
         """Load data from files into data dict."""
-        for domain in track(self.domains, description="Loading domains"):
-            self.load_domain(domain=domain)
+        if self.jobs > 1:
+            self.load_domains_concurrently()
+        else:
+            for domain in track(self.domains, description="Loading domains"):
+                self.load_domain(domain=domain)
+        # the compacted data keeps the shared strings alive
+        self.compact_strings = {}
 
         for domain in track(self.domains, description="Finding changes by domain"):
             for obj_type in self.types:
@@ -287,9 +398,15 @@ class DiffStix(object):
                 old_attack_objects = self.data["old"][domain]["attack_objects"][obj_type]
                 new_attack_objects = self.data["new"][domain]["attack_objects"][obj_type]
 
-                intersection = old_attack_objects.keys() & new_attack_objects.keys()
-                additions = new_attack_objects.keys() - old_attack_objects.keys()
-                deletions = old_attack_objects.keys() - new_attack_objects.keys()
+                intersection = self.get_ids_in_scope(
+                    old_attack_objects.keys() & new_attack_objects.keys(), old_attack_objects, new_attack_objects
+                )
+                additions = self.get_ids_in_scope(
+                    new_attack_objects.keys() - old_attack_objects.keys(), old_attack_objects, new_attack_objects
+                )
+                deletions = self.get_ids_in_scope(
+                    old_attack_objects.keys() - new_attack_objects.keys(), old_attack_objects, new_attack_objects
+                )
 
                 # sets to store the ids of objects for each section
                 major_version_changes = set()
@@ -305,10 +422,7 @@ class DiffStix(object):
                     old_stix_obj = old_attack_objects[stix_id]
                     new_stix_obj = new_attack_objects[stix_id]
                     attack_id = get_attack_id(new_stix_obj)
-
-                    ddiff = DeepDiff(old_stix_obj, new_stix_obj, ignore_order=True, verbose_level=2)
-                    detailed_diff = ddiff.to_json()
-                    new_stix_obj["detailed_diff"] = detailed_diff
+                    identical = self.is_identical(domain, stix_id)
 
                     ########################################
                     # Newly revoked objects
@@ -353,7 +467,9 @@ class DiffStix(object):
                         new_version = get_attack_object_version(new_stix_obj)
                         new_stix_obj["previous_version"] = old_version
 
-                        if is_major_version_change(old_version=old_version, new_version=new_version):
+                        if identical:
+                            unchanged.add(stix_id)
+                        elif is_major_version_change(old_version=old_version, new_version=new_version):
                             major_version_changes.add(stix_id)
                         elif is_minor_version_change(old_version=old_version, new_version=new_version):
                             minor_version_changes.add(stix_id)
@@ -370,19 +486,6 @@ class DiffStix(object):
                         if new_version != old_version:
                             new_stix_obj["version_change"] = f"{old_version} → {new_version}"
 
-                        # Description changes
-                        #####################
-                        if "description" in old_stix_obj and "description" in new_stix_obj:
-                            old_lines = old_stix_obj["description"].replace("\n", " ").splitlines()
-                            new_lines = new_stix_obj["description"].replace("\n", " ").splitlines()
-                            old_lines_unique = [line for line in old_lines if line not in new_lines]
-                            new_lines_unique = [line for line in new_lines if line not in old_lines]
-                            if old_lines_unique or new_lines_unique:
-                                html_diff = difflib.HtmlDiff(wrapcolumn=60)
-                                html_diff._legend = ""  # type: ignore[attr-defined]
-                                delta = html_diff.make_table(old_lines, new_lines, "Old Description", "New Description")
-                                new_stix_obj["description_change_table"] = delta
-
                         # Relationship changes
                         ######################
                         if new_stix_obj["type"] == "attack-pattern":
@@ -465,6 +568,289 @@ class DiffStix(object):
 
                 logger.debug(f"Loaded:  [{domain:17}]/{obj_type}")
 
+            self.data["relationship_changes"][domain] = self.find_relationship_changes(domain=domain)
+
+        if self.detailed_changes:
+            # also saves the diff results to the cache
+            self.load_detailed_changes()
+        else:
+            self.save_cache()
+
+    def get_cache_file(self) -> Optional[str]:
+        """Get the path of the cached diff results of the compared bundles and options.
+
+        Returns
+        -------
+        Optional[str]
+            Path to the cache file in `self.cache_dir`, or None if the compared releases are not loaded from files.
+        """
+        if self.use_mitre_cti or self.releases:
+            return None
+
+        cache_key = {
+            "format": DIFF_CACHE_FORMAT,
+            "domains": self.domains,
+            "types": self.types,
+            "attack_ids": sorted(self.attack_ids) if self.attack_ids is not None else None,
+            "unchanged": self.unchanged,
+            "bundles": {
+                datastore_version: {
+                    domain: release_info.get_stix_hash(
+                        stix_file=self.get_stix_file(domain=domain, datastore_version=datastore_version)
+                    )
+                    for domain in self.domains
+                }
+                for datastore_version in ["old", "new"]
+            },
+        }
+        cache_hash = hashlib.sha256(json.dumps(cache_key, sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{cache_hash}.pickle")
+
+    def load_cache(self) -> bool:
+        """Load the diff results from `self.cache_file`, if they were cached.
+
+        Returns
+        -------
+        bool
+            Whether the diff results were loaded from the cache.
+        """
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return False
+
+        try:
+            with open(self.cache_file, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Unable to load cached diff results from {self.cache_file}: {e}")
+            return False
+
+        logger.info(f"Loaded cached diff results from {self.cache_file}")
+        self.data = cached["data"]
+        self.release_contributors = cached["release_contributors"]
+        self.detailed_changes_loaded = cached["detailed_changes_loaded"]
+        if self.detailed_changes:
+            self.load_detailed_changes()
+        return True
+
+    def save_cache(self):
+        """Save the diff results to `self.cache_file`, if the cache is used.
+
+        The STIX datastores are not cached.
+        """
+        if self.cache_file is None:
+            return
+
+        data = {"changes": self.data["changes"], "relationship_changes": self.data["relationship_changes"]}
+        for datastore_version in ["old", "new"]:
+            data[datastore_version] = {
+                domain: {**domain_data, "stix_datastore": None}
+                for domain, domain_data in self.data[datastore_version].items()
+            }
+        cached = {
+            "data": data,
+            "release_contributors": self.release_contributors,
+            "detailed_changes_loaded": self.detailed_changes_loaded,
+        }
+
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so that an interrupted run doesn't leave a truncated cache file behind
+        temporary_file = f"{self.cache_file}.tmp"
+        with open(temporary_file, "wb") as f:
+            # the changes reference the objects of the new release, which pickle keeps shared in a single dump
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, self.cache_file)
+
+    def load_detailed_changes(self):
+        """Add the detailed diff and description change table to the ATT&CK objects found in both releases.
+
+        These are only used by the detailed HTML and JSON output, so they are computed on the first call rather than
+        in load_data(), unless DiffStix was constructed with `detailed_changes=True`.
+        """
+        if self.detailed_changes_loaded:
+            return
+
+        detailed_diffs = self.get_detailed_diffs()
+
+        for domain in self.domains:
+            for obj_type in self.types:
+                old_attack_objects = self.data["old"][domain]["attack_objects"][obj_type]
+                new_attack_objects = self.data["new"][domain]["attack_objects"][obj_type]
+
+                for stix_id in self.get_ids_in_scope(
+                    old_attack_objects.keys() & new_attack_objects.keys(), old_attack_objects, new_attack_objects
+                ):
+                    old_stix_obj = old_attack_objects[stix_id]
+                    new_stix_obj = new_attack_objects[stix_id]
+                    new_stix_obj["detailed_diff"] = detailed_diffs[(domain, stix_id)]
+
+                    # revoked and deprecated objects don't get a description change table
+                    if new_stix_obj.get("revoked") or new_stix_obj.get("x_mitre_deprecated"):
+                        continue
+                    if self.is_identical(domain, stix_id):
+                        continue
+
+                    description_change_table = get_description_change_table(old_stix_obj, new_stix_obj)
+                    if description_change_table:
+                        new_stix_obj["description_change_table"] = description_change_table
+
+        self.detailed_changes_loaded = True
+        self.save_cache()
+
+    def is_scoped(self) -> bool:
+        """Return whether the comparison is scoped to some object types or ATT&CK IDs."""
+        return self.attack_ids is not None or len(self.types) < len(self.attack_type_to_title)
+
+    def get_ids_in_scope(self, stix_ids: Set[str], old_attack_objects: dict, new_attack_objects: dict) -> Set[str]:
+        """Filter STIX IDs down to the ATT&CK objects with one of `self.attack_ids` in either release.
+
+        Objects out of scope can be parsed as the context of objects in scope, e.g. the parent of a subtechnique, but
+        are not compared themselves.
+
+        Parameters
+        ----------
+        stix_ids : Set[str]
+            STIX IDs of ATT&CK objects of a type.
+        old_attack_objects : dict
+            The ATT&CK objects of the type in the old release.
+        new_attack_objects : dict
+            The ATT&CK objects of the type in the new release.
+
+        Returns
+        -------
+        Set[str]
+            The STIX IDs of the objects in scope.
+        """
+        if self.attack_ids is None:
+            return stix_ids
+
+        return {
+            stix_id
+            for stix_id in stix_ids
+            if get_attack_id(old_attack_objects.get(stix_id, {})) in self.attack_ids
+            or get_attack_id(new_attack_objects.get(stix_id, {})) in self.attack_ids
+        }
+
+    def is_identical(self, domain: str, stix_id: str) -> bool:
+        """Determine if an ATT&CK object has the same content in the old and new releases.
+
+        Parameters
+        ----------
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+        stix_id : str
+            The STIX ID of the ATT&CK object.
+
+        Returns
+        -------
+        bool
+            True if the content hashes of the old and new object match.
+        """
+        old_hash = self.data["old"][domain].get("content_hashes", {}).get(stix_id)
+        return old_hash is not None and old_hash == self.data["new"][domain].get("content_hashes", {}).get(stix_id)
+
+    def get_detailed_diffs(self) -> Dict[Tuple[str, str], str]:
+        """Compute the detailed diffs of the ATT&CK objects found in both the old and new releases.
+
+        Identical objects get an empty diff without running DeepDiff. The other objects are diffed in chunks by a pool
+        of `self.jobs` worker processes when `self.jobs` is greater than 1.
+
+        Returns
+        -------
+        Dict[Tuple[str, str], str]
+            A lookup of (domain, STIX ID) to the DeepDiff of the old and new object, serialized as JSON.
+        """
+        detailed_diffs = {}
+        keys = []
+        object_pairs = []
+        for domain in self.domains:
+            for obj_type in self.types:
+                old_attack_objects = self.data["old"][domain]["attack_objects"][obj_type]
+                new_attack_objects = self.data["new"][domain]["attack_objects"][obj_type]
+                for stix_id in sorted(
+                    self.get_ids_in_scope(
+                        old_attack_objects.keys() & new_attack_objects.keys(), old_attack_objects, new_attack_objects
+                    )
+                ):
+                    if self.is_identical(domain, stix_id):
+                        detailed_diffs[(domain, stix_id)] = "{}"
+                        continue
+                    # leave out the fields added by load_data()
+                    new_stix_obj = {
+                        key: value for key, value in new_attack_objects[stix_id].items() if key not in CHANGELOG_FIELDS
+                    }
+                    keys.append((domain, stix_id))
+                    object_pairs.append((old_attack_objects[stix_id], new_stix_obj))
+
+        chunks = [object_pairs[i : i + DIFF_CHUNK_SIZE] for i in range(0, len(object_pairs), DIFF_CHUNK_SIZE)]
+        if self.jobs > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(chunks))) as executor:
+                chunk_diffs = list(executor.map(diff_stix_objects, chunks))
+        else:
+            chunk_diffs = [diff_stix_objects(chunk) for chunk in chunks]
+
+        detailed_diffs.update(zip(keys, [diff for diffs in chunk_diffs for diff in diffs], strict=True))
+        return detailed_diffs
+
+    def find_relationship_changes(self, domain: str) -> Dict[str, List[dict]]:
+        """Find the relationships added, removed or modified between the releases of a domain.
+
+        Relationships are compared by (source_ref, relationship_type, target_ref), so a relationship that is replaced
+        by one with a new STIX ID between the same objects is not reported as a change. The changes are also added to
+        the ATT&CK objects at either end of the relationship, in their "changelog_relationships" field.
+
+        Parameters
+        ----------
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+
+        Returns
+        -------
+        Dict[str, List[dict]]
+            The "additions", "deletions" and "modifications" of relationships, each sorted by their key.
+        """
+        old_edges = self.data["old"][domain]["relationships"].get("edges", {})
+        new_edges = self.data["new"][domain]["relationships"].get("edges", {})
+
+        edge_changes = {
+            "additions": new_edges.keys() - old_edges.keys(),
+            "deletions": old_edges.keys() - new_edges.keys(),
+            "modifications": {
+                edge for edge in new_edges.keys() & old_edges.keys() if new_edges[edge] != old_edges[edge]
+            },
+        }
+        # keys of the changes on each ATT&CK object, as used in the changelog_mitigations field
+        object_change_keys = {"additions": "new", "deletions": "dropped", "modifications": "modified"}
+
+        attack_objects = {}
+        for obj_type in self.types:
+            old_attack_objects = self.data["old"][domain]["attack_objects"][obj_type]
+            new_attack_objects = self.data["new"][domain]["attack_objects"][obj_type]
+            # objects of the new release take precedence over the old ones
+            for stix_id in self.get_ids_in_scope(
+                old_attack_objects.keys() | new_attack_objects.keys(), old_attack_objects, new_attack_objects
+            ):
+                attack_objects[stix_id] = new_attack_objects.get(stix_id, old_attack_objects.get(stix_id))
+
+        relationship_changes = {}
+        for change_type, edges in edge_changes.items():
+            relationship_changes[change_type] = []
+            for source_ref, relationship_type, target_ref in sorted(edges):
+                # when scoped, only report the relationships of the objects in scope
+                if self.is_scoped() and source_ref not in attack_objects and target_ref not in attack_objects:
+                    continue
+                edge = {"source_ref": source_ref, "relationship_type": relationship_type, "target_ref": target_ref}
+                relationship_changes[change_type].append(edge)
+
+                for stix_id in [source_ref, target_ref]:
+                    stix_object = attack_objects.get(stix_id)
+                    if stix_object is None:
+                        continue
+                    if "changelog_relationships" not in stix_object:
+                        stix_object["changelog_relationships"] = {"new": [], "dropped": [], "modified": []}
+                    stix_object["changelog_relationships"][object_change_keys[change_type]].append(edge)
+
+        return relationship_changes
+
     def find_technique_mitigation_changes(self, new_stix_obj: dict, domain: str):
         """Find changes in the relationships between Techniques and Mitigations.
 
@@ -481,21 +867,15 @@ class DiffStix(object):
         old_mitigations = {}
         new_mitigations = {}
 
-        for _, mitigation_relationship in self.data["old"][domain]["relationships"]["mitigations"].items():
-            if mitigation_relationship.get("x_mitre_deprecated") or mitigation_relationship.get("revoked"):
-                continue
-            if stix_id == mitigation_relationship["target_ref"]:
-                old_mitigation_id = mitigation_relationship["source_ref"]
-                old_mitigation = all_old_domain_mitigations[old_mitigation_id]
-                old_mitigations[old_mitigation["id"]] = old_mitigation
+        for mitigation_relationship in self.get_relationships_by_target("old", domain, "mitigations").get(stix_id, []):
+            old_mitigation_id = mitigation_relationship["source_ref"]
+            old_mitigation = all_old_domain_mitigations[old_mitigation_id]
+            old_mitigations[old_mitigation["id"]] = old_mitigation
 
-        for _, mitigation_relationship in self.data["new"][domain]["relationships"]["mitigations"].items():
-            if mitigation_relationship.get("x_mitre_deprecated") or mitigation_relationship.get("revoked"):
-                continue
-            if stix_id == mitigation_relationship["target_ref"]:
-                new_mitigation_id = mitigation_relationship["source_ref"]
-                new_mitigation = all_new_domain_mitigations[new_mitigation_id]
-                new_mitigations[new_mitigation["id"]] = new_mitigation
+        for mitigation_relationship in self.get_relationships_by_target("new", domain, "mitigations").get(stix_id, []):
+            new_mitigation_id = mitigation_relationship["source_ref"]
+            new_mitigation = all_new_domain_mitigations[new_mitigation_id]
+            new_mitigations[new_mitigation["id"]] = new_mitigation
 
         shared_mitigations = old_mitigations.keys() & new_mitigations.keys()
         brand_new_mitigations = new_mitigations.keys() - old_mitigations.keys()
@@ -545,62 +925,56 @@ class DiffStix(object):
         new_datacomponent_detections = {}
         new_detectionstrategy_detections = {}
 
-        for _, detection_relationship in self.data["old"][domain]["relationships"]["detections"].items():
-            if detection_relationship.get("x_mitre_deprecated") or detection_relationship.get("revoked"):
-                continue
-            if stix_id == detection_relationship["target_ref"]:
-                old_sourceref_id = detection_relationship["source_ref"]
-                # Datacomponent -> Data source relation used to exist via x_mitre_data_source_ref.
-                # New STIX may not include parent datasources; attempt explicit ref first, then a heuristic lookup.
-                if old_sourceref_id in all_old_domain_datacomponents:
-                    old_datacomponent = all_old_domain_datacomponents[old_sourceref_id]
-                    old_datasource_id = old_datacomponent.get("x_mitre_data_source_ref")
-                    if not old_datasource_id:
-                        # Best-effort fallback: try to resolve a parent datasource from available datasource objects.
-                        old_datasource_id = resolve_datacomponent_parent(old_datacomponent, all_old_domain_datasources)
-                    if old_datasource_id and old_datasource_id in all_old_domain_datasources:
-                        old_datasource = all_old_domain_datasources[old_datasource_id]
-                        old_datasource_attack_id = get_attack_id(stix_obj=old_datasource)
-                        old_datacomponent_detections[old_sourceref_id] = (
-                            f"{old_datasource_attack_id}: {old_datasource['name']} ({old_datacomponent['name']})"
-                        )
-                    else:
-                        # No parent datasource identified — show the datacomponent name as standalone.
-                        old_datacomponent_detections[old_sourceref_id] = f"{old_datacomponent['name']}"
-                if old_sourceref_id in all_old_domain_detectionstrategies:
-                    old_detectionstrategy = all_old_domain_detectionstrategies[old_sourceref_id]
-                    old_detectionstrategy_attack_id = get_attack_id(stix_obj=old_detectionstrategy)
-                    old_detectionstrategy_detections[old_sourceref_id] = (
-                        f"{old_detectionstrategy_attack_id}: {old_detectionstrategy['name']}"
+        for detection_relationship in self.get_relationships_by_target("old", domain, "detections").get(stix_id, []):
+            old_sourceref_id = detection_relationship["source_ref"]
+            # Datacomponent -> Data source relation used to exist via x_mitre_data_source_ref.
+            # New STIX may not include parent datasources; attempt explicit ref first, then a heuristic lookup.
+            if old_sourceref_id in all_old_domain_datacomponents:
+                old_datacomponent = all_old_domain_datacomponents[old_sourceref_id]
+                old_datasource_id = old_datacomponent.get("x_mitre_data_source_ref")
+                if not old_datasource_id:
+                    # Best-effort fallback: try to resolve a parent datasource from available datasource objects.
+                    old_datasource_id = resolve_datacomponent_parent(old_datacomponent, all_old_domain_datasources)
+                if old_datasource_id and old_datasource_id in all_old_domain_datasources:
+                    old_datasource = all_old_domain_datasources[old_datasource_id]
+                    old_datasource_attack_id = get_attack_id(stix_obj=old_datasource)
+                    old_datacomponent_detections[old_sourceref_id] = (
+                        f"{old_datasource_attack_id}: {old_datasource['name']} ({old_datacomponent['name']})"
                     )
+                else:
+                    # No parent datasource identified — show the datacomponent name as standalone.
+                    old_datacomponent_detections[old_sourceref_id] = f"{old_datacomponent['name']}"
+            if old_sourceref_id in all_old_domain_detectionstrategies:
+                old_detectionstrategy = all_old_domain_detectionstrategies[old_sourceref_id]
+                old_detectionstrategy_attack_id = get_attack_id(stix_obj=old_detectionstrategy)
+                old_detectionstrategy_detections[old_sourceref_id] = (
+                    f"{old_detectionstrategy_attack_id}: {old_detectionstrategy['name']}"
+                )
 
-        for _, detection_relationship in self.data["new"][domain]["relationships"]["detections"].items():
-            if detection_relationship.get("x_mitre_deprecated") or detection_relationship.get("revoked"):
-                continue
-            if stix_id == detection_relationship["target_ref"]:
-                new_sourceref_id = detection_relationship["source_ref"]
-                # Handle datacomponents that may no longer reference a datasource.
-                if new_sourceref_id in all_new_domain_datacomponents:
-                    new_datacomponent = all_new_domain_datacomponents[new_sourceref_id]
-                    new_datasource_id = new_datacomponent.get("x_mitre_data_source_ref")
-                    if not new_datasource_id:
-                        # Best-effort fallback lookup into datasources
-                        new_datasource_id = resolve_datacomponent_parent(new_datacomponent, all_new_domain_datasources)
-                    if new_datasource_id and new_datasource_id in all_new_domain_datasources:
-                        new_datasource = all_new_domain_datasources[new_datasource_id]
-                        new_datasource_attack_id = get_attack_id(stix_obj=new_datasource)
-                        new_datacomponent_detections[new_sourceref_id] = (
-                            f"{new_datasource_attack_id}: {new_datasource['name']} ({new_datacomponent['name']})"
-                        )
-                    else:
-                        # No parent datasource identified — show the datacomponent name as standalone.
-                        new_datacomponent_detections[new_sourceref_id] = f"{new_datacomponent['name']}"
-                if new_sourceref_id in all_new_domain_detectionstrategies:
-                    new_detectionstrategy = all_new_domain_detectionstrategies[new_sourceref_id]
-                    new_detectionstrategy_attack_id = get_attack_id(stix_obj=new_detectionstrategy)
-                    new_detectionstrategy_detections[new_sourceref_id] = (
-                        f"{new_detectionstrategy_attack_id}: {new_detectionstrategy['name']}"
+        for detection_relationship in self.get_relationships_by_target("new", domain, "detections").get(stix_id, []):
+            new_sourceref_id = detection_relationship["source_ref"]
+            # Handle datacomponents that may no longer reference a datasource.
+            if new_sourceref_id in all_new_domain_datacomponents:
+                new_datacomponent = all_new_domain_datacomponents[new_sourceref_id]
+                new_datasource_id = new_datacomponent.get("x_mitre_data_source_ref")
+                if not new_datasource_id:
+                    # Best-effort fallback lookup into datasources
+                    new_datasource_id = resolve_datacomponent_parent(new_datacomponent, all_new_domain_datasources)
+                if new_datasource_id and new_datasource_id in all_new_domain_datasources:
+                    new_datasource = all_new_domain_datasources[new_datasource_id]
+                    new_datasource_attack_id = get_attack_id(stix_obj=new_datasource)
+                    new_datacomponent_detections[new_sourceref_id] = (
+                        f"{new_datasource_attack_id}: {new_datasource['name']} ({new_datacomponent['name']})"
                     )
+                else:
+                    # No parent datasource identified — show the datacomponent name as standalone.
+                    new_datacomponent_detections[new_sourceref_id] = f"{new_datacomponent['name']}"
+            if new_sourceref_id in all_new_domain_detectionstrategies:
+                new_detectionstrategy = all_new_domain_detectionstrategies[new_sourceref_id]
+                new_detectionstrategy_attack_id = get_attack_id(stix_obj=new_detectionstrategy)
+                new_detectionstrategy_detections[new_sourceref_id] = (
+                    f"{new_detectionstrategy_attack_id}: {new_detectionstrategy['name']}"
+                )
 
         shared_datacomponent_detections = old_datacomponent_detections.keys() & new_datacomponent_detections.keys()
         brand_new_datacomponent_detections = new_datacomponent_detections.keys() - old_datacomponent_detections.keys()
@@ -649,25 +1023,96 @@ class DiffStix(object):
             An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
         """
         for datastore_version in ["old", "new"]:
+            if datastore_version in self.releases:
+                continue
             # only allow github.com/mitre/cti to be used for the old STIX domain
             if self.use_mitre_cti and datastore_version == "old":
-                data_store = self.get_datastore_from_mitre_cti(domain=domain, datastore_version=datastore_version)
-            else:
-                directory = self.old if datastore_version == "old" else self.new
-                if directory is None:
-                    raise ValueError(
-                        f"Directory path for {datastore_version} data cannot be None when not using MITRE CTI"
-                    )
-                stix_file = os.path.join(directory, f"{domain}.json")
+                self.load_domain_from_mitre_cti(domain=domain, datastore_version=datastore_version)
+                continue
+
+            stix_file = self.get_stix_file(domain=domain, datastore_version=datastore_version)
+            attack_version, data_store = load_stix_file(stix_file=stix_file, domain=domain)
+            self.data[datastore_version][domain]["attack_release_version"] = attack_version
+            if not self.compact:
+                self.data[datastore_version][domain]["stix_datastore"] = data_store
+            self.parse_extra_data(data_store=data_store, domain=domain, datastore_version=datastore_version)
+
+    def load_domains_concurrently(self):
+        """Load and parse the STIX bundles of all domains in a pool of `self.jobs` worker processes.
+
+        Bundles from the MITRE CTI repo are downloaded and parsed in the current process meanwhile.
+        """
+        stix_files = {}
+        for domain in self.domains:
+            for datastore_version in ["old", "new"]:
+                if datastore_version in self.releases or (self.use_mitre_cti and datastore_version == "old"):
+                    continue
+                stix_files[(datastore_version, domain)] = self.get_stix_file(
+                    domain=domain, datastore_version=datastore_version
+                )
+
+        with ProcessPoolExecutor(max_workers=max(1, min(self.jobs, len(stix_files)))) as executor:
+            futures = {
+                key: executor.submit(
+                    load_and_parse_stix_file, stix_file, key[1], self.types, self.attack_ids, self.compact
+                )
+                for key, stix_file in stix_files.items()
+            }
+
+            if self.use_mitre_cti and "old" not in self.releases:
+                for domain in self.domains:
+                    self.load_domain_from_mitre_cti(domain=domain, datastore_version="old")
 
-                attack_version = release_info.get_attack_version(domain=domain, stix_file=stix_file)
+            for (datastore_version, domain), future in futures.items():
+                attack_version, parsed_data = future.result()
                 self.data[datastore_version][domain]["attack_release_version"] = attack_version
+                self.data[datastore_version][domain].update(parsed_data)
+
+    def get_stix_file(self, domain: str, datastore_version: str) -> str:
+        """Get the path of the STIX bundle of a domain.
+
+        Parameters
+        ----------
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+        datastore_version : str
+            The comparative version of the ATT&CK datastore. Choices are either "old" or "new".
 
-                data_store = MemoryStore()
-                data_store.load_from_file(stix_file)
+        Returns
+        -------
+        str
+            Path to the STIX bundle in the old or new directory.
+        """
+        if self.use_mitre_cti and datastore_version == "old" and self.mitre_cti_cache_dir:
+            return os.path.join(self.mitre_cti_cache_dir, f"{domain}.json")
 
-            self.data[datastore_version][domain]["stix_datastore"] = data_store
+        directory = self.old if datastore_version == "old" else self.new
+        if directory is None:
+            raise ValueError(f"Directory path for {datastore_version} data cannot be None when not using MITRE CTI")
+        return os.path.join(directory, f"{domain}.json")
+
+    def load_domain_from_mitre_cti(self, domain: str, datastore_version: str):
+        """Load and parse a domain from the MITRE CTI repo, through `self.mitre_cti_cache_dir` if it is set.
+
+        Parameters
+        ----------
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+        datastore_version : str
+            The comparative version of the ATT&CK datastore. Choices are either "old" or "new".
+        """
+        if not self.mitre_cti_cache_dir:
+            data_store = self.get_datastore_from_mitre_cti(domain=domain, datastore_version=datastore_version)
+            if not self.compact:
+                self.data[datastore_version][domain]["stix_datastore"] = data_store
             self.parse_extra_data(data_store=data_store, domain=domain, datastore_version=datastore_version)
+            return
+
+        attack_version, parsed_data = load_mitre_cti_domain(domain=domain, cache_dir=self.mitre_cti_cache_dir)
+        if self.compact:
+            parsed_data = compact_stix_data(parsed_data=parsed_data, strings=self.compact_strings)
+        self.data[datastore_version][domain]["attack_release_version"] = attack_version
+        self.data[datastore_version][domain].update(parsed_data)
 
     def get_datastore_from_mitre_cti(self, domain: str, datastore_version: str) -> stix2.MemoryStore:
         """Load data from MITRE CTI repo according to domain.
@@ -685,10 +1130,8 @@ class DiffStix(object):
             STIX MemoryStore object representing an ATT&CK domain.
         """
         error_message = f"Unable to successfully download ATT&CK STIX data from GitHub for {domain}. Please try again."
-        s = requests.Session()
-        retries = Retry(total=10, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
-        s.mount("http", HTTPAdapter(max_retries=retries))
-        stix_url = f"https://raw.githubusercontent.com/mitre/cti/master/{domain}/{domain}.json"
+        s = get_retrying_session()
+        stix_url = get_mitre_cti_url(domain=domain)
         try:
             stix_response = s.get(stix_url, timeout=60)
             if stix_response.status_code != 200:
@@ -719,72 +1162,37 @@ class DiffStix(object):
         datastore_version : str
             The comparative version of the ATT&CK datastore. Choices are either "old" or "new".
         """
-        attack_type_to_stix_filter = {
-            "techniques": [Filter("type", "=", "attack-pattern")],
-            "software": [Filter("type", "=", "malware"), Filter("type", "=", "tool")],
-            "groups": [Filter("type", "=", "intrusion-set")],
-            "campaigns": [Filter("type", "=", "campaign")],
-            "assets": [Filter("type", "=", "x-mitre-asset")],
-            "mitigations": [Filter("type", "=", "course-of-action")],
-            "datasources": [Filter("type", "=", "x-mitre-data-source")],
-            "datacomponents": [Filter("type", "=", "x-mitre-data-component")],
-            "detectionstrategies": [Filter("type", "=", "x-mitre-detection-strategy")],
-            "analytics": [Filter("type", "=", "x-mitre-analytic")],
-        }
-        for object_type, stix_filters in attack_type_to_stix_filter.items():
-            raw_data = []
-            for stix_filter in stix_filters:
-                temp_filtered_list = data_store.query(stix_filter)
-                raw_data.extend(temp_filtered_list)
-
-            raw_data = deep_copy_stix(raw_data)
-            self.data[datastore_version][domain]["attack_objects"][object_type] = {
-                attack_object["id"]: attack_object for attack_object in raw_data
-            }
+        parsed_data = parse_stix_data(data_store=data_store, types=self.types, attack_ids=self.attack_ids)
+        if self.compact:
+            parsed_data = compact_stix_data(parsed_data=parsed_data, strings=self.compact_strings)
+        self.data[datastore_version][domain].update(parsed_data)
 
-        subtechnique_relationships = data_store.query(
-            [
-                Filter("type", "=", "relationship"),
-                Filter("relationship_type", "=", "subtechnique-of"),
-            ]
-        )
-        self.data[datastore_version][domain]["relationships"]["subtechniques"] = {
-            relationship["id"]: relationship for relationship in subtechnique_relationships
-        }
+    def get_relationships_by_target(
+        self, datastore_version: str, domain: str, relationship_key: str
+    ) -> Dict[str, List]:
+        """Get the active relationships of a domain, indexed by their target_ref.
 
-        revoked_by_relationships = data_store.query(
-            [
-                Filter("type", "=", "relationship"),
-                Filter("relationship_type", "=", "revoked-by"),
-            ]
-        )
+        The index is built by parse_extra_data(). It is built here from the relationships if it is missing.
 
-        # use list in case STIX object was revoked more than once
-        for relationship in revoked_by_relationships:
-            source_id = relationship["source_ref"]
-            if source_id not in self.data[datastore_version][domain]["relationships"]["revoked-by"]:
-                self.data[datastore_version][domain]["relationships"]["revoked-by"][source_id] = []
-            self.data[datastore_version][domain]["relationships"]["revoked-by"][source_id].append(relationship)
-
-        mitigating_relationships = data_store.query(
-            [
-                Filter("type", "=", "relationship"),
-                Filter("relationship_type", "=", "mitigates"),
-            ]
-        )
-        self.data[datastore_version][domain]["relationships"]["mitigations"] = {
-            relationship["id"]: relationship for relationship in mitigating_relationships
-        }
+        Parameters
+        ----------
+        datastore_version : str
+            The comparative version of the ATT&CK datastore. Choices are either "old" or "new".
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+        relationship_key : str
+            The relationships to get, either "mitigations" or "detections".
 
-        detection_relationships = data_store.query(
-            [
-                Filter("type", "=", "relationship"),
-                Filter("relationship_type", "=", "detects"),
-            ]
-        )
-        self.data[datastore_version][domain]["relationships"]["detections"] = {
-            relationship["id"]: relationship for relationship in detection_relationships
-        }
+        Returns
+        -------
+        Dict[str, List]
+            A lookup of target STIX IDs to the relationships that are neither deprecated nor revoked.
+        """
+        relationships = self.data[datastore_version][domain]["relationships"]
+        index_key = f"{relationship_key}-by-target"
+        if index_key not in relationships:
+            relationships[index_key] = index_relationships_by_target(relationships.get(relationship_key, {}))
+        return relationships[index_key]
 
     def update_contributors(self, old_object: Optional[dict], new_object: dict):
         """Update contributors list if new object has contributors.
@@ -841,9 +1249,8 @@ class DiffStix(object):
             their parent objects in the same section.
         """
         datastore_version = "old" if section == "deletions" else "new"
-        subtechnique_relationships = self.data[datastore_version][domain]["relationships"]["subtechniques"]
+        hierarchy = self.get_hierarchy(datastore_version=datastore_version, domain=domain)
         techniques = self.data[datastore_version][domain]["attack_objects"]["techniques"]
-        datacomponents = self.data[datastore_version][domain]["attack_objects"]["datacomponents"]
         datasources = self.data[datastore_version][domain]["attack_objects"]["datasources"]
 
         childless = []
@@ -862,34 +1269,24 @@ class DiffStix(object):
 
                 if is_subtechnique:
                     children[stix_object["id"]] = stix_object
-                elif has_subtechniques(stix_object=stix_object, subtechnique_relationships=subtechnique_relationships):
+                elif has_indexed_subtechniques(
+                    stix_object=stix_object, parent_to_children=hierarchy["subtechniques"]["parent_to_children"]
+                ):
                     parents.append(stix_object)
                 else:
                     childless.append(stix_object)
 
         parentToChildren = {}
         # subtechniques
-        for relationship in subtechnique_relationships.values():
-            if relationship["source_ref"] not in children:
-                continue
-
-            parent_technique_stix_id = relationship["target_ref"]
-            the_subtechnique = children[relationship["source_ref"]]
-            if parent_technique_stix_id not in parentToChildren:
-                parentToChildren[parent_technique_stix_id] = []
-            parentToChildren[parent_technique_stix_id].append(the_subtechnique)
+        for child_stix_id, the_subtechnique in children.items():
+            for parent_technique_stix_id in hierarchy["subtechniques"]["child_to_parents"].get(child_stix_id, []):
+                if parent_technique_stix_id not in parentToChildren:
+                    parentToChildren[parent_technique_stix_id] = []
+                parentToChildren[parent_technique_stix_id].append(the_subtechnique)
 
         # datacomponents
-        for datacomponent in datacomponents.values():
-            if datacomponent["id"] not in children:
-                continue
-
-            # Prefer explicit reference, otherwise try a heuristic lookup
-            parent_datasource_id = datacomponent.get("x_mitre_data_source_ref")
-            if not parent_datasource_id:
-                parent_datasource_id = resolve_datacomponent_parent(datacomponent, datasources)
-            the_datacomponent = children[datacomponent["id"]]
-            if parent_datasource_id:
+        for child_stix_id, the_datacomponent in children.items():
+            for parent_datasource_id in hierarchy["datacomponents"]["child_to_parents"].get(child_stix_id, []):
                 if parent_datasource_id not in parentToChildren:
                     parentToChildren[parent_datasource_id] = []
                 parentToChildren[parent_datasource_id].append(the_datacomponent)
@@ -997,15 +1394,14 @@ class DiffStix(object):
         dict
             The parent STIX object, if one can be found. Otherwise an empty dictionary is returned.
         """
-        subtechnique_relationships = self.data[datastore_version][domain]["relationships"]["subtechniques"]
         techniques = self.data[datastore_version][domain]["attack_objects"]["techniques"]
         datasources = self.data[datastore_version][domain]["attack_objects"]["datasources"]
 
         if stix_object.get("x_mitre_is_subtechnique"):
-            for subtechnique_relationship in subtechnique_relationships.values():
-                if subtechnique_relationship["source_ref"] == stix_object["id"]:
-                    parent_id = subtechnique_relationship["target_ref"]
-                    return techniques[parent_id]
+            hierarchy = self.get_hierarchy(datastore_version=datastore_version, domain=domain)
+            parent_ids = hierarchy["subtechniques"]["child_to_parents"].get(stix_object["id"])
+            if parent_ids:
+                return techniques[parent_ids[0]]
         elif stix_object["type"] == "x-mitre-data-component":
             parent_ref = stix_object.get("x_mitre_data_source_ref")
             if parent_ref and parent_ref in datasources:
@@ -1016,6 +1412,37 @@ class DiffStix(object):
         # possible reasons for no parent object: deprecated/revoked/wrong object type passed in
         return {}
 
+    def get_hierarchy(self, datastore_version: str, domain: str) -> Dict[str, dict]:
+        """Get the parent/child index of the subtechniques and data components of a domain.
+
+        The index is built by parse_extra_data(). It is rebuilt here if it is missing, or if the subtechnique
+        relationships or data components it was built from have been replaced or resized since.
+
+        Parameters
+        ----------
+        datastore_version : str
+            The comparative version of the ATT&CK datastore. Choices are either "old" or "new".
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+
+        Returns
+        -------
+        Dict[str, dict]
+            The index built by index_hierarchy().
+        """
+        domain_data = self.data[datastore_version][domain]
+        sources = [domain_data["relationships"]["subtechniques"], domain_data["attack_objects"]["datacomponents"]]
+        hierarchy = domain_data.get("hierarchy")
+        if hierarchy is None or any(
+            source is not indexed_source or len(source) != indexed_length
+            for source, (indexed_source, indexed_length) in zip(sources, hierarchy["sources"], strict=True)
+        ):
+            hierarchy = index_hierarchy(
+                attack_objects=domain_data["attack_objects"], relationships=domain_data["relationships"]
+            )
+            domain_data["hierarchy"] = hierarchy
+        return hierarchy
+
     def prefix_with_parent_name(self, stix_object: dict, datastore_version: str, domain: str, value: str) -> str:
         """Prefix an ATT&CK object display value with its parent name when available."""
         parent_object = self.get_parent_stix_object(
@@ -1118,93 +1545,36 @@ class DiffStix(object):
         full_placard_string = f"{placard_string} {version_string}"
         return full_placard_string
 
-    def _collect_domain_statistics(self, datastore: MemoryStore, domain_name: str) -> DomainStatistics:
-        """
-        Collect statistics for a single domain from a STIX datastore.
-
-        Parameters
-        ----------
-        datastore : MemoryStore
-            The STIX MemoryStore containing the domain data.
-        domain_name : str
-            Display name of the domain (e.g., "Enterprise", "Mobile", "ICS").
-
-        Returns
-        -------
-        DomainStatistics
-            Statistics for the domain.
-        """
-        # Create MitreAttackData instance from the datastore
-        data = MitreAttackData(src=datastore)
-
-        # Get all object types, removing revoked and deprecated
-        tactics = data.get_tactics(remove_revoked_deprecated=True)
-        techniques = data.get_techniques(include_subtechniques=False, remove_revoked_deprecated=True)
-        subtechniques = data.get_subtechniques(remove_revoked_deprecated=True)
-        groups = data.get_groups(remove_revoked_deprecated=True)
-        software = data.get_software(remove_revoked_deprecated=True)
-        campaigns = data.get_campaigns(remove_revoked_deprecated=True)
-        mitigations = data.get_mitigations(remove_revoked_deprecated=True)
-        assets = data.get_assets(remove_revoked_deprecated=True)
-        datasources = data.get_datasources(remove_revoked_deprecated=True)
-        detectionstrategies = data.get_detectionstrategies(remove_revoked_deprecated=True)
-        analytics = data.get_analytics(remove_revoked_deprecated=True)
-        datacomponents = data.get_datacomponents(remove_revoked_deprecated=True)
-
-        return DomainStatistics(
-            name=domain_name,
-            tactics=len(tactics),
-            techniques=len(techniques),
-            subtechniques=len(subtechniques),
-            groups=len(groups),
-            software=len(software),
-            campaigns=len(campaigns),
-            mitigations=len(mitigations),
-            assets=len(assets),
-            datasources=len(datasources),
-            detectionstrategies=len(detectionstrategies),
-            analytics=len(analytics),
-            datacomponents=len(datacomponents),
-        )
-
-    def _collect_unique_object_counts(self, datastore_version: str) -> dict[str, int]:
-        """
-        Collect counts of unique objects across all domains for a specific version.
-
-        Some objects (Software, Groups, Campaigns) may appear in multiple domains.
-        This function counts unique objects to avoid double-counting.
+    def get_statistics(self, datastore_version: str = "new") -> ReleaseStatistics:
+        """Get the statistics of a release, as collected by parse_stix_data() while parsing its domains.
 
         Parameters
         ----------
-        datastore_version : str
-            Either "old" or "new" to specify which version's data to analyze.
+        datastore_version : str, optional
+            Either "old" or "new" to specify which version's statistics to get, by default "new"
 
         Returns
         -------
-        dict of str to int
-            Counts of unique software, groups, and campaigns.
+        ReleaseStatistics
+            The statistics of each domain, and the software, groups and campaigns of all domains counted once.
         """
-        all_software_ids = set()
-        all_groups_ids = set()
-        all_campaigns_ids = set()
-
+        domain_statistics = []
+        unique_ids = {"software": set(), "groups": set(), "campaigns": set()}
         for domain in self.domains:
-            datastore = self.data[datastore_version][domain]["stix_datastore"]
-            data = MitreAttackData(src=datastore)
-
-            software = data.get_software(remove_revoked_deprecated=True)
-            groups = data.get_groups(remove_revoked_deprecated=True)
-            campaigns = data.get_campaigns(remove_revoked_deprecated=True)
-
-            all_software_ids.update(obj["id"] for obj in software)
-            all_groups_ids.update(obj["id"] for obj in groups)
-            all_campaigns_ids.update(obj["id"] for obj in campaigns)
-
-        return {
-            "software": len(all_software_ids),
-            "groups": len(all_groups_ids),
-            "campaigns": len(all_campaigns_ids),
-        }
+            domain_data = self.data[datastore_version][domain]
+            domain_statistics.append(
+                dataclasses.replace(domain_data["statistics"], name=self.domain_to_domain_label[domain])
+            )
+            # some objects (software, groups and campaigns) are in several domains and are only counted once
+            for object_type, stix_ids in unique_ids.items():
+                stix_ids.update(domain_data["active_ids"][object_type])
+
+        return ReleaseStatistics(
+            domains=domain_statistics,
+            software=len(unique_ids["software"]),
+            groups=len(unique_ids["groups"]),
+            campaigns=len(unique_ids["campaigns"]),
+        )
 
     def get_statistics_section(self, datastore_version: str = "new") -> str:
         """
@@ -1221,26 +1591,17 @@ class DiffStix(object):
         str
             Markdown-formatted statistics section.
         """
-        # Collect unique object counts across all domains
-        unique_counts = self._collect_unique_object_counts(datastore_version)
-
-        # Collect statistics for each domain
-        domain_stats = []
-        for domain in self.domains:
-            datastore = self.data[datastore_version][domain]["stix_datastore"]
-            domain_label = self.domain_to_domain_label[domain]
-            stats = self._collect_domain_statistics(datastore, domain_label)
-            domain_stats.append(stats)
+        statistics = self.get_statistics(datastore_version=datastore_version)
 
         # Build the statistics section
         output = "## Statistics\n\n"
         output += (
-            f"This version of ATT&CK contains {unique_counts['software']} Software, "
-            f"{unique_counts['groups']} Groups, and {unique_counts['campaigns']} Campaigns.\n\n"
+            f"This version of ATT&CK contains {statistics.software} Software, "
+            f"{statistics.groups} Groups, and {statistics.campaigns} Campaigns.\n\n"
         )
         output += "Broken out by domain:\n\n"
 
-        for stats in domain_stats:
+        for stats in statistics.domains:
             output += stats.format_output() + "\n"
 
         output += "\n"
@@ -1248,18 +1609,17 @@ class DiffStix(object):
 
     def get_markdown_section_data(self, groupings, section: str, domain: str) -> str:
         """Parse a list of STIX objects in a section and return a string for the whole section."""
-        sectionString = ""
-        placard_string = ""
+        lines = []
         for grouping in groupings:
             if grouping["parent"]:
                 placard_string = self.placard(stix_object=grouping["parent"], section=section, domain=domain)
-                sectionString += f"* {placard_string}\n"
+                lines.append(f"* {placard_string}\n")
 
             for child in sorted(grouping["children"], key=lambda child: child["name"]):
                 placard_string = self.placard(stix_object=child, section=section, domain=domain)
-                sectionString += f"* {placard_string}\n"
+                lines.append(f"* {placard_string}\n")
 
-        return sectionString
+        return "".join(lines)
 
     def get_md_key(self) -> str:
         """Create string describing each type of difference (change, addition, etc).
@@ -1289,42 +1649,66 @@ class DiffStix(object):
 
     def get_markdown_string(self) -> str:
         """Return a markdown string summarizing detected differences."""
+        return "".join(self.iter_markdown())
+
+    def write_markdown(self, file: TextIO):
+        """Write the markdown summarizing detected differences to a file one section at a time.
+
+        Parameters
+        ----------
+        file : TextIO
+            File object opened for writing text.
+        """
+        file.writelines(self.iter_markdown())
+
+    def iter_markdown(self) -> Iterator[str]:
+        """Generate the markdown summarizing detected differences in chunks, without holding all of it in memory.
+
+        Yields
+        ------
+        str
+            The next chunk of the markdown, e.g. a section of changed objects.
+        """
         logger.info("Generating markdown output")
-        content = ""
 
         # Add contributors if requested by argument
         if self.include_contributors:
-            content += self.get_contributor_section()
-            content += "\n"
+            yield self.get_contributor_section()
+            yield "\n"
 
         # Add statistics section for the new version
         logger.info("Generating statistics section")
-        stats_section = self.get_statistics_section(datastore_version="new")
-        content += stats_section
+        yield self.get_statistics_section(datastore_version="new")
 
         if self.show_key:
             key_content = self.get_md_key()
-            content += f"{key_content}\n"
+            yield f"{key_content}\n"
 
-        content += "## Table of Contents\n\n"
-        content += "[TOC]\n\n"
+        yield "## Table of Contents\n\n"
+        yield "[TOC]\n\n"
 
         for object_type in self.types:
-            domains = ""
-
+            domains = []
             for domain in self.data["changes"][object_type]:
-                # e.g "Enterprise"
-                next_domain = f"### {self.domain_to_domain_label[domain]}\n\n"
                 # Skip mobile section for data sources
                 if domain == "mobile-attack" and object_type == "datasource":
                     logger.debug("Skipping - ATT&CK for Mobile does not support data sources")
-                    next_domain += "ATT&CK for Mobile does not support data sources\n\n"
                     continue
-                domain_sections = ""
-                for section, stix_objects in self.data["changes"][object_type][domain].items():
-                    header = f"#### {self.section_headers[object_type][section]}"
-                    if stix_objects:
-                        groupings = self.get_groupings(
+                if any(self.data["changes"][object_type][domain].values()):
+                    domains.append(domain)
+
+            # e.g "techniques"
+            if not domains:
+                continue
+            yield f"## {self.attack_type_to_title[object_type]}\n\n"
+
+            for domain in domains:
+                # e.g "Enterprise"
+                yield f"### {self.domain_to_domain_label[domain]}\n\n"
+                for section, stix_objects in self.data["changes"][object_type][domain].items():
+                    header = f"#### {self.section_headers[object_type][section]}"
+                    if stix_objects:
+                        groupings = self.get_groupings(
                             object_type=object_type,
                             stix_objects=stix_objects,
                             section=section,
@@ -1333,17 +1717,7 @@ class DiffStix(object):
                         section_items = self.get_markdown_section_data(
                             groupings=groupings, section=section, domain=domain
                         )
-                        domain_sections += f"{header}\n\n{section_items}\n"
-
-                # add domain sections
-                if domain_sections != "":
-                    domains += f"{next_domain}{domain_sections}"
-
-            # e.g "techniques"
-            if domains != "":
-                content += f"## {self.attack_type_to_title[object_type]}\n\n{domains}"
-
-        return content
+                        yield f"{header}\n\n{section_items}\n"
 
     def get_layers_dict(self):
         """Return ATT&CK Navigator layers in dict format summarizing detected differences.
@@ -1371,7 +1745,7 @@ class DiffStix(object):
             logger.debug(f"Generating ATT&CK Navigator layer for domain: {domain}")
             # build techniques list
             techniques = []
-            for section, technique_stix_objects in self.data["changes"]["techniques"][domain].items():
+            for section, technique_stix_objects in self.data["changes"].get("techniques", {}).get(domain, {}).items():
                 if section == "revocations" or section == "deprecations":
                     continue
 
@@ -1429,6 +1803,8 @@ class DiffStix(object):
         """Return dict format summarizing detected differences."""
         logger.info("Generating changes info")
 
+        self.load_detailed_changes()
+
         changes_dict = {}
         for domain in self.domains:
             changes_dict[domain] = {}
@@ -1449,6 +1825,9 @@ class DiffStix(object):
                     new_values = cleanup_values(groupings=groupings)
                     changes_dict[domain][object_type][section] = new_values
 
+        for domain, relationship_changes in self.data["relationship_changes"].items():
+            changes_dict[domain]["relationships"] = relationship_changes
+
         # always add contributors
         changes_dict["new-contributors"] = []
         sorted_contributors = sorted(self.release_contributors, key=lambda v: v.lower())
@@ -1460,6 +1839,93 @@ class DiffStix(object):
 
         return changes_dict
 
+    def iter_jsonl_records(self, include_diff: bool = False) -> Iterator[dict]:
+        """Generate a compact record of each changed ATT&CK object and relationship, one at a time.
+
+        Unlike get_changes_dict(), the records only hold the IDs of the objects rather than the objects themselves,
+        and the detailed diffs are computed as the records are generated if they were not loaded already.
+
+        Parameters
+        ----------
+        include_diff : bool, optional
+            Add the detailed diff of the objects found in both releases to their records, by default False
+
+        Yields
+        ------
+        dict
+            The record of the next change, e.g. {"domain": "enterprise-attack", "type": "techniques",
+            "section": "minor_version_changes", "id": "attack-pattern--...", "attack_id": "T1234", ...}
+        """
+        for object_type, domains in self.data["changes"].items():
+            for domain, sections in domains.items():
+                old_attack_objects = self.data["old"][domain]["attack_objects"][object_type]
+                for section, stix_objects in sections.items():
+                    for stix_object in stix_objects:
+                        previous_version = stix_object.get("previous_version")
+                        record = {
+                            "domain": domain,
+                            "type": object_type,
+                            "section": section,
+                            "id": stix_object["id"],
+                            "attack_id": get_attack_id(stix_object),
+                            "name": stix_object["name"],
+                            "previous_version": str(previous_version) if previous_version else None,
+                            "version": str(get_attack_object_version(stix_obj=stix_object)),
+                        }
+                        if include_diff and section != "deletions" and stix_object["id"] in old_attack_objects:
+                            record["detailed_diff"] = json.loads(
+                                self.get_detailed_diff(
+                                    domain=domain,
+                                    old_stix_obj=old_attack_objects[stix_object["id"]],
+                                    new_stix_obj=stix_object,
+                                )
+                            )
+                        yield record
+
+        for domain, relationship_changes in self.data["relationship_changes"].items():
+            for section, relationships in relationship_changes.items():
+                for relationship in relationships:
+                    yield {"domain": domain, "type": "relationships", "section": section, **relationship}
+
+    def get_detailed_diff(self, domain: str, old_stix_obj: dict, new_stix_obj: dict) -> str:
+        """Get the detailed diff of an ATT&CK object found in both releases, computing it if it was not loaded.
+
+        Parameters
+        ----------
+        domain : str
+            An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+        old_stix_obj : dict
+            The ATT&CK object in the old release.
+        new_stix_obj : dict
+            The ATT&CK object in the new release.
+
+        Returns
+        -------
+        str
+            The DeepDiff of the old and new object, serialized as JSON.
+        """
+        if "detailed_diff" in new_stix_obj:
+            return new_stix_obj["detailed_diff"]
+        if self.is_identical(domain, new_stix_obj["id"]):
+            return "{}"
+        # leave out the fields added by load_data()
+        new_stix_obj = {key: value for key, value in new_stix_obj.items() if key not in CHANGELOG_FIELDS}
+        return diff_stix_objects([(old_stix_obj, new_stix_obj)])[0]
+
+    def write_jsonl(self, file: TextIO, include_diff: bool = False):
+        """Write the changes to a file in JSON Lines format, one record of iter_jsonl_records() per line.
+
+        Parameters
+        ----------
+        file : TextIO
+            A text file opened for writing.
+        include_diff : bool, optional
+            Add the detailed diff of the objects found in both releases to their records, by default False
+        """
+        for record in self.iter_jsonl_records(include_diff=include_diff):
+            file.write(json.dumps(record, cls=AttackChangesEncoder, separators=(",", ":")))
+            file.write("\n")
+
 
 def has_subtechniques(stix_object: dict, subtechnique_relationships: Dict[str, dict]) -> bool:
     """Return true or false depending on whether the SDO has sub-techniques.
@@ -1483,6 +1949,24 @@ def has_subtechniques(stix_object: dict, subtechnique_relationships: Dict[str, d
     return False
 
 
+def has_indexed_subtechniques(stix_object: dict, parent_to_children: Dict[str, List[str]]) -> bool:
+    """Return true or false depending on whether the SDO has sub-techniques, using the index of index_hierarchy().
+
+    Parameters
+    ----------
+    stix_object : dict
+        An ATT&CK STIX Domain Object (SDO).
+    parent_to_children : Dict[str, List[str]]
+        Lookup of technique STIX IDs to the STIX IDs of their subtechniques, as indexed by index_hierarchy().
+
+    Returns
+    -------
+    bool
+        Returns True if the stix_object has Subtechniques.
+    """
+    return bool(parent_to_children.get(stix_object["id"]))
+
+
 def get_placard_version_string(stix_object: dict, section: str) -> str:
     """Get the HTML version representation of the ATT&CK STIX object.
 
@@ -1505,50 +1989,810 @@ def get_placard_version_string(stix_object: dict, section: str) -> str:
     object_version = get_attack_object_version(stix_obj=stix_object)
     version_display = f"(v{object_version})"
 
-    if section in ["additions", "deprecations", "revocations"]:
-        # only display current version
-        if not version_increment_is_valid(old_version=None, new_version=object_version, section=section):
-            color = red
+    if section in ["additions", "deprecations", "revocations"]:
+        # only display current version
+        if not version_increment_is_valid(old_version=None, new_version=object_version, section=section):
+            color = red
+
+    elif section == "deletions":
+        color = red
+
+    # nothing needs to be added to this statement - it just needs to skip the 'else' clause
+    elif section == "patches":
+        pass
+
+    else:
+        # the "previous_version" key was added in the load_data() function
+        old_version = stix_object.get("previous_version")
+        if not version_increment_is_valid(old_version=old_version, new_version=object_version, section=section):
+            color = red
+        version_display = f"(v{old_version}&#8594;v{object_version})"
+
+    return f'<small style="color:{color}">{version_display}</small>'
+
+
+def cleanup_values(groupings: List[dict]) -> List[dict]:
+    """Clean the values found in the initial groupings of ATT&CK Objects.
+
+    Parameters
+    ----------
+    groupings : List[dict]
+        Whatever comes out of DiffStix.get_groupings()
+
+    Returns
+    -------
+    List[dict]
+        A cleaned up version of groupings.
+    """
+    new_values = []
+    for grouping in groupings:
+        if grouping["parent"]:
+            new_values.append(grouping["parent"])
+
+        for child in sorted(grouping["children"], key=lambda child: child["name"]):
+            new_values.append(child)
+
+    return new_values
+
+
+def get_description_change_table(old_stix_obj: dict, new_stix_obj: dict) -> Optional[str]:
+    """Create an HTML table showing the differences between the descriptions of two versions of an ATT&CK object.
+
+    Parameters
+    ----------
+    old_stix_obj : dict
+        Old ATT&CK STIX Domain Object (SDO).
+    new_stix_obj : dict
+        New ATT&CK STIX Domain Object (SDO).
+
+    Returns
+    -------
+    Optional[str]
+        The HTML table, or None if either object has no description or the descriptions are the same.
+    """
+    if "description" not in old_stix_obj or "description" not in new_stix_obj:
+        return None
+
+    old_lines = old_stix_obj["description"].replace("\n", " ").splitlines()
+    new_lines = new_stix_obj["description"].replace("\n", " ").splitlines()
+    old_lines_unique = [line for line in old_lines if line not in new_lines]
+    new_lines_unique = [line for line in new_lines if line not in old_lines]
+    if not old_lines_unique and not new_lines_unique:
+        return None
+
+    html_diff = difflib.HtmlDiff(wrapcolumn=60)
+    html_diff._legend = ""  # type: ignore[attr-defined]
+    return html_diff.make_table(old_lines, new_lines, "Old Description", "New Description")
+
+
+def parse_stix_data(
+    data_store: stix2.MemoryStore, types: Optional[List[str]] = None, attack_ids: Optional[Set[str]] = None
+) -> dict:
+    """Parse the ATT&CK objects and relationships of a STIX datastore into plain dictionaries.
+
+    When the objects are scoped by type or ATT&CK ID, only the objects in scope are copied and hashed for the
+    comparison, along with the objects they need in the changelog: their parents, the objects revoking them, and the
+    mitigations and detections of techniques. Statistics are always collected for the whole domain.
+
+    Parameters
+    ----------
+    data_store : stix2.MemoryStore
+        STIX MemoryStore object representing an ATT&CK domain.
+    types : List[str], optional
+        Object types to parse, e.g. ["techniques", "mitigations"], by default all types
+    attack_ids : Set[str], optional
+        ATT&CK IDs of the objects to parse, e.g. {"T1234", "T1234.001"}, by default all objects
+
+    Returns
+    -------
+    dict
+        The "attack_objects", "content_hashes", "relationships", "hierarchy", "statistics" and "active_ids" of the
+        domain, as stored in DiffStix.data.
+    """
+    attack_type_to_stix_filter = {
+        "techniques": [Filter("type", "=", "attack-pattern")],
+        "software": [Filter("type", "=", "malware"), Filter("type", "=", "tool")],
+        "groups": [Filter("type", "=", "intrusion-set")],
+        "campaigns": [Filter("type", "=", "campaign")],
+        "assets": [Filter("type", "=", "x-mitre-asset")],
+        "mitigations": [Filter("type", "=", "course-of-action")],
+        "datasources": [Filter("type", "=", "x-mitre-data-source")],
+        "datacomponents": [Filter("type", "=", "x-mitre-data-component")],
+        "detectionstrategies": [Filter("type", "=", "x-mitre-detection-strategy")],
+        "analytics": [Filter("type", "=", "x-mitre-analytic")],
+    }
+    stix_objects_by_type = {}
+    for object_type, stix_filters in attack_type_to_stix_filter.items():
+        stix_objects_by_type[object_type] = {}
+        for stix_filter in stix_filters:
+            stix_objects_by_type[object_type].update(
+                (stix_object["id"], stix_object) for stix_object in data_store.query(stix_filter)
+            )
+
+    relationships = {}
+    subtechnique_relationships = data_store.query(
+        [
+            Filter("type", "=", "relationship"),
+            Filter("relationship_type", "=", "subtechnique-of"),
+        ]
+    )
+    relationships["subtechniques"] = {relationship["id"]: relationship for relationship in subtechnique_relationships}
+
+    revoked_by_relationships = data_store.query(
+        [
+            Filter("type", "=", "relationship"),
+            Filter("relationship_type", "=", "revoked-by"),
+        ]
+    )
+
+    # use list in case STIX object was revoked more than once
+    relationships["revoked-by"] = {}
+    for relationship in revoked_by_relationships:
+        source_id = relationship["source_ref"]
+        if source_id not in relationships["revoked-by"]:
+            relationships["revoked-by"][source_id] = []
+        relationships["revoked-by"][source_id].append(relationship)
+
+    mitigating_relationships = data_store.query(
+        [
+            Filter("type", "=", "relationship"),
+            Filter("relationship_type", "=", "mitigates"),
+        ]
+    )
+    relationships["mitigations"] = {relationship["id"]: relationship for relationship in mitigating_relationships}
+
+    detection_relationships = data_store.query(
+        [
+            Filter("type", "=", "relationship"),
+            Filter("relationship_type", "=", "detects"),
+        ]
+    )
+    relationships["detections"] = {relationship["id"]: relationship for relationship in detection_relationships}
+
+    tactics = data_store.query([Filter("type", "=", "x-mitre-tactic")])
+
+    # index the active relationships by target so technique changes don't need to scan every relationship
+    for relationship_key in ["mitigations", "detections"]:
+        relationships[f"{relationship_key}-by-target"] = index_relationships_by_target(relationships[relationship_key])
+
+    scope = None
+    context = set()
+    if attack_ids is not None or (types is not None and set(types) != set(attack_type_to_stix_filter)):
+        scope = {
+            stix_id
+            for object_type, stix_objects in stix_objects_by_type.items()
+            if types is None or object_type in types
+            for stix_id, stix_object in stix_objects.items()
+            if attack_ids is None or get_attack_id(stix_object) in attack_ids
+        }
+        context = get_context_ids(scope=scope, stix_objects_by_type=stix_objects_by_type, relationships=relationships)
+
+    attack_objects = {}
+    content_hashes = {}
+    for object_type, stix_objects in stix_objects_by_type.items():
+        if scope is None:
+            raw_data = list(stix_objects.values())
+        else:
+            raw_data = [
+                stix_object for stix_id, stix_object in stix_objects.items() if stix_id in scope or stix_id in context
+            ]
+
+        raw_data = deep_copy_stix(raw_data)
+        attack_objects[object_type] = {attack_object["id"]: attack_object for attack_object in raw_data}
+        # hashed before the objects are annotated with changelog details by load_data()
+        content_hashes.update(
+            {
+                attack_object["id"]: get_content_hash(attack_object)
+                for attack_object in raw_data
+                if scope is None or attack_object["id"] in scope
+            }
+        )
+
+    relationships["edges"] = index_relationship_edges(
+        relationship
+        for relationship in data_store.query([Filter("type", "=", "relationship")])
+        if scope is None or relationship["source_ref"] in scope or relationship["target_ref"] in scope
+    )
+
+    return {
+        "attack_objects": attack_objects,
+        "content_hashes": content_hashes,
+        "relationships": relationships,
+        "hierarchy": index_hierarchy(attack_objects=attack_objects, relationships=relationships),
+        "statistics": collect_domain_statistics(attack_objects=stix_objects_by_type, tactics=tactics),
+        # some objects are in several domains, and are only counted once in the statistics of a release
+        "active_ids": {
+            object_type: {
+                stix_id for stix_id, stix_object in stix_objects_by_type[object_type].items() if is_active(stix_object)
+            }
+            for object_type in ["software", "groups", "campaigns"]
+        },
+    }
+
+
+def get_context_ids(
+    scope: Set[str], stix_objects_by_type: Dict[str, Dict[str, dict]], relationships: Dict[str, dict]
+) -> Set[str]:
+    """Get the STIX IDs of the objects needed to describe the changes of the objects in scope.
+
+    These are the parents of subtechniques and data components, which their placards and groupings are shown under,
+    the objects revoking them, and the mitigations and detections of techniques, with the parents of data components.
+
+    Parameters
+    ----------
+    scope : Set[str]
+        STIX IDs of the ATT&CK objects in scope.
+    stix_objects_by_type : Dict[str, Dict[str, dict]]
+        The ATT&CK objects of a domain by type.
+    relationships : Dict[str, dict]
+        The relationships of a domain, as parsed by parse_stix_data().
+
+    Returns
+    -------
+    Set[str]
+        STIX IDs of the objects out of scope that are needed as context.
+    """
+    stix_objects = {}
+    for objects in stix_objects_by_type.values():
+        stix_objects.update(objects)
+
+    context = set()
+    for relationship in relationships["subtechniques"].values():
+        if relationship["source_ref"] in scope:
+            context.add(relationship["target_ref"])
+
+    for stix_id in scope:
+        for relationship in relationships["revoked-by"].get(stix_id, []):
+            context.add(relationship["target_ref"])
+        if stix_objects[stix_id]["type"] == "attack-pattern":
+            for relationship_key in ["mitigations", "detections"]:
+                for relationship in relationships[f"{relationship_key}-by-target"].get(stix_id, []):
+                    context.add(relationship["source_ref"])
+
+    # data components in scope or detecting techniques are shown with their data source
+    for stix_id in scope | context:
+        parent_ref = stix_objects.get(stix_id, {}).get("x_mitre_data_source_ref")
+        if parent_ref:
+            context.add(parent_ref)
+
+    return context - scope
+
+
+def intern_strings(value, strings: Dict[str, str]):
+    """Copy a value parsed from STIX, replacing each string by the first equal string found in `strings`.
+
+    Parameters
+    ----------
+    value
+        A string, or a dict, list, set or tuple of values, e.g. an ATT&CK object.
+    strings : Dict[str, str]
+        The strings seen so far, which the strings of the value are added to.
+
+    Returns
+    -------
+    The copied value. Values of other types are returned as is.
+    """
+    if isinstance(value, str):
+        return strings.setdefault(value, value)
+    if isinstance(value, dict):
+        return {intern_strings(key, strings): intern_strings(item, strings) for key, item in value.items()}
+    if isinstance(value, (list, set, tuple)):
+        return type(value)(intern_strings(item, strings) for item in value)
+    return value
+
+
+def compact_stix_data(parsed_data: dict, strings: Optional[Dict[str, str]] = None) -> dict:
+    """Shrink the data parsed by parse_stix_data() so that it no longer refers to the STIX datastore it came from.
+
+    Repeated strings, such as STIX IDs, platforms and source names, are shared between all objects. Relationships
+    are reduced to the fields the changelog uses, so the STIX objects of the datastore can be freed.
+
+    Parameters
+    ----------
+    parsed_data : dict
+        The data parsed by parse_stix_data().
+    strings : Dict[str, str], optional
+        Strings to share with previously compacted data, e.g. of the other domains of a release, by default None
+
+    Returns
+    -------
+    dict
+        The compacted data, with the same layout as the parsed data.
+    """
+    if strings is None:
+        strings = {}
+
+    compact_relationships = {}
+
+    def compact_relationship(relationship) -> dict:
+        if relationship["id"] not in compact_relationships:
+            compact_relationships[relationship["id"]] = intern_strings(
+                {key: relationship[key] for key in RELATIONSHIP_FIELDS if key in relationship}, strings
+            )
+        return compact_relationships[relationship["id"]]
+
+    relationships = {}
+    for relationship_key, relationship_data in parsed_data["relationships"].items():
+        if relationship_key == "edges":
+            relationships[relationship_key] = intern_strings(relationship_data, strings)
+        else:
+            # lookups of STIX IDs to relationships or lists of relationships
+            relationships[relationship_key] = {
+                strings.setdefault(stix_id, stix_id): (
+                    [compact_relationship(relationship) for relationship in value]
+                    if isinstance(value, list)
+                    else compact_relationship(value)
+                )
+                for stix_id, value in relationship_data.items()
+            }
+
+    attack_objects = intern_strings(parsed_data["attack_objects"], strings)
+    return {
+        **parsed_data,
+        "attack_objects": attack_objects,
+        "content_hashes": intern_strings(parsed_data["content_hashes"], strings),
+        "relationships": relationships,
+        "hierarchy": index_hierarchy(attack_objects=attack_objects, relationships=relationships),
+        "active_ids": intern_strings(parsed_data["active_ids"], strings),
+    }
+
+
+def read_stix_file(stix_file: str, domain: str) -> Tuple[Optional[str], dict]:
+    """Read an ATT&CK STIX bundle, determining its ATT&CK release from the same read of the file.
+
+    Parameters
+    ----------
+    stix_file : str
+        Path to the STIX bundle.
+    domain : str
+        An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+
+    Returns
+    -------
+    Tuple[Optional[str], dict]
+        The ATT&CK release of the bundle, or None if it is not a known release, and the parsed JSON of the bundle.
+    """
+    with open(stix_file, "rb") as f:
+        stix_content = f.read()
+    attack_version = release_info.get_attack_version(domain=domain, stix_content=stix_content)
+    return attack_version, json.loads(stix_content)
+
+
+def load_stix_file(stix_file: str, domain: str) -> Tuple[Optional[str], stix2.MemoryStore]:
+    """Load an ATT&CK STIX bundle into a datastore, determining its ATT&CK release from the same read of the file.
+
+    Parameters
+    ----------
+    stix_file : str
+        Path to the STIX bundle.
+    domain : str
+        An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+
+    Returns
+    -------
+    Tuple[Optional[str], stix2.MemoryStore]
+        The ATT&CK release of the bundle, or None if it is not a known release, and the loaded bundle.
+    """
+    attack_version, stix_bundle = read_stix_file(stix_file=stix_file, domain=domain)
+    return attack_version, MemoryStore(stix_data=stix_bundle)
+
+
+def load_and_parse_stix_file(
+    stix_file: str,
+    domain: str,
+    types: Optional[List[str]] = None,
+    attack_ids: Optional[Set[str]] = None,
+    compact: bool = False,
+) -> Tuple[Optional[str], dict]:
+    """Load an ATT&CK STIX bundle and parse it in a worker process.
+
+    The datastore itself can't be sent back to the parent process, since custom STIX objects can't be pickled.
+
+    Parameters
+    ----------
+    stix_file : str
+        Path to the STIX bundle.
+    domain : str
+        An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+    types : List[str], optional
+        Object types to parse, see parse_stix_data(), by default all types
+    attack_ids : Set[str], optional
+        ATT&CK IDs of the objects to parse, see parse_stix_data(), by default all objects
+    compact : bool, optional
+        Compact the parsed data with compact_stix_data(), by default False
+
+    Returns
+    -------
+    Tuple[Optional[str], dict]
+        The ATT&CK release of the bundle and the data parsed by parse_stix_data().
+    """
+    attack_version, data_store = load_stix_file(stix_file=stix_file, domain=domain)
+    parsed_data = parse_stix_data(data_store=data_store, types=types, attack_ids=attack_ids)
+    if compact:
+        parsed_data = compact_stix_data(parsed_data=parsed_data)
+    return attack_version, parsed_data
+
+
+def get_mitre_cti_url(domain: str) -> str:
+    """Get the URL of the latest STIX bundle of a domain in the MITRE CTI repo.
+
+    Parameters
+    ----------
+    domain : str
+        An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+
+    Returns
+    -------
+    str
+        URL of the STIX bundle.
+    """
+    return f"{MITRE_CTI_URL}/{domain}/{domain}.json"
+
+
+def get_retrying_session() -> requests.Session:
+    """Get a requests session that retries failed requests to the MITRE CTI repo."""
+    session = requests.Session()
+    retries = Retry(total=10, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    session.mount("http", HTTPAdapter(max_retries=retries))
+    return session
+
+
+def load_mitre_cti_domain(domain: str, cache_dir: str) -> Tuple[Optional[str], dict]:
+    """Load and parse the latest STIX bundle of a domain from the MITRE CTI repo, caching it in a directory.
+
+    A cached bundle is revalidated with a conditional request, using the ETag and Last-Modified headers of the
+    response it was downloaded with, and is only downloaded again if it changed. If the MITRE CTI repo can't be
+    reached, the cached bundle is used as is. The parsed data of each bundle is cached as well, by the SHA-256 hash
+    of the bundle that identifies ATT&CK releases in `release_info`.
+
+    Parameters
+    ----------
+    domain : str
+        An ATT&CK domain from the following list ["enterprise-attack", "mobile-attack", "ics-attack"]
+    cache_dir : str
+        Directory to cache the bundle and its parsed data in.
+
+    Returns
+    -------
+    Tuple[Optional[str], dict]
+        The ATT&CK release of the bundle, or None if it is not a known release, and the data parsed by
+        parse_stix_data().
+    """
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    bundle_file = os.path.join(cache_dir, f"{domain}.json")
+    metadata_file = os.path.join(cache_dir, f"{domain}.meta.json")
+    error_message = f"Unable to successfully download ATT&CK STIX data from GitHub for {domain}. Please try again."
+
+    metadata = {}
+    if os.path.exists(bundle_file) and os.path.exists(metadata_file):
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+        # don't trust a bundle that was modified or truncated since it was downloaded
+        if release_info.get_stix_hash(stix_file=bundle_file) != metadata.get("sha256"):
+            logger.warning(f"Cached STIX bundle {bundle_file} does not match its hash, downloading it again")
+            metadata = {}
+
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+
+    try:
+        stix_response = get_retrying_session().get(get_mitre_cti_url(domain=domain), headers=headers, timeout=60)
+    except requests.exceptions.RequestException as e:
+        if not metadata:
+            raise
+        logger.warning(f"Unable to revalidate cached STIX bundle {bundle_file}, using it as is: {e}")
+        stix_response = None
+
+    if stix_response is None or stix_response.status_code == 304:
+        logger.info(f"Using cached STIX bundle {bundle_file}")
+    elif stix_response.status_code == 200:
+        temporary_file = f"{bundle_file}.tmp"
+        with open(temporary_file, "wb") as f:
+            f.write(stix_response.content)
+        os.replace(temporary_file, bundle_file)
+        metadata = {
+            "etag": stix_response.headers.get("ETag"),
+            "last_modified": stix_response.headers.get("Last-Modified"),
+            "sha256": release_info.get_stix_hash(stix_content=stix_response.content),
+            "attack_release_version": release_info.get_attack_version(
+                domain=domain, stix_content=stix_response.content
+            ),
+        }
+        with open(metadata_file, "w") as f:
+            json.dump(metadata, f, indent=4)
+    elif metadata:
+        logger.warning(f"Unable to revalidate cached STIX bundle {bundle_file}, using it as is")
+    else:
+        logger.error(error_message)
+        sys.exit(1)
+
+    parsed_file = os.path.join(cache_dir, f"{domain}-{metadata['sha256']}-{DIFF_CACHE_FORMAT}.pickle")
+    if os.path.exists(parsed_file):
+        try:
+            with open(parsed_file, "rb") as f:
+                return metadata["attack_release_version"], pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Unable to load cached STIX data from {parsed_file}: {e}")
+
+    with open(bundle_file, "rb") as f:
+        stix_json = json.load(f)
+    parsed_data = parse_stix_data(data_store=MemoryStore(stix_data=stix_json["objects"]))
+
+    # only keep the parsed data of the current bundle
+    for cached_file in Path(cache_dir).glob(f"{domain}-*.pickle"):
+        cached_file.unlink()
+    temporary_file = f"{parsed_file}.tmp"
+    with open(temporary_file, "wb") as f:
+        pickle.dump(parsed_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file, parsed_file)
+
+    return metadata["attack_release_version"], parsed_data
+
+
+def load_release(
+    directory: str,
+    domains: Optional[List[str]] = None,
+    jobs: int = 1,
+    types: Optional[List[str]] = None,
+    attack_ids: Optional[List[str]] = None,
+    compact: bool = False,
+) -> Dict[str, dict]:
+    """Load and parse the STIX bundles of an ATT&CK release once, to be compared by several DiffStix objects.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to load the STIX bundles of the release from.
+    domains : List[str], optional
+        List of domains to load, by default ["enterprise-attack", "mobile-attack", "ics-attack"]
+    jobs : int, optional
+        Number of worker processes used to load the domains, by default 1
+    types : List[str], optional
+        Object types to parse, see parse_stix_data(), by default all types
+    attack_ids : List[str], optional
+        ATT&CK IDs of the objects to parse, see parse_stix_data(), by default all objects
+    compact : bool, optional
+        Compact the parsed data of each domain with compact_stix_data(), by default False
+
+    Returns
+    -------
+    Dict[str, dict]
+        A lookup of domains to their parsed data, as stored in DiffStix.data["old"] or DiffStix.data["new"].
+    """
+    if domains is None:
+        domains = ["enterprise-attack", "mobile-attack", "ics-attack"]
+    stix_files = [os.path.join(directory, f"{domain}.json") for domain in domains]
+    if attack_ids is not None:
+        attack_ids = set(attack_ids)
+
+    if jobs > 1 and len(domains) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(domains))) as executor:
+            results = list(
+                executor.map(
+                    load_and_parse_stix_file,
+                    stix_files,
+                    domains,
+                    itertools.repeat(types),
+                    itertools.repeat(attack_ids),
+                    itertools.repeat(compact),
+                )
+            )
+    else:
+        results = [
+            load_and_parse_stix_file(stix_file, domain, types, attack_ids, compact)
+            for stix_file, domain in zip(stix_files, domains, strict=True)
+        ]
+
+    release = {}
+    for domain, (attack_version, parsed_data) in zip(domains, results, strict=True):
+        release[domain] = {"attack_release_version": attack_version, "stix_datastore": None, **parsed_data}
+    return release
+
+
+def remove_changelog_fields(release: Dict[str, dict]):
+    """Remove the fields added by DiffStix from the objects of a release loaded by load_release().
+
+    This lets the "new" release of one comparison be used as the "old" release of the next one.
+
+    Parameters
+    ----------
+    release : Dict[str, dict]
+        A release loaded by load_release().
+    """
+    for domain_data in release.values():
+        for attack_objects in domain_data["attack_objects"].values():
+            for stix_object in attack_objects.values():
+                for field in CHANGELOG_FIELDS:
+                    stix_object.pop(field, None)
+
+
+def get_content_hash(stix_obj: dict) -> str:
+    """Compute a canonical hash of the content of a STIX object, independent of the order of its keys.
+
+    Parameters
+    ----------
+    stix_obj : dict
+        An ATT&CK STIX Domain Object (SDO).
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the object serialized as JSON with sorted keys.
+    """
+    content = json.dumps(stix_obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def diff_stix_objects(object_pairs: List[Tuple[dict, dict]]) -> List[str]:
+    """Compute the detailed diffs of pairs of ATT&CK objects.
+
+    Parameters
+    ----------
+    object_pairs : List[Tuple[dict, dict]]
+        A list of (old, new) ATT&CK STIX Domain Objects (SDO) with the same STIX ID.
+
+    Returns
+    -------
+    List[str]
+        The DeepDiff of each pair, serialized as JSON.
+    """
+    return [
+        DeepDiff(old_stix_obj, new_stix_obj, ignore_order=True, verbose_level=2).to_json()
+        for old_stix_obj, new_stix_obj in object_pairs
+    ]
+
+
+def index_relationships_by_target(relationships: Dict[str, dict]) -> Dict[str, List[dict]]:
+    """Index relationships by their target_ref, leaving out deprecated and revoked relationships.
+
+    Parameters
+    ----------
+    relationships : Dict[str, dict]
+        A lookup of relationship STIX IDs to relationships.
+
+    Returns
+    -------
+    Dict[str, List[dict]]
+        A lookup of target STIX IDs to the relationships that target them.
+    """
+    relationships_by_target = {}
+    for relationship in relationships.values():
+        if relationship.get("x_mitre_deprecated") or relationship.get("revoked"):
+            continue
+        relationships_by_target.setdefault(relationship["target_ref"], []).append(relationship)
+    return relationships_by_target
+
+
+def is_active(stix_object: dict) -> bool:
+    """Return whether an ATT&CK object is neither revoked nor deprecated, like MitreAttackData.remove_revoked_deprecated().
+
+    Parameters
+    ----------
+    stix_object : dict
+        An ATT&CK STIX Domain Object (SDO).
+
+    Returns
+    -------
+    bool
+        Whether the object is active.
+    """
+    return stix_object.get("x_mitre_deprecated", False) is False and stix_object.get("revoked", False) is False
+
+
+def collect_domain_statistics(attack_objects: Dict[str, Dict[str, dict]], tactics: List[dict]) -> DomainStatistics:
+    """Count the active objects of each type of a domain, as the MitreAttackData getters would return them.
+
+    Parameters
+    ----------
+    attack_objects : Dict[str, Dict[str, dict]]
+        The ATT&CK objects of a domain by type, as parsed by parse_stix_data().
+    tactics : List[dict]
+        The tactics of the domain.
+
+    Returns
+    -------
+    DomainStatistics
+        Statistics for the domain, without a display name.
+    """
+    counts = {
+        object_type: sum(1 for stix_object in stix_objects.values() if is_active(stix_object))
+        for object_type, stix_objects in attack_objects.items()
+    }
+    active_techniques = [stix_object for stix_object in attack_objects["techniques"].values() if is_active(stix_object)]
+    return DomainStatistics(
+        name="",
+        tactics=sum(1 for tactic in tactics if is_active(tactic)),
+        # like MitreAttackData.get_techniques(include_subtechniques=False), which requires the property to be set
+        techniques=sum(1 for technique in active_techniques if technique.get("x_mitre_is_subtechnique") is False),
+        subtechniques=sum(1 for technique in active_techniques if technique.get("x_mitre_is_subtechnique") is True),
+        groups=counts["groups"],
+        software=counts["software"],
+        campaigns=counts["campaigns"],
+        mitigations=counts["mitigations"],
+        assets=counts["assets"],
+        datasources=counts["datasources"],
+        detectionstrategies=counts["detectionstrategies"],
+        analytics=counts["analytics"],
+        datacomponents=counts["datacomponents"],
+    )
 
-    elif section == "deletions":
-        color = red
 
-    # nothing needs to be added to this statement - it just needs to skip the 'else' clause
-    elif section == "patches":
-        pass
+def index_relationship_edges(relationships: Iterable[dict]) -> Dict[Tuple[str, str, str], str]:
+    """Index relationships by (source_ref, relationship_type, target_ref), to compare them between releases.
 
-    else:
-        # the "previous_version" key was added in the load_data() function
-        old_version = stix_object.get("previous_version")
-        if not version_increment_is_valid(old_version=old_version, new_version=object_version, section=section):
-            color = red
-        version_display = f"(v{old_version}&#8594;v{object_version})"
+    Deprecated and revoked relationships are left out, as are revoked-by relationships, which are reported as
+    revocations of the objects they revoke.
 
-    return f'<small style="color:{color}">{version_display}</small>'
+    Parameters
+    ----------
+    relationships : Iterable[dict]
+        The relationships of a domain.
+
+    Returns
+    -------
+    Dict[Tuple[str, str, str], str]
+        A lookup of relationship keys to the content hash of the relationship, see get_content_hash().
+    """
+    edges = {}
+    for relationship in relationships:
+        if relationship.get("x_mitre_deprecated") or relationship.get("revoked"):
+            continue
+        if relationship["relationship_type"] == "revoked-by":
+            continue
+        edge = (relationship["source_ref"], relationship["relationship_type"], relationship["target_ref"])
+        edges[edge] = get_content_hash(dict(relationship))
+    return edges
 
 
-def cleanup_values(groupings: List[dict]) -> List[dict]:
-    """Clean the values found in the initial groupings of ATT&CK Objects.
+def index_hierarchy(attack_objects: Dict[str, dict], relationships: Dict[str, dict]) -> Dict[str, dict]:
+    """Index the parents and children of the subtechniques and data components of a domain.
 
     Parameters
     ----------
-    groupings : List[dict]
-        Whatever comes out of DiffStix.get_groupings()
+    attack_objects : Dict[str, dict]
+        The ATT&CK objects of a domain by type, as parsed by parse_stix_data().
+    relationships : Dict[str, dict]
+        The relationships of a domain, as parsed by parse_stix_data().
 
     Returns
     -------
-    List[dict]
-        A cleaned up version of groupings.
+    Dict[str, dict]
+        For both "subtechniques" and "datacomponents", a "parent_to_children" and a "child_to_parents" lookup of STIX
+        IDs to lists of STIX IDs, in the order of the relationships. "sources" holds the subtechnique relationships and
+        data components the index was built from, along with their sizes.
     """
-    new_values = []
-    for grouping in groupings:
-        if grouping["parent"]:
-            new_values.append(grouping["parent"])
+    subtechnique_relationships = relationships["subtechniques"]
+    datacomponents = attack_objects["datacomponents"]
+    hierarchy = {
+        "subtechniques": {"parent_to_children": {}, "child_to_parents": {}},
+        "datacomponents": {"parent_to_children": {}, "child_to_parents": {}},
+        "sources": [
+            (subtechnique_relationships, len(subtechnique_relationships)),
+            (datacomponents, len(datacomponents)),
+        ],
+    }
 
-        for child in sorted(grouping["children"], key=lambda child: child["name"]):
-            new_values.append(child)
+    for relationship in subtechnique_relationships.values():
+        hierarchy["subtechniques"]["parent_to_children"].setdefault(relationship["target_ref"], []).append(
+            relationship["source_ref"]
+        )
+        hierarchy["subtechniques"]["child_to_parents"].setdefault(relationship["source_ref"], []).append(
+            relationship["target_ref"]
+        )
 
-    return new_values
+    for datacomponent in datacomponents.values():
+        # Prefer explicit reference, otherwise try a heuristic lookup
+        parent_datasource_id = resolve_datacomponent_parent(datacomponent, attack_objects["datasources"])
+        if parent_datasource_id:
+            hierarchy["datacomponents"]["parent_to_children"].setdefault(parent_datasource_id, []).append(
+                datacomponent["id"]
+            )
+            hierarchy["datacomponents"]["child_to_parents"][datacomponent["id"]] = [parent_datasource_id]
+
+    return hierarchy
 
 
 def resolve_datacomponent_parent(datacomponent: dict, datasources: Dict[str, dict]) -> Optional[str]:
@@ -1890,6 +3134,8 @@ def write_detailed_html(html_file_detailed: str, diffStix: DiffStix, additional_
     additional_formats_prefix : str, optional
         Prefix for links to generated layer and JSON files, by default "".
     """
+    diffStix.load_detailed_changes()
+
     old_version = diffStix.data["old"]["enterprise-attack"]["attack_release_version"]
     new_version = diffStix.data["new"]["enterprise-attack"]["attack_release_version"]
 
@@ -1954,16 +3200,16 @@ def write_detailed_html(html_file_detailed: str, diffStix: DiffStix, additional_
 
     with open(html_file_detailed, "w", encoding="utf-8", errors="xmlcharrefreplace") as file:
         file.writelines(frontmatter)
+        # lines are written after each object, so that only one object's HTML is held in memory at a time
         lines = []
         for object_type, domain_data in diffStix.data["changes"].items():
-            # this is an obnoxious way of determining if there are changes in any of the sections for any of the domains
-            if sum([sum(change_types.values(), []) for change_types in domain_data.values()], []):
+            if any(any(change_types.values()) for change_types in domain_data.values()):
                 lines.append(f"<h2>{diffStix.attack_type_to_title[object_type]}</h2>")
             else:
                 continue
 
             for domain, change_types in domain_data.items():
-                if sum(change_types.values(), []):
+                if any(change_types.values()):
                     lines.append(f"<h3>{domain}</h3>")
                 else:
                     continue
@@ -2180,6 +3426,9 @@ def write_detailed_html(html_file_detailed: str, diffStix: DiffStix, additional_
                                 lines.append("</tbody></table>")
                             lines.append("</details>")
 
+                        file.writelines(lines)
+                        lines.clear()
+
                     if change_data:
                         lines.append("</details>")
 
@@ -2228,6 +3477,34 @@ def get_parsed_args():
         help="Which domains to report on. Choices (and defaults) are %(choices)s",
     )
 
+    parser.add_argument(
+        "--types",
+        type=str,
+        nargs="+",
+        choices=[
+            "techniques",
+            "software",
+            "groups",
+            "campaigns",
+            "assets",
+            "mitigations",
+            "datasources",
+            "datacomponents",
+            "detectionstrategies",
+            "analytics",
+        ],
+        metavar="TYPE",
+        help="Which object types to report on, by default all of them. Choices are %(choices)s",
+    )
+
+    parser.add_argument(
+        "--attack-ids",
+        type=str,
+        nargs="+",
+        metavar="ATTACK_ID",
+        help="Only report on the objects with these ATT&CK IDs, e.g. '--attack-ids T1234 T1234.001 S0001'",
+    )
+
     parser.add_argument(
         "--markdown-file",
         type=str,
@@ -2252,6 +3529,19 @@ def get_parsed_args():
         help="Create a JSON file reporting changes.",
     )
 
+    parser.add_argument(
+        "--jsonl",
+        type=str,
+        metavar="JSONL_FILE",
+        help="Stream a JSON Lines file reporting changes, with one compact record per changed object or relationship.",
+    )
+
+    parser.add_argument(
+        "--jsonl-diff",
+        action="store_true",
+        help="Add the detailed diff of each modified object to the records of --jsonl",
+    )
+
     parser.add_argument(
         "--layers",
         type=str,
@@ -2308,6 +3598,53 @@ def get_parsed_args():
     )
     parser.set_defaults(contributors=True)
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to diff the objects found in both releases, by default 1",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory to cache the diff results in, so that comparing the same releases again reuses them.",
+    )
+
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use less memory by releasing the STIX bundles once they are parsed and sharing repeated strings.",
+    )
+
+    parser.add_argument(
+        "--mitre-cti-cache-dir",
+        type=str,
+        help=(
+            "Directory to cache the STIX bundles downloaded with --use-mitre-cti in. Cached bundles are only "
+            "downloaded again if they changed on GitHub."
+        ),
+    )
+
+    parser.add_argument(
+        "--chain",
+        type=str,
+        nargs="+",
+        metavar="RELEASE",
+        help=(
+            "Directories of releases to compare in order, e.g. '--chain v14.1 v15.0 v15.1'. Writes the changelog of "
+            "each consecutive pair to its own folder of --chain-output-dir, loading each release only once. "
+            "Output file options are relative to each folder."
+        ),
+    )
+
+    parser.add_argument(
+        "--chain-output-dir",
+        type=str,
+        default="output",
+        help="Directory to write the changelogs of --chain to, by default output",
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -2327,10 +3664,22 @@ def get_parsed_args():
     if args.use_mitre_cti and args.old:
         parser.error("--use-mitre-cti and -old cannot be used together")
 
+    if args.chain is not None:
+        if len(args.chain) < 2:
+            parser.error("--chain requires at least two releases")
+        if args.use_mitre_cti or args.old:
+            parser.error("--chain cannot be used with --use-mitre-cti or --old")
+        # DiffStix doesn't use the diff cache for the releases of a chain, which are loaded by load_release()
+        if args.cache_dir:
+            parser.error("--chain cannot be used with --cache-dir")
+
     # set a default directory that doesn't conflict with use_mitre_cti
     if not args.old:
         args.old = "old"
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
     if args.layers is not None:
         if len(args.layers) not in [0, 3]:
             parser.error("-layers requires exactly three files to be specified or none at all")
@@ -2338,6 +3687,97 @@ def get_parsed_args():
     return args
 
 
+def write_changelog_files(
+    diffStix: DiffStix,
+    md_string: Optional[str] = None,
+    layers: Optional[List[str]] = None,
+    markdown_file: Optional[str] = None,
+    html_file: Optional[str] = None,
+    html_file_detailed: Optional[str] = None,
+    additional_formats_prefix: str = "",
+    json_file: Optional[str] = None,
+    jsonl_file: Optional[str] = None,
+    jsonl_diff: bool = False,
+):
+    """Write the requested output files of a changelog.
+
+    Parameters
+    ----------
+    diffStix : DiffStix
+        An instance of a DiffStix object.
+    md_string : str, optional
+        The Markdown string representation of the changes, as returned by DiffStix.get_markdown_string(). If not
+        given, the markdown file is streamed with DiffStix.write_markdown() unless an HTML file is requested,
+        by default None
+    layers : List[str], optional
+        Array of output filenames for layer files, by default None
+    markdown_file : str, optional
+        If set, writes a markdown file, by default None
+    html_file : str, optional
+        If set, writes an HTML file from the parsed markdown, by default None
+    html_file_detailed : str, optional
+        If set, writes a more detailed HTML page, by default None
+    additional_formats_prefix : str, optional
+        Prefix for detailed HTML links to generated layer and JSON files, by default "".
+    json_file : str, optional
+        If set, writes JSON file of the changes, by default None
+    jsonl_file : str, optional
+        If set, streams a JSON Lines file with a record per change, by default None
+    jsonl_diff : bool, optional
+        Add the detailed diff of modified objects to the records of `jsonl_file`, by default False
+    """
+    if md_string is None and html_file:
+        # the HTML is converted from the whole markdown string
+        md_string = diffStix.get_markdown_string()
+
+    if markdown_file:
+        logger.info("Writing markdown to file")
+        Path(markdown_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(markdown_file, "w") as file:
+            if md_string is None:
+                diffStix.write_markdown(file)
+            else:
+                file.write(md_string)
+
+    if html_file:
+        markdown_to_html(outfile=html_file, content=md_string, diffStix=diffStix)
+
+    if html_file_detailed:
+        Path(html_file_detailed).parent.mkdir(parents=True, exist_ok=True)
+        logger.info("Writing detailed updates to file")
+        write_detailed_html(
+            html_file_detailed=html_file_detailed,
+            diffStix=diffStix,
+            additional_formats_prefix=additional_formats_prefix,
+        )
+
+    if layers:
+        if len(layers) == 0:
+            # no files specified, e.g. '-layers', use defaults
+            diffStix.layers = layer_defaults
+            layers = layer_defaults
+        elif len(layers) == 3:
+            # files specified, e.g. '-layers file.json file2.json file3.json', use specified
+            # assumes order of files is enterprise, mobile, pre attack (same order as defaults)
+            diffStix.layers = layers
+
+        layers_dict = diffStix.get_layers_dict()
+        layers_dict_to_files(outfiles=layers, layers=layers_dict)
+
+    if json_file:
+        changes_dict = diffStix.get_changes_dict()
+
+        logger.info("Writing JSON updates to file")
+        Path(json_file).parent.mkdir(parents=True, exist_ok=True)
+        json.dump(changes_dict, open(json_file, "w"), cls=AttackChangesEncoder, indent=4)
+
+    if jsonl_file:
+        logger.info("Writing JSON Lines updates to file")
+        Path(jsonl_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(jsonl_file, "w") as file:
+            diffStix.write_jsonl(file, include_diff=jsonl_diff)
+
+
 def get_new_changelog_md(
     domains: Optional[List[str]] = None,
     layers: List[str] = layer_defaults,
@@ -2354,6 +3794,14 @@ def get_new_changelog_md(
     html_file_detailed: Optional[str] = None,
     additional_formats_prefix: str = "",
     json_file: Optional[str] = None,
+    jsonl_file: Optional[str] = None,
+    jsonl_diff: bool = False,
+    jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    mitre_cti_cache_dir: Optional[str] = None,
+    types: Optional[List[str]] = None,
+    attack_ids: Optional[List[str]] = None,
+    compact: bool = False,
 ) -> str:
     """Get a Markdown string representation of differences between two ATT&CK versions.
 
@@ -2391,6 +3839,23 @@ def get_new_changelog_md(
         Prefix for detailed HTML links to generated layer and JSON files, by default "".
     json_file : str, optional
         If set, writes JSON file of the changes, by default None
+    jsonl_file : str, optional
+        If set, streams a JSON Lines file with a record per change, by default None
+    jsonl_diff : bool, optional
+        Add the detailed diff of modified objects to the records of `jsonl_file`, by default False
+    jobs : int, optional
+        Number of worker processes used to diff the objects found in both releases, by default 1
+    cache_dir : str, optional
+        If set, directory to cache the diff results in, so that they are reused when the same releases are compared
+        again, by default None
+    mitre_cti_cache_dir : str, optional
+        If set with `use_mitre_cti`, directory to cache the downloaded STIX data in, by default None
+    types : List[str], optional
+        Object types to compare, e.g. ["techniques"], by default all types
+    attack_ids : List[str], optional
+        ATT&CK IDs of the objects to compare, e.g. ["T1234", "T1234.001"], by default all objects
+    compact : bool, optional
+        Release the STIX datastores once they are parsed and compact the parsed data, by default False
 
     Returns
     -------
@@ -2422,56 +3887,205 @@ def get_new_changelog_md(
         use_mitre_cti=use_mitre_cti,
         verbose=verbose,
         include_contributors=include_contributors,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        mitre_cti_cache_dir=mitre_cti_cache_dir,
+        types=types,
+        attack_ids=attack_ids,
+        compact=compact,
     )
 
     md_string = diffStix.get_markdown_string()
+    write_changelog_files(
+        diffStix=diffStix,
+        md_string=md_string,
+        layers=layers,
+        markdown_file=markdown_file,
+        html_file=html_file,
+        html_file_detailed=html_file_detailed,
+        additional_formats_prefix=additional_formats_prefix,
+        json_file=json_file,
+        jsonl_file=jsonl_file,
+        jsonl_diff=jsonl_diff,
+    )
 
-    if markdown_file:
-        logger.info("Writing markdown to file")
-        Path(markdown_file).parent.mkdir(parents=True, exist_ok=True)
-        with open(markdown_file, "w") as file:
-            file.write(md_string)
+    return md_string
 
-    if html_file:
-        markdown_to_html(outfile=html_file, content=md_string, diffStix=diffStix)
 
-    if html_file_detailed:
-        Path(html_file_detailed).parent.mkdir(parents=True, exist_ok=True)
-        logger.info("Writing detailed updates to file")
-        write_detailed_html(
-            html_file_detailed=html_file_detailed,
-            diffStix=diffStix,
-            additional_formats_prefix=additional_formats_prefix,
-        )
+def write_changelog_chain(
+    releases: List[str],
+    output_dir: str = "output",
+    domains: Optional[List[str]] = None,
+    layers: Optional[List[str]] = None,
+    unchanged: bool = False,
+    show_key: bool = False,
+    site_prefix: str = "",
+    verbose: bool = False,
+    include_contributors: bool = False,
+    markdown_file: Optional[str] = "changelog.md",
+    html_file: Optional[str] = None,
+    html_file_detailed: Optional[str] = None,
+    additional_formats_prefix: str = "",
+    json_file: Optional[str] = None,
+    jsonl_file: Optional[str] = None,
+    jsonl_diff: bool = False,
+    jobs: int = 1,
+    types: Optional[List[str]] = None,
+    attack_ids: Optional[List[str]] = None,
+    compact: bool = False,
+) -> List[str]:
+    """Write the changelogs between each consecutive pair of a chain of ATT&CK releases.
+
+    Each release is loaded and parsed once: the new release of one comparison is reused as the old release of the
+    next one, so that at most two releases are held in memory at a time.
 
-    if layers:
-        if len(layers) == 0:
-            # no files specified, e.g. '-layers', use defaults
-            diffStix.layers = layer_defaults
-            layers = layer_defaults
-        elif len(layers) == 3:
-            # files specified, e.g. '-layers file.json file2.json file3.json', use specified
-            # assumes order of files is enterprise, mobile, pre attack (same order as defaults)
-            diffStix.layers = layers
+    Parameters
+    ----------
+    releases : List[str]
+        Directories to load the STIX data of the releases from, oldest first, e.g. ["v14.1", "v15.0", "v15.1"]
+    output_dir : str, optional
+        Directory to write the changelogs to. The output files of each comparison are written to a folder named after
+        the compared releases, e.g. "output/v14.1-v15.0", by default "output"
+    domains : List[str], optional
+        List of domains to parse, by default ["enterprise-attack", "mobile-attack", "ics-attack"]
+    layers : List[str], optional
+        Array of output filenames for layer files, relative to the folder of each comparison, by default None
+    unchanged : bool, optional
+        Include unchanged ATT&CK objects in diff comparison, by default False
+    show_key : bool, optional
+        Output key to markdown file, by default False
+    site_prefix : str, optional
+        Prefix links in markdown output, by default ""
+    verbose : bool, optional
+        Print progress bar and status messages to stdout, by default False
+    include_contributors : bool, optional
+        Include contributor information for new contributors, by default False
+    markdown_file : str, optional
+        Name of the markdown file written for each comparison, by default "changelog.md"
+    html_file : str, optional
+        If set, name of the HTML file written for each comparison, by default None
+    html_file_detailed : str, optional
+        If set, name of the detailed HTML page written for each comparison, by default None
+    additional_formats_prefix : str, optional
+        Prefix for detailed HTML links to generated layer and JSON files, by default "".
+    json_file : str, optional
+        If set, name of the JSON file written for each comparison, by default None
+    jsonl_file : str, optional
+        If set, name of the JSON Lines file written for each comparison, by default None
+    jsonl_diff : bool, optional
+        Add the detailed diff of modified objects to the records of `jsonl_file`, by default False
+    jobs : int, optional
+        Number of worker processes used to load the domains of a release and to diff the objects, by default 1
+    types : List[str], optional
+        Object types to compare, e.g. ["techniques"], by default all types
+    attack_ids : List[str], optional
+        ATT&CK IDs of the objects to compare, e.g. ["T1234", "T1234.001"], by default all objects
+    compact : bool, optional
+        Compact the parsed data of each release to keep less of it in memory, by default False
 
-        layers_dict = diffStix.get_layers_dict()
-        layers_dict_to_files(outfiles=layers, layers=layers_dict)
+    Returns
+    -------
+    List[str]
+        The folders the changelogs were written to, one per consecutive pair of releases.
+    """
+    if len(releases) < 2:
+        raise ValueError("At least two releases are needed to write a changelog chain")
+    if domains is None:
+        domains = ["enterprise-attack", "mobile-attack", "ics-attack"]
 
-    if json_file:
-        changes_dict = diffStix.get_changes_dict()
+    # the default loguru logger logs up to Debug by default
+    logger.remove()
+    if verbose:
+        logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
+    else:
+        logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True, level="INFO")
 
-        logger.info("Writing JSON updates to file")
-        Path(json_file).parent.mkdir(parents=True, exist_ok=True)
-        json.dump(changes_dict, open(json_file, "w"), cls=AttackChangesEncoder, indent=4)
+    def in_pair_dir(pair_dir: str, filename: Optional[str]) -> Optional[str]:
+        return os.path.join(pair_dir, filename) if filename else filename
 
-    return md_string
+    pair_dirs = []
+    logger.info(f"Loading release {releases[0]}")
+    old_release = load_release(
+        directory=releases[0], domains=domains, jobs=jobs, types=types, attack_ids=attack_ids, compact=compact
+    )
+    for old, new in itertools.pairwise(releases):
+        logger.info(f"Loading release {new}")
+        new_release = load_release(
+            directory=new, domains=domains, jobs=jobs, types=types, attack_ids=attack_ids, compact=compact
+        )
+
+        pair_dir = os.path.join(
+            output_dir, f"{os.path.basename(os.path.normpath(old))}-{os.path.basename(os.path.normpath(new))}"
+        )
+        pair_dirs.append(pair_dir)
+        logger.info(f"Writing changelog between {old} and {new} to {pair_dir}")
+
+        diffStix = DiffStix(
+            domains=domains,
+            layers=[in_pair_dir(pair_dir, layer) for layer in layers] if layers else layers,
+            unchanged=unchanged,
+            old=old,
+            new=new,
+            show_key=show_key,
+            site_prefix=site_prefix,
+            verbose=verbose,
+            include_contributors=include_contributors,
+            jobs=jobs,
+            releases={"old": old_release, "new": new_release},
+            types=types,
+            attack_ids=attack_ids,
+            compact=compact,
+        )
+        write_changelog_files(
+            diffStix=diffStix,
+            layers=diffStix.layers,
+            markdown_file=in_pair_dir(pair_dir, markdown_file),
+            html_file=in_pair_dir(pair_dir, html_file),
+            html_file_detailed=in_pair_dir(pair_dir, html_file_detailed),
+            additional_formats_prefix=additional_formats_prefix,
+            json_file=in_pair_dir(pair_dir, json_file),
+            jsonl_file=in_pair_dir(pair_dir, jsonl_file),
+            jsonl_diff=jsonl_diff,
+        )
+
+        # the new release is compared again as the old release of the next pair, without this comparison's changes
+        remove_changelog_fields(new_release)
+        old_release = new_release
+        del diffStix
+
+    return pair_dirs
 
 
 def main():
     """Entrypoint for running this file as a script or as a Python console command."""
     args = get_parsed_args()
 
-    get_new_changelog_md(
+    if args.chain:
+        write_changelog_chain(
+            releases=args.chain,
+            output_dir=args.chain_output_dir,
+            domains=args.domains,
+            layers=args.layers,
+            unchanged=args.unchanged,
+            show_key=args.show_key,
+            site_prefix=args.site_prefix,
+            verbose=args.verbose,
+            include_contributors=args.contributors,
+            markdown_file=args.markdown_file or "changelog.md",
+            html_file=args.html_file,
+            html_file_detailed=args.html_file_detailed,
+            additional_formats_prefix=args.additional_formats_prefix,
+            json_file=args.json_file,
+            jsonl_file=args.jsonl,
+            jsonl_diff=args.jsonl_diff,
+            jobs=args.jobs,
+            types=args.types,
+            attack_ids=args.attack_ids,
+            compact=args.compact,
+        )
+        return
+
+    diffStix = DiffStix(
         domains=args.domains,
         layers=args.layers,
         unchanged=args.unchanged,
@@ -2482,11 +4096,25 @@ def main():
         use_mitre_cti=args.use_mitre_cti,
         verbose=args.verbose,
         include_contributors=args.contributors,
+        jobs=args.jobs,
+        cache_dir=args.cache_dir,
+        mitre_cti_cache_dir=args.mitre_cti_cache_dir,
+        types=args.types,
+        attack_ids=args.attack_ids,
+        compact=args.compact,
+    )
+    # unlike get_new_changelog_md(), the markdown is only built as a single string if the HTML file needs it
+    write_changelog_files(
+        diffStix=diffStix,
+        md_string=None,
+        layers=args.layers,
         markdown_file=args.markdown_file,
         html_file=args.html_file,
         html_file_detailed=args.html_file_detailed,
         additional_formats_prefix=args.additional_formats_prefix,
         json_file=args.json_file,
+        jsonl_file=args.jsonl,
+        jsonl_diff=args.jsonl_diff,
     )
 
 
@@ -248,6 +248,34 @@ STIX21 = {
 }
 
 
+def get_stix_hash(stix_file: Optional[str] = None, stix_content: Optional[bytes] = None) -> str:
+    """Get the SHA-256 hash of a STIX file or of the contents of a STIX file, as listed for the ATT&CK releases.
+
+    Parameters
+    ----------
+    stix_file : str, optional
+        Path to a STIX file (use this or stix_content), by default None
+    stix_content : bytes, optional
+        Contents of a STIX file (use this or stix_file), by default None
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 hash.
+    """
+    sha256_hash = hashlib.sha256()
+
+    if stix_file:
+        with open(stix_file, "rb") as f:
+            # Read and update hash string value in blocks of 4K
+            for byte_block in iter(lambda: f.read(4096), b""):
+                sha256_hash.update(byte_block)
+    elif stix_content:
+        sha256_hash.update(stix_content)
+
+    return sha256_hash.hexdigest()
+
+
 def get_attack_version(
     domain: str, stix_version: str = "2.0", stix_file: Optional[str] = None, stix_content: Optional[bytes] = None
 ) -> Optional[str]:
@@ -279,17 +307,7 @@ def get_attack_version(
             "domain must be one of [enterprise-attack | mobile-attack | ics-attack | pre-attack] to determine version"
         )
         return None
-    sha256_hash = hashlib.sha256()
-
-    if stix_file:
-        with open(stix_file, "rb") as f:
-            # Read and update hash string value in blocks of 4K
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-    elif stix_content:
-        sha256_hash.update(stix_content)
-
-    sha256_hash = sha256_hash.hexdigest()
+    sha256_hash = get_stix_hash(stix_file=stix_file, stix_content=stix_content)
 
     if stix_version == "2.0":
         stix_hash_data = STIX20
@@ -39,6 +39,16 @@ class TestArgumentHandling:
         assert args.use_mitre_cti is False
         assert args.site_prefix == ""
         assert args.additional_formats_prefix == ""
+        assert args.jobs == 1
+        assert args.cache_dir is None
+        assert args.mitre_cti_cache_dir is None
+        assert args.jsonl is None
+        assert args.jsonl_diff is False
+        assert args.types is None
+        assert args.attack_ids is None
+        assert args.compact is False
+        assert args.chain is None
+        assert args.chain_output_dir == "output"
 
     def test_get_parsed_args_default_values(self, monkeypatch):
         """Test default argument values."""
@@ -74,6 +84,8 @@ class TestArgumentHandling:
             "--unchanged",
             "--show-key",
             "--no-contributors",
+            "--jobs",
+            "4",
             "--verbose",
         ]
 
@@ -92,6 +104,7 @@ class TestArgumentHandling:
         assert args.unchanged is True
         assert args.show_key is True
         assert args.contributors is False
+        assert args.jobs == 4
         assert args.verbose is True
 
     @pytest.mark.parametrize(
@@ -101,6 +114,10 @@ class TestArgumentHandling:
             (["script_name", "--help"], 0, "help option"),
             (["script_name", "--invalid-option"], None, "invalid option"),
             (["script_name", "--old"], None, "missing required value"),
+            (["script_name", "--jobs", "0"], None, "no worker processes"),
+            (["script_name", "--chain", "v14.1"], None, "chain of a single release"),
+            (["script_name", "--chain", "v14.1", "v15.0", "--use-mitre-cti"], None, "chain with mitre cti"),
+            (["script_name", "--chain", "v14.1", "v15.0", "--cache-dir", "cache"], None, "chain with diff cache"),
         ],
     )
     def test_get_parsed_args_system_exit_scenarios(self, test_args, expected_exit_code, description, monkeypatch):
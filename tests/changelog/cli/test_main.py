@@ -4,7 +4,7 @@ import json
 
 import pytest
 
-from mitreattack.diffStix.changelog_helper import get_new_changelog_md
+from mitreattack.diffStix.changelog_helper import DiffStix, get_new_changelog_md, main
 
 
 class TestMainFunction:
@@ -118,3 +118,34 @@ class TestMainFunction:
         # Verify function returns markdown string, not None
         assert isinstance(result, str)
         assert len(result) > 0
+
+    def test_main_streams_markdown_file(
+        self, minimal_stix_bundles, tmp_path, setup_test_directories, setup_monkeypatch_args, monkeypatch
+    ):
+        """Test that main writes the markdown file without building the whole markdown string."""
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, ["enterprise-attack"])
+        expected = get_new_changelog_md(domains=["enterprise-attack"], old=old_dir, new=new_dir, verbose=False)
+
+        def get_markdown_string(self):
+            raise AssertionError("the markdown file should be streamed")
+
+        monkeypatch.setattr(DiffStix, "get_markdown_string", get_markdown_string)
+        markdown_file = tmp_path / "changelog.md"
+        setup_monkeypatch_args(
+            [
+                "diff_stix",
+                "--domains",
+                "enterprise-attack",
+                "--old",
+                old_dir,
+                "--new",
+                new_dir,
+                "--markdown-file",
+                str(markdown_file),
+                "--no-contributors",
+            ],
+            monkeypatch,
+        )
+        main()
+
+        assert markdown_file.read_text() == expected
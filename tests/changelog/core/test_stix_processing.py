@@ -1,10 +1,16 @@
 """Tests for STIX object processing functionality."""
 
 from mitreattack.diffStix.changelog_helper import (
+    collect_domain_statistics,
     deep_copy_stix,
     get_attack_id,
+    get_content_hash,
     get_relative_url_from_stix,
+    has_indexed_subtechniques,
     has_subtechniques,
+    index_hierarchy,
+    index_relationship_edges,
+    index_relationships_by_target,
 )
 
 
@@ -46,3 +52,137 @@ class TestStixProcessing:
         )
         subtechnique_relationships = {"T1234.001": subtechnique_relationship}
         assert has_subtechniques(sample_technique_object, subtechnique_relationships) is True
+
+    def test_has_indexed_subtechniques(
+        self, sample_technique_object, sample_subtechnique_object, mock_relationship_factory
+    ):
+        """Test detection of object with subtechniques in the index of index_hierarchy()."""
+        subtechnique_relationship = mock_relationship_factory(
+            source_ref=sample_subtechnique_object["id"],
+            target_ref=sample_technique_object["id"],
+            relationship_type="subtechnique-of",
+        )
+        hierarchy = index_hierarchy(
+            attack_objects={"datacomponents": {}, "datasources": {}},
+            relationships={"subtechniques": {subtechnique_relationship["id"]: subtechnique_relationship}},
+        )
+        parent_to_children = hierarchy["subtechniques"]["parent_to_children"]
+        assert has_indexed_subtechniques(sample_technique_object, parent_to_children) is True
+        assert has_indexed_subtechniques(sample_subtechnique_object, parent_to_children) is False
+
+    def test_index_relationships_by_target(self, sample_technique_object, mock_relationship_factory):
+        """Test indexing relationships by target, leaving out deprecated and revoked relationships."""
+        active = mock_relationship_factory(target_ref=sample_technique_object["id"], relationship_type="mitigates")
+        deprecated = mock_relationship_factory(
+            target_ref=sample_technique_object["id"], relationship_type="mitigates", x_mitre_deprecated=True
+        )
+        revoked = mock_relationship_factory(
+            target_ref=sample_technique_object["id"], relationship_type="mitigates", revoked=True
+        )
+        other = mock_relationship_factory(relationship_type="mitigates")
+        relationships = {relationship["id"]: relationship for relationship in [active, deprecated, revoked, other]}
+
+        index = index_relationships_by_target(relationships)
+        assert index[sample_technique_object["id"]] == [active]
+        assert index[other["target_ref"]] == [other]
+        assert len(index) == 2
+
+    def test_index_relationship_edges(self, mock_relationship_factory):
+        """Test keying relationships by source, type and target, leaving out inactive and revoked-by relationships."""
+        uses = mock_relationship_factory(relationship_type="uses")
+        mitigates = mock_relationship_factory(relationship_type="mitigates")
+        deprecated = mock_relationship_factory(relationship_type="uses", x_mitre_deprecated=True)
+        revoked_by = mock_relationship_factory(relationship_type="revoked-by")
+
+        edges = index_relationship_edges([uses, mitigates, deprecated, revoked_by])
+        assert edges == {
+            (uses["source_ref"], "uses", uses["target_ref"]): get_content_hash(uses),
+            (mitigates["source_ref"], "mitigates", mitigates["target_ref"]): get_content_hash(mitigates),
+        }
+
+        # a relationship between the same objects with a new STIX ID has the same key
+        replacement = dict(uses, id=mitigates["id"])
+        assert index_relationship_edges([replacement]).keys() == {(uses["source_ref"], "uses", uses["target_ref"])}
+
+    def test_collect_domain_statistics(self, mock_stix_object_factory):
+        """Test counting the active objects of a domain like the MitreAttackData getters do."""
+        techniques = [
+            mock_stix_object_factory(attack_id="T1001", x_mitre_is_subtechnique=False),
+            mock_stix_object_factory(attack_id="T1002", x_mitre_is_subtechnique=False, deprecated=True),
+            mock_stix_object_factory(attack_id="T1003", x_mitre_is_subtechnique=False, revoked=True),
+            mock_stix_object_factory(attack_id="T1001.001"),
+            # MitreAttackData.get_techniques(include_subtechniques=False) only returns techniques with the property set
+            mock_stix_object_factory(attack_id="T1004"),
+        ]
+        groups = [mock_stix_object_factory(stix_type="intrusion-set", attack_id="G0001")]
+        tactics = [
+            mock_stix_object_factory(stix_type="x-mitre-tactic", attack_id="TA0001"),
+            mock_stix_object_factory(stix_type="x-mitre-tactic", attack_id="TA0002", deprecated=True),
+        ]
+        object_types = [
+            "techniques",
+            "software",
+            "groups",
+            "campaigns",
+            "assets",
+            "mitigations",
+            "datasources",
+            "datacomponents",
+            "detectionstrategies",
+            "analytics",
+        ]
+        attack_objects = {object_type: {} for object_type in object_types}
+        attack_objects["techniques"] = {technique["id"]: technique for technique in techniques}
+        attack_objects["groups"] = {group["id"]: group for group in groups}
+
+        statistics = collect_domain_statistics(attack_objects=attack_objects, tactics=tactics)
+
+        assert statistics.tactics == 1
+        assert statistics.techniques == 1
+        assert statistics.subtechniques == 1
+        assert statistics.groups == 1
+        assert statistics.software == 0
+        assert statistics.format_output() == "* : 1 Tactics, 1 Techniques, 1 Sub-Techniques, and 1 Groups"
+
+    def test_get_content_hash(self, sample_technique_object):
+        """Test that the content hash ignores key order but not content."""
+        reordered = dict(reversed(list(sample_technique_object.items())))
+        assert get_content_hash(reordered) == get_content_hash(sample_technique_object)
+
+        changed = dict(sample_technique_object, description="Changed description")
+        assert get_content_hash(changed) != get_content_hash(sample_technique_object)
+
+    def test_index_hierarchy(
+        self,
+        sample_technique_object,
+        sample_subtechnique_object,
+        sample_data_source_object,
+        sample_data_component_object,
+        mock_relationship_factory,
+    ):
+        """Test indexing the parents and children of subtechniques and data components."""
+        subtechnique_relationship = mock_relationship_factory(
+            source_ref=sample_subtechnique_object["id"],
+            target_ref=sample_technique_object["id"],
+            relationship_type="subtechnique-of",
+        )
+        sample_data_component_object["x_mitre_data_source_ref"] = sample_data_source_object["id"]
+        attack_objects = {
+            "datasources": {sample_data_source_object["id"]: sample_data_source_object},
+            "datacomponents": {sample_data_component_object["id"]: sample_data_component_object},
+        }
+        relationships = {"subtechniques": {subtechnique_relationship["id"]: subtechnique_relationship}}
+
+        hierarchy = index_hierarchy(attack_objects, relationships)
+        assert hierarchy["subtechniques"]["parent_to_children"] == {
+            sample_technique_object["id"]: [sample_subtechnique_object["id"]]
+        }
+        assert hierarchy["subtechniques"]["child_to_parents"] == {
+            sample_subtechnique_object["id"]: [sample_technique_object["id"]]
+        }
+        assert hierarchy["datacomponents"]["parent_to_children"] == {
+            sample_data_source_object["id"]: [sample_data_component_object["id"]]
+        }
+        assert hierarchy["datacomponents"]["child_to_parents"] == {
+            sample_data_component_object["id"]: [sample_data_source_object["id"]]
+        }
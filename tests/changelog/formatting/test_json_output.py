@@ -1,5 +1,6 @@
 """Tests for JSON output generation and validation."""
 
+import io
 import json
 
 from mitreattack.diffStix.changelog_helper import AttackChangesEncoder, AttackObjectVersion
@@ -55,3 +56,30 @@ class TestJsonOutput:
         with open(json_file, "r", encoding="utf-8") as f:
             loaded_data = json.load(f)
         assert loaded_data == test_data
+
+    def test_jsonl_records_match_changes_dict(self, lightweight_diffstix):
+        """Test that the JSON Lines records cover the changes of get_changes_dict()."""
+        output = io.StringIO()
+        lightweight_diffstix.write_jsonl(output, include_diff=True)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        changes_dict = lightweight_diffstix.get_changes_dict()
+        expected = set()
+        for object_type, sections in changes_dict["enterprise-attack"].items():
+            for section, changes in sections.items():
+                if object_type == "relationships":
+                    expected.update((object_type, section, change["source_ref"]) for change in changes)
+                else:
+                    expected.update((object_type, section, change["id"]) for change in changes)
+        assert expected
+        assert {
+            (record["type"], record["section"], record.get("id", record.get("source_ref"))) for record in records
+        } == expected
+
+        for record in records:
+            if record["section"] in ["major_version_changes", "minor_version_changes", "patches"]:
+                assert record["previous_version"] is not None
+                assert isinstance(record["detailed_diff"], dict)
+            if record["section"] == "additions" and record["type"] != "relationships":
+                assert record["previous_version"] is None
+                assert "detailed_diff" not in record
@@ -1,5 +1,7 @@
 """Tests for markdown output generation and validation."""
 
+import io
+
 import pytest
 
 from mitreattack.diffStix.changelog_helper import (
@@ -27,6 +29,17 @@ class TestMarkdownOutput:
         result_with_key = lightweight_diffstix.get_markdown_string()
         assert "## Key" in result_with_key  # Should include key section
 
+    def test_write_markdown_matches_markdown_string(self, lightweight_diffstix):
+        """Test that streaming the markdown to a file writes the same content as get_markdown_string()."""
+        lightweight_diffstix.show_key = True
+        lightweight_diffstix.include_contributors = True
+
+        file = io.StringIO()
+        lightweight_diffstix.write_markdown(file)
+
+        assert file.getvalue() == lightweight_diffstix.get_markdown_string()
+        assert "".join(lightweight_diffstix.iter_markdown()) == file.getvalue()
+
     def test_markdown_link_formatting(self, lightweight_diffstix, sample_technique_object):
         """Test real markdown link formatting for ATT&CK objects."""
         # Set site prefix to test link generation
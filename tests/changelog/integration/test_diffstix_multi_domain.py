@@ -1,9 +1,15 @@
 """Integration tests for multi-domain DiffStix operations."""
 
 import json
+import shutil
 import uuid
+from pathlib import Path
 
-from mitreattack.diffStix.changelog_helper import DiffStix
+import pytest
+
+from mitreattack.diffStix import changelog_helper
+from mitreattack.diffStix.changelog_helper import DiffStix, get_attack_id
+from mitreattack.stix20 import MitreAttackData
 
 
 class TestDiffStixMultiDomain:
@@ -124,3 +130,259 @@ class TestDiffStixMultiDomain:
             assert "name" in layers[domain]
             assert "domain" in layers[domain]
             assert layers[domain]["domain"] == domain
+
+    def test_diffstix_jobs_matches_sequential(
+        self, minimal_stix_bundles, tmp_path, setup_test_directories, monkeypatch
+    ):
+        """Test that diffing objects in worker processes gives the same changes as diffing them sequentially."""
+        domains = ["enterprise-attack", "mobile-attack", "ics-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+        # split the objects into several work items
+        monkeypatch.setattr(changelog_helper, "DIFF_CHUNK_SIZE", 2)
+
+        sequential = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, unchanged=True, verbose=False, detailed_changes=True
+        )
+        parallel = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, unchanged=True, verbose=False, detailed_changes=True, jobs=2
+        )
+
+        assert parallel.get_markdown_string() == sequential.get_markdown_string()
+        for obj_type, domain_changes in sequential.data["changes"].items():
+            for domain, sections in domain_changes.items():
+                for section, stix_objects in sections.items():
+                    parallel_objects = parallel.data["changes"][obj_type][domain][section]
+                    assert [stix_object["id"] for stix_object in parallel_objects] == [
+                        stix_object["id"] for stix_object in stix_objects
+                    ]
+                    assert [stix_object.get("detailed_diff") for stix_object in parallel_objects] == [
+                        stix_object.get("detailed_diff") for stix_object in stix_objects
+                    ]
+
+    def test_diffstix_identical_objects_skip_diff(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that objects with the same content in both releases are unchanged and get an empty detailed diff."""
+        domains = ["enterprise-attack"]
+        bundles = {"old": minimal_stix_bundles["old"], "new": minimal_stix_bundles["old"]}
+        old_dir, new_dir = setup_test_directories(tmp_path, bundles, domains)
+
+        diffStix = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, unchanged=True, verbose=False, detailed_changes=True
+        )
+
+        for obj_type, domain_changes in diffStix.data["changes"].items():
+            for section, stix_objects in domain_changes["enterprise-attack"].items():
+                if section != "unchanged":
+                    assert stix_objects == [], f"{obj_type} {section}"
+            for stix_object in domain_changes["enterprise-attack"]["unchanged"]:
+                assert stix_object["detailed_diff"] == "{}"
+        assert diffStix.data["changes"]["techniques"]["enterprise-attack"]["unchanged"]
+
+    def test_diffstix_detailed_changes_are_lazy(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that detailed diffs and description tables are only computed when needed."""
+        domains = ["enterprise-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+
+        eager = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, detailed_changes=True)
+        lazy = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False)
+
+        eager_objects = eager.data["new"]["enterprise-attack"]["attack_objects"]["techniques"]
+        lazy_objects = lazy.data["new"]["enterprise-attack"]["attack_objects"]["techniques"]
+        assert any("detailed_diff" in stix_object for stix_object in eager_objects.values())
+        assert not any("detailed_diff" in stix_object for stix_object in lazy_objects.values())
+        assert lazy.get_markdown_string() == eager.get_markdown_string()
+        assert not any("detailed_diff" in stix_object for stix_object in lazy_objects.values())
+
+        lazy.get_changes_dict()
+        for stix_id, stix_object in eager_objects.items():
+            assert lazy_objects[stix_id].get("detailed_diff") == stix_object.get("detailed_diff")
+            assert ("description_change_table" in lazy_objects[stix_id]) == ("description_change_table" in stix_object)
+
+    def test_changelog_chain_matches_pairwise_changelogs(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that a chain of releases writes the same changelogs as comparing each pair separately."""
+        domains = ["enterprise-attack", "mobile-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+        # a third release that reverts to the content of the first one
+        reverted_dir = tmp_path / "reverted"
+        shutil.copytree(old_dir, reverted_dir)
+        releases = [old_dir, new_dir, str(reverted_dir)]
+
+        pair_dirs = changelog_helper.write_changelog_chain(
+            releases=releases,
+            output_dir=str(tmp_path / "chain"),
+            domains=domains,
+            markdown_file="changelog.md",
+        )
+
+        assert [Path(pair_dir).name for pair_dir in pair_dirs] == [
+            f"{Path(old_dir).name}-{Path(new_dir).name}",
+            f"{Path(new_dir).name}-reverted",
+        ]
+        for (old, new), pair_dir in zip([(old_dir, new_dir), (new_dir, str(reverted_dir))], pair_dirs, strict=True):
+            expected = changelog_helper.get_new_changelog_md(domains=domains, layers=None, old=old, new=new)
+            assert (Path(pair_dir) / "changelog.md").read_text() == expected
+
+    def test_diffstix_cache_reuses_diff_results(
+        self, minimal_stix_bundles, tmp_path, setup_test_directories, monkeypatch
+    ):
+        """Test that diff results are cached by bundle hashes and options, and reused by later DiffStix objects."""
+        domains = ["enterprise-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+        cache_dir = str(tmp_path / "cache")
+
+        uncached = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False)
+        first = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, cache_dir=cache_dir)
+        first_markdown = first.get_markdown_string()
+        first_changes = first.get_changes_dict()
+        assert list(Path(cache_dir).iterdir()) == [Path(first.cache_file)]
+
+        def fail_load_data(self):
+            raise AssertionError("diff results should be loaded from the cache")
+
+        monkeypatch.setattr(DiffStix, "load_data", fail_load_data)
+        cached = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, verbose=False, cache_dir=cache_dir, site_prefix="/x"
+        )
+        assert cached.cache_file == first.cache_file
+        # the datastores are not cached, but the data keeps its layout
+        assert cached.data["new"]["enterprise-attack"]["stix_datastore"] is None
+        assert "(/x/" in cached.get_markdown_string()
+        assert cached.get_markdown_string() == uncached.get_markdown_string().replace("(/", "(/x/")
+        assert cached.get_changes_dict() == first_changes
+        cached_again = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, cache_dir=cache_dir)
+        assert cached_again.get_markdown_string() == first_markdown
+
+        # different options are cached separately
+        monkeypatch.undo()
+        unchanged = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, verbose=False, cache_dir=cache_dir, unchanged=True
+        )
+        assert unchanged.cache_file != first.cache_file
+
+    def test_diffstix_relationship_changes(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that relationships are compared by source, type and target, and the changes added to their objects."""
+        domains = ["enterprise-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+
+        def get_edges(bundle):
+            return {
+                (stix_object["source_ref"], stix_object["relationship_type"], stix_object["target_ref"])
+                for stix_object in bundle["objects"]
+                if stix_object["type"] == "relationship" and stix_object["relationship_type"] != "revoked-by"
+            }
+
+        old_edges = get_edges(minimal_stix_bundles["old"])
+        new_edges = get_edges(minimal_stix_bundles["new"])
+        assert new_edges - old_edges
+
+        diffStix = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False)
+        relationship_changes = diffStix.data["relationship_changes"]["enterprise-attack"]
+
+        def as_keys(edges):
+            return [(edge["source_ref"], edge["relationship_type"], edge["target_ref"]) for edge in edges]
+
+        assert as_keys(relationship_changes["additions"]) == sorted(new_edges - old_edges)
+        assert as_keys(relationship_changes["deletions"]) == sorted(old_edges - new_edges)
+        assert relationship_changes["modifications"] == []
+
+        new_objects = {}
+        for stix_objects in diffStix.data["new"]["enterprise-attack"]["attack_objects"].values():
+            new_objects.update(stix_objects)
+        for edge in relationship_changes["additions"]:
+            for stix_id in [edge["source_ref"], edge["target_ref"]]:
+                if stix_id in new_objects:
+                    assert edge in new_objects[stix_id]["changelog_relationships"]["new"]
+
+        assert diffStix.get_changes_dict()["enterprise-attack"]["relationships"] == relationship_changes
+
+    def test_diffstix_scoped_to_types_and_attack_ids(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that a scoped comparison reports the changes of the objects in scope, with the context they need."""
+        domains = ["enterprise-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+        full = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False)
+
+        changed_techniques = [
+            stix_object
+            for stix_objects in full.data["changes"]["techniques"]["enterprise-attack"].values()
+            for stix_object in stix_objects
+        ]
+        attack_ids = {get_attack_id(stix_object) for stix_object in changed_techniques[:2]}
+        assert attack_ids
+
+        scoped = DiffStix(
+            domains=domains, old=old_dir, new=new_dir, verbose=False, types=["techniques"], attack_ids=attack_ids
+        )
+        assert list(scoped.data["changes"]) == ["techniques"]
+        for section, stix_objects in full.data["changes"]["techniques"]["enterprise-attack"].items():
+            assert [
+                stix_object["id"] for stix_object in scoped.data["changes"]["techniques"]["enterprise-attack"][section]
+            ] == [stix_object["id"] for stix_object in stix_objects if get_attack_id(stix_object) in attack_ids]
+
+        # objects out of scope are only parsed as context, and not hashed for the comparison
+        new_data = scoped.data["new"]["enterprise-attack"]
+        assert len(new_data["content_hashes"]) < len(full.data["new"]["enterprise-attack"]["content_hashes"])
+        for stix_id in new_data["content_hashes"]:
+            assert get_attack_id(new_data["attack_objects"]["techniques"][stix_id]) in attack_ids
+        # subtechniques in scope keep their parent technique for their placards
+        for stix_object in new_data["attack_objects"]["techniques"].values():
+            if get_attack_id(stix_object) in attack_ids and stix_object.get("x_mitre_is_subtechnique"):
+                parent = scoped.get_parent_stix_object(stix_object, datastore_version="new", domain="enterprise-attack")
+                assert parent["name"] == full.get_parent_stix_object(stix_object, "new", "enterprise-attack")["name"]
+
+        assert scoped.get_statistics() == full.get_statistics()
+
+        with pytest.raises(ValueError):
+            DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, types=["tactics"])
+
+    def test_diffstix_compact_matches_default(self, minimal_stix_bundles, tmp_path, setup_test_directories):
+        """Test that a compact DiffStix reports the same changes without keeping the STIX datastores."""
+        domains = ["enterprise-attack", "mobile-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+        default = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False)
+        compact = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, compact=True)
+
+        for datastore_version in ["old", "new"]:
+            for domain in domains:
+                assert compact.data[datastore_version][domain]["stix_datastore"] is None
+        # strings are shared between the domains of both releases
+        enterprise_ids = set(compact.data["new"]["enterprise-attack"]["content_hashes"])
+        for stix_id in compact.data["new"]["mobile-attack"]["content_hashes"]:
+            if stix_id in enterprise_ids:
+                assert any(stix_id is other_id for other_id in enterprise_ids)
+                break
+
+        assert compact.get_markdown_string() == default.get_markdown_string()
+        # the HTML tables of description changes have different ids in each run
+        changes_dicts = [diffStix.get_changes_dict() for diffStix in (compact, default)]
+        for changes_dict in changes_dicts:
+            for domain in domains:
+                for sections in changes_dict[domain].values():
+                    for stix_objects in sections.values():
+                        for stix_object in stix_objects:
+                            stix_object.pop("description_change_table", None)
+        assert changes_dicts[0] == changes_dicts[1]
+        assert compact.get_layers_dict() == default.get_layers_dict()
+        assert compact.get_statistics() == default.get_statistics()
+
+    def test_diffstix_statistics_are_collected_while_parsing(
+        self, minimal_stix_bundles, tmp_path, setup_test_directories
+    ):
+        """Test that the statistics match the MitreAttackData queries without loading the datastores again."""
+        domains = ["enterprise-attack", "mobile-attack"]
+        old_dir, new_dir = setup_test_directories(tmp_path, minimal_stix_bundles, domains)
+
+        diffStix = DiffStix(domains=domains, old=old_dir, new=new_dir, verbose=False, jobs=2)
+        statistics = diffStix.get_statistics(datastore_version="new")
+        assert "## Statistics" in diffStix.get_markdown_string()
+        assert all(diffStix.data["new"][domain]["stix_datastore"] is None for domain in domains)
+
+        data = MitreAttackData(stix_filepath=str(Path(new_dir) / "enterprise-attack.json"))
+        enterprise = statistics.domains[0]
+        assert enterprise.name == "Enterprise"
+        assert enterprise.techniques == len(
+            data.get_techniques(include_subtechniques=False, remove_revoked_deprecated=True)
+        )
+        assert enterprise.subtechniques == len(data.get_subtechniques(remove_revoked_deprecated=True))
+        assert enterprise.groups == len(data.get_groups(remove_revoked_deprecated=True))
+        assert enterprise.software == len(data.get_software(remove_revoked_deprecated=True))
+        # the same bundle is used for both domains, so its software is only counted once
+        assert statistics.software == enterprise.software
@@ -4,7 +4,7 @@ import pytest
 import requests
 import responses
 
-from mitreattack.diffStix.changelog_helper import DiffStix
+from mitreattack.diffStix.changelog_helper import DiffStix, load_mitre_cti_domain
 
 
 class TestNetwork:
@@ -60,3 +60,31 @@ class TestNetwork:
         objects = datastore.query([])
         assert len(objects) == 1
         assert objects[0]["name"] == sample_technique_object["name"]
+
+    @responses.activate
+    def test_load_mitre_cti_domain_revalidates_cache(self, tmp_path, sample_technique_object):
+        """Test that cached MITRE CTI bundles are revalidated and their parsed data is reused."""
+        url = "https://raw.githubusercontent.com/mitre/cti/master/enterprise-attack/enterprise-attack.json"
+        cache_dir = str(tmp_path / "cti")
+        responses.add(
+            responses.GET,
+            url,
+            json={"type": "bundle", "objects": [sample_technique_object]},
+            headers={"ETag": '"v1"'},
+            status=200,
+        )
+        attack_version, parsed = load_mitre_cti_domain(domain="enterprise-attack", cache_dir=cache_dir)
+        assert attack_version is None
+        assert sample_technique_object["id"] in parsed["attack_objects"]["techniques"]
+        assert len(list(tmp_path.glob("cti/enterprise-attack-*.pickle"))) == 1
+
+        responses.replace(responses.GET, url, status=304)
+        _, cached = load_mitre_cti_domain(domain="enterprise-attack", cache_dir=cache_dir)
+        assert responses.calls[-1].request.headers["If-None-Match"] == '"v1"'
+        assert cached.keys() == parsed.keys()
+        assert cached["attack_objects"]["techniques"].keys() == parsed["attack_objects"]["techniques"].keys()
+
+        # the cached bundle is used when GitHub can't be reached
+        responses.replace(responses.GET, url, body=requests.exceptions.ConnectionError("offline"))
+        _, offline = load_mitre_cti_domain(domain="enterprise-attack", cache_dir=cache_dir)
+        assert offline["attack_objects"]["techniques"].keys() == parsed["attack_objects"]["techniques"].keys()
@@ -1,8 +1,10 @@
 """Unit tests for STIX-to-dataframe conversion helpers."""
 
+import pandas as pd
 import stix2
 
 from mitreattack.attackToExcel import stixToDf
+from mitreattack.stix20 import MitreAttackData
 
 
 def test_techniques_to_df_handles_missing_tactic_definition(monkeypatch):
@@ -117,3 +119,107 @@ def test_techniques_to_df_handles_targets_relationship_without_description():
     assert dataframes["techniques"].iloc[0]["relationship citations"] == ""
     if "citations" in dataframes:
         assert dataframes["citations"].empty
+
+
+def _technique(stix_id, name, platforms, is_subtechnique=False, revoked=False, attack_id="T0000"):
+    return {
+        "type": "attack-pattern",
+        "spec_version": "2.1",
+        "id": stix_id,
+        "created": "2020-01-01T00:00:00.000Z",
+        "modified": "2020-01-01T00:00:00.000Z",
+        "name": name,
+        "revoked": revoked,
+        "kill_chain_phases": [{"kill_chain_name": "mitre-mobile-attack", "phase_name": "collection"}],
+        "x_mitre_platforms": platforms,
+        "x_mitre_is_subtechnique": is_subtechnique,
+        "external_references": [
+            {"source_name": "mitre-attack", "external_id": attack_id, "url": "https://example.com"}
+        ],
+    }
+
+
+def _subtechnique_of(stix_id, source_ref, target_ref):
+    return {
+        "type": "relationship",
+        "spec_version": "2.1",
+        "id": stix_id,
+        "created": "2020-01-01T00:00:00.000Z",
+        "modified": "2020-01-01T00:00:00.000Z",
+        "relationship_type": "subtechnique-of",
+        "source_ref": source_ref,
+        "target_ref": target_ref,
+    }
+
+
+def test_build_matrix_index():
+    """build_matrix_index should group active techniques by tactic, sub-techniques by parent, and both by platform."""
+    parent = "attack-pattern--11111111-1111-4111-8111-111111111111"
+    other = "attack-pattern--22222222-2222-4222-8222-222222222222"
+    sub_b = "attack-pattern--33333333-3333-4333-8333-333333333333"
+    sub_a = "attack-pattern--44444444-4444-4444-8444-444444444444"
+    revoked_sub = "attack-pattern--55555555-5555-4555-8555-555555555555"
+    mem_store = stix2.MemoryStore(
+        stix_data=[
+            _technique(parent, "Parent", ["Android", "iOS"]),
+            _technique(other, "Another", ["iOS"]),
+            _technique(sub_b, "Parent: B", ["Android"], is_subtechnique=True),
+            _technique(sub_a, "Parent: A", ["iOS"], is_subtechnique=True),
+            _technique(revoked_sub, "Parent: C", ["iOS"], is_subtechnique=True, revoked=True),
+            _subtechnique_of("relationship--66666666-6666-4666-8666-666666666666", sub_b, parent),
+            _subtechnique_of("relationship--77777777-7777-4777-8777-777777777777", sub_a, parent),
+            _subtechnique_of("relationship--88888888-8888-4888-8888-888888888888", revoked_sub, other),
+        ]
+    )
+
+    matrix_index = stixToDf.build_matrix_index(mem_store, "mobile-attack")
+
+    assert [t["name"] for t in matrix_index["techniques_by_tactic"]["collection"]] == ["Another", "Parent"]
+    assert [t["name"] for t in matrix_index["subtechniques_by_parent"][parent]] == ["Parent: A", "Parent: B"]
+    # the relationship is kept even though the only sub-technique is revoked
+    assert matrix_index["subtechniques_by_parent"][other] == []
+    assert matrix_index["platform_members"]["Android"] == {parent, sub_b}
+    assert matrix_index["platform_members"]["iOS"] == {parent, other, sub_a}
+
+
+def test_builders_accept_shared_index():
+    """Builders should give the same dataframes for a MemoryStore, a MitreAttackData instance and a StixDataIndex."""
+    parent = "attack-pattern--11111111-1111-4111-8111-111111111111"
+    subtechnique = "attack-pattern--33333333-3333-4333-8333-333333333333"
+    mem_store = stix2.MemoryStore(
+        stix_data=[
+            _technique(parent, "Parent", ["Android"], attack_id="T1000"),
+            _technique(subtechnique, "Child", ["Android"], is_subtechnique=True, attack_id="T1000.001"),
+            _subtechnique_of("relationship--66666666-6666-4666-8666-666666666666", subtechnique, parent),
+            {
+                "type": "course-of-action",
+                "spec_version": "2.1",
+                "id": "course-of-action--77777777-7777-4777-8777-777777777777",
+                "created": "2020-01-01T00:00:00.000Z",
+                "modified": "2020-01-01T00:00:00.000Z",
+                "name": "Mitigation",
+                "external_references": [{"source_name": "mitre-attack", "external_id": "M1000"}],
+            },
+            {
+                "type": "relationship",
+                "spec_version": "2.1",
+                "id": "relationship--88888888-8888-4888-8888-888888888888",
+                "created": "2020-01-01T00:00:00.000Z",
+                "modified": "2020-01-01T00:00:00.000Z",
+                "relationship_type": "mitigates",
+                "source_ref": "course-of-action--77777777-7777-4777-8777-777777777777",
+                "target_ref": subtechnique,
+            },
+        ]
+    )
+    index = stixToDf.StixDataIndex(mem_store)
+
+    assert index.get_parent_technique(subtechnique)["id"] == parent
+    assert index.get_parent_technique(parent) is None
+    assert index.get_attack_id(subtechnique) == "T1000.001"
+    assert stixToDf.get_stix_data_index(index) is index
+
+    expected = stixToDf.techniquesToDf(mem_store, "enterprise-attack")["techniques"]
+    assert expected.set_index("ID").loc["T1000.001", "name"] == "Parent: Child"
+    for src in [MitreAttackData(src=mem_store), index]:
+        pd.testing.assert_frame_equal(stixToDf.techniquesToDf(src, "enterprise-attack")["techniques"], expected)
@@ -5,12 +5,23 @@ This module contains tests for verifying that ATT&CK domains (enterprise, mobile
 are correctly exported to Excel spreadsheets using the attackToExcel module.
 """
 
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+import pandas as pd
+import pytest
 import stix2
 from loguru import logger
 
 from mitreattack.attackToExcel import attackToExcel
+from mitreattack.attackToExcel.profiling import ExportProfile
 
 # tmp_path is a built-in pytest tixture
 # https://docs.pytest.org/en/7.1.x/how-to/tmp_path.html
@@ -84,3 +95,304 @@ def test_ics_latest(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
 
     excel_folder = tmp_path / domain
     check_excel_files_exist(excel_folder=excel_folder, domain=domain)
+
+
+def test_ics_latest_concurrent_write(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
+    """Test that writing workbooks in a process pool produces the same files in the same order."""
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+
+    dataframes = attackToExcel.build_dataframes(src=memstore_ics_latest, domain=domain)
+    sequential_files = attackToExcel.write_excel(
+        dataframes=dataframes, domain=domain, src=memstore_ics_latest, output_dir=str(tmp_path / "sequential")
+    )
+    concurrent_files = attackToExcel.write_excel(
+        dataframes=dataframes, domain=domain, src=memstore_ics_latest, output_dir=str(tmp_path / "concurrent"), jobs=2
+    )
+
+    assert [Path(fp).name for fp in concurrent_files] == [Path(fp).name for fp in sequential_files]
+    check_excel_files_exist(excel_folder=tmp_path / "concurrent" / domain, domain=domain)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather", "csv"])
+def test_ics_latest_columnar(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore, file_format: str):
+    """Test most recent ics to columnar file formats functionality."""
+    if file_format != "csv":
+        pytest.importorskip("pyarrow")
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+
+    attackToExcel.export(
+        domain=domain, output_dir=str(tmp_path), mem_store=memstore_ics_latest, file_format=file_format
+    )
+
+    techniques_file = tmp_path / domain / "techniques" / f"techniques.{file_format}"
+    assert techniques_file.exists()
+    assert (tmp_path / domain / f"citations.{file_format}").exists()
+    if file_format == "csv":
+        techniques = pd.read_csv(techniques_file)
+    else:
+        techniques = getattr(pd, f"read_{file_format}")(techniques_file)
+        assert pd.api.types.is_datetime64_any_dtype(techniques["created"])
+        assert isinstance(techniques["platforms"].iloc[0][0], str)
+    assert len(techniques) > 0
+
+
+def test_columnar_requires_arrow_extra(
+    tmp_path: Path, memstore_ics_latest: stix2.MemoryStore, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that parquet output without pyarrow fails before anything is written, naming the extra to install."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError, match=r"mitreattack-python\[arrow\]"):
+        attackToExcel.export(
+            domain="ics-attack", output_dir=str(tmp_path), mem_store=memstore_ics_latest, file_format="parquet"
+        )
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["-release-dir", "attack-releases"],
+        ["-domains", "ics-attack", "-incremental"],
+        ["-versions", "v18.0", "-stix-file", "ics-attack.json"],
+    ],
+)
+def test_main_rejects_options_of_the_other_mode(monkeypatch: pytest.MonkeyPatch, argv: list):
+    """Test that the CLI rejects single export options in batch runs, and batch options in single exports."""
+    monkeypatch.setattr(sys, "argv", ["attackToExcel_cli", *argv])
+
+    with pytest.raises(SystemExit) as exc_info:
+        attackToExcel.main()
+    assert exc_info.value.code == 2
+
+
+def test_ics_latest_sqlite(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
+    """Test most recent ics to SQLite database functionality."""
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+
+    attackToExcel.export(domain=domain, output_dir=str(tmp_path), mem_store=memstore_ics_latest, file_format="sqlite")
+
+    database = tmp_path / domain / f"{domain}.db"
+    assert database.exists()
+    with sqlite3.connect(database) as connection:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"techniques", "relationships", "citations", "matrices"} <= tables
+        assert {"idx_techniques_id", "idx_techniques_stix_id", "idx_relationships_target_ref"} <= indexes
+        assert connection.execute("SELECT COUNT(*) FROM techniques").fetchone()[0] > 0
+    connection.close()
+
+
+def test_batch_export(tmp_path: Path, stix_file_ics_latest: str):
+    """Test that a batch export loads each bundle from the release cache and exports it once."""
+    logger.debug(f"{tmp_path=}")
+    release_dir = tmp_path / "releases"
+    (release_dir / "v18.0").mkdir(parents=True)
+    shutil.copy(stix_file_ics_latest, release_dir / "v18.0" / "ics-attack.json")
+
+    results = attackToExcel.export_batch(
+        exports=[("ics-attack", "v18.0"), ("ics-attack", "v18.0")],
+        output_dir=str(tmp_path / "output"),
+        release_dir=str(release_dir),
+        file_format="csv",
+    )
+
+    assert len(results) == 1
+    assert results[0]["objects"] > 0
+    assert all(Path(fp).exists() for fp in results[0]["files"])
+
+
+def test_ics_latest_incremental(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
+    """Test that an incremental export of unchanged data links every workbook of the previous export."""
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+
+    attackToExcel.export(
+        domain=domain, version="v18.0", output_dir=str(tmp_path), mem_store=memstore_ics_latest, incremental=True
+    )
+    previous_output = tmp_path / f"{domain}-v18.0"
+    assert (previous_output / attackToExcel.MANIFEST_FILE).exists()
+
+    written_files = attackToExcel.export(
+        domain=domain,
+        version="v18.1",
+        output_dir=str(tmp_path),
+        mem_store=memstore_ics_latest,
+        incremental=True,
+        previous_output=str(previous_output),
+    )
+
+    for fp in written_files:
+        previous_fp = previous_output / Path(fp).name.replace("v18.1", "v18.0")
+        assert Path(fp).read_bytes() == previous_fp.read_bytes()
+    assert list((previous_output / attackToExcel.DATAFRAMES_DIR).glob("*.json"))
+
+    # dataframes built with another compact flag are never reused
+    compact_files = attackToExcel.export(
+        domain=domain,
+        version="v18.1",
+        output_dir=str(tmp_path / "compact"),
+        mem_store=memstore_ics_latest,
+        incremental=True,
+        previous_output=str(previous_output),
+        compact=True,
+    )
+    for fp in compact_files:
+        assert not os.path.samefile(fp, previous_output / Path(fp).name.replace("v18.1", "v18.0"))
+
+
+def test_ics_latest_compact(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
+    """Test that compact dataframes use compact dtypes and write the same workbooks."""
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+
+    compact = attackToExcel.build_dataframes(src=memstore_ics_latest, domain=domain, compact=True)
+    techniques = compact["techniques"]["techniques"]
+    assert isinstance(techniques["domain"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(techniques["created"])
+    assert techniques["name"].dtype == "string"
+    assert isinstance(compact["relationships"]["relationships"]["mapping type"].dtype, pd.CategoricalDtype)
+
+    written_files = attackToExcel.export(domain=domain, output_dir=str(tmp_path), mem_store=memstore_ics_latest)
+    compact_files = attackToExcel.export(
+        domain=domain, output_dir=str(tmp_path / "compact"), mem_store=memstore_ics_latest, compact=True
+    )
+    assert len(compact_files) == len(written_files) > 0
+    for fp in (tmp_path / domain).glob("*.xlsx"):
+        expected = pd.read_excel(fp, sheet_name=None)
+        actual = pd.read_excel(tmp_path / "compact" / domain / fp.name, sheet_name=None)
+        assert expected.keys() == actual.keys()
+        for sheet_name, sheet in expected.items():
+            pd.testing.assert_frame_equal(sheet, actual[sheet_name])
+
+
+def test_ics_latest_profile_report(tmp_path: Path, memstore_ics_latest: stix2.MemoryStore):
+    """Test that a profiled export records every builder and every written file."""
+    logger.debug(f"{tmp_path=}")
+    domain = "ics-attack"
+    profile = ExportProfile()
+
+    written_files = attackToExcel.export(
+        domain=domain, output_dir=str(tmp_path), mem_store=memstore_ics_latest, profile=profile
+    )
+    report_fp = tmp_path / "profile.json"
+    profile.write(str(report_fp))
+
+    report = json.loads(report_fp.read_text())
+    assert report["domain"] == domain
+    stages = {stage["stage"]: stage for stage in report["stages"]}
+    for object_type in attackToExcel.OBJECT_TYPES:
+        assert stages[f"build {object_type}"]["rows"] >= 0
+    assert stages["build techniques"]["rows"] > 0
+    assert [record["file"] for record in report["files"]] == written_files
+    for record in report["stages"] + report["files"]:
+        assert record["wall seconds"] >= 0
+        assert record["cpu seconds"] >= 0
+        assert record["peak traced MB"] > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_records_failed_stage():
+    """Test that a stage which raises is still measured, and tracemalloc is only stopped if the profile started it."""
+    profile = ExportProfile()
+
+    with pytest.raises(RuntimeError):
+        with profile.stage("failing"):
+            raise RuntimeError("stage failed")
+    assert profile.stages[0]["stage"] == "failing"
+    assert profile.stages[0]["wall seconds"] >= 0
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        with profile.stage("traced"):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+class _WorkbenchStandIn(BaseHTTPRequestHandler):
+    """Serve a STIX bundle like the stix-bundles endpoint of an ATT&CK Workbench, honoring If-None-Match."""
+
+    bundle = b""
+    etag = '"bundle-1"'
+    requests = []
+    # drop the connection halfway through the bundle
+    truncate = False
+
+    def do_GET(self):
+        """Answer every request with the bundle, or 304 when the client has the current version."""
+        not_modified = self.headers.get("If-None-Match") == self.etag
+        self.requests.append(304 if not_modified else 200)
+        if not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.bundle)))
+        self.end_headers()
+        self.wfile.write(self.bundle[: len(self.bundle) // 2] if self.truncate else self.bundle)
+
+    def log_message(self, format, *args):
+        """Keep the test output quiet."""
+
+
+def test_get_stix_data_cache(tmp_path: Path, stix_file_ics_latest: str):
+    """Test that cached remote bundles are revalidated instead of being downloaded again."""
+    _WorkbenchStandIn.bundle = Path(stix_file_ics_latest).read_bytes()
+    _WorkbenchStandIn.requests = []
+    server = HTTPServer(("127.0.0.1", 0), _WorkbenchStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        remote = f"http://127.0.0.1:{server.server_port}"
+        cache_dir = str(tmp_path / "cache")
+        first = attackToExcel.get_stix_data(domain="ics-attack", remote=remote, cache_dir=cache_dir)
+        second = attackToExcel.get_stix_data(domain="ics-attack", remote=remote, cache_dir=cache_dir)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert _WorkbenchStandIn.requests == [200, 304]
+    assert len(second.query()) == len(first.query()) > 0
+
+
+def test_get_stix_data_cache_consistency(tmp_path: Path, stix_file_ics_latest: str):
+    """Test that failed downloads leave no partial files and bundles not matching their metadata are downloaded."""
+    _WorkbenchStandIn.bundle = Path(stix_file_ics_latest).read_bytes()
+    _WorkbenchStandIn.requests = []
+    server = HTTPServer(("127.0.0.1", 0), _WorkbenchStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        remote = f"http://127.0.0.1:{server.server_port}"
+        cache_dir = tmp_path / "cache"
+        first = attackToExcel.get_stix_data(domain="ics-attack", remote=remote, cache_dir=str(cache_dir))
+
+        # a newer bundle that fails halfway through falls back to the cached copy
+        _WorkbenchStandIn.etag = '"bundle-2"'
+        _WorkbenchStandIn.truncate = True
+        fallback = attackToExcel.get_stix_data(domain="ics-attack", remote=remote, cache_dir=str(cache_dir))
+        assert not list(cache_dir.glob("*.part"))
+
+        # a cached bundle replaced without its metadata is not revalidated with the old ETag
+        _WorkbenchStandIn.etag = '"bundle-1"'
+        _WorkbenchStandIn.truncate = False
+        (bundle_fp,) = [fp for fp in cache_dir.glob("*.json") if not fp.name.endswith(".meta.json")]
+        bundle_fp.write_bytes(bundle_fp.read_bytes() + b" ")
+        refreshed = attackToExcel.get_stix_data(domain="ics-attack", remote=remote, cache_dir=str(cache_dir))
+    finally:
+        _WorkbenchStandIn.etag = '"bundle-1"'
+        _WorkbenchStandIn.truncate = False
+        server.shutdown()
+        server.server_close()
+
+    assert _WorkbenchStandIn.requests == [200, 200, 200]
+    assert bundle_fp.read_bytes() == _WorkbenchStandIn.bundle
+    assert len(refreshed.query()) == len(fallback.query()) == len(first.query()) > 0